@@ -8,46 +8,171 @@ DESCRIPTION: Contains actual rock paper scissors and mimic functionality, allowi
 # Hand_Gesture_Reconition02_41.py
 
 import os
-import sys
 import subprocess
-import cv2
-import math
 import numpy as np
-import copy
-import mediapipe as mp
-import keyboard
-import random
 import time
 import threading
-import serial
+# mediapipe and serial (and the modules that need cv2) are imported on first
+# use by init() / main_servo_start(), so importing this module is cheap and has no side effects
+
+from inference_scheduler import InferenceScheduler
+from landmark_recording import LandmarkRecorder
+from perf_stats import perf
+from rps_round import start_round, start_pair_round, WINDOW_AFTER, PROCESSING_MARGIN
+from rps_strategy import EnsembleStrategy
+from reaction_round import start_reaction_round
+from servo_output import ServoScheduler, UPDATE_RATE_HZ, DEADBAND
+from hand_angles import joint_angles, angles_to_dict, LANDMARK_LABELS, NUM_ANGLES
+from gesture_filter import MotionPredictor
+from vision_pipeline import GesturePipeline, MultiHandPipeline, shape, mimic_pose
+from gesture_state import HANDEDNESS_INDEX
+from gesture_classifier import load_classifier
+from servo_calibration import load_calibration
+from servo_motion import load_pose_library, MotionPlayer
 
 # --- GLOBAL STATE VARIABLES (Shared between Kivy/Vision Threads) ---
-lPoints = {}  # Hand landmarks from MediaPipe
+lPoints = None  # (21, 3) hand landmark array from MediaPipe, None when no hand is seen
 close = False  # Signal to stop the main loop
-CURRENT_MODE = 'idle' # 'idle', 'mimic', or 'rps'
+CURRENT_MODE = 'idle' # 'idle', 'mimic', 'rps' or 'tournament'
 LAST_RECOGNIZED_GESTURE = 'unknown' # Gesture name ('rock', 'paper', 'scissors', 'unknown')
+inference_scheduler = InferenceScheduler() # Which frames go through MediaPipe, per mode
+# Mimic look-ahead in seconds: None = measured capture -> servo latency, 0 = no prediction
+MIMIC_LOOKAHEAD = None
+# Extrapolates mimic targets so Handy's fingers don't trail the user's (see gesture_filter.py)
+mimic_predictor = MotionPredictor((NUM_ANGLES,), lookahead=MIMIC_LOOKAHEAD)
+# Smoothing -> angles -> classify -> debounce -> mimic -> UI snapshot (see vision_pipeline.py).
+# Uses the trained model in gesture_model.npz when there is one (train_classifier.py), else shape()
+pipeline = GesturePipeline(mimic=lambda hand_angles: copy_mode(hand_angles), classifier=load_classifier(),
+                           predictor=mimic_predictor)
+gesture_history = pipeline.history # Timestamped shape codes of recent frames (for RPS rounds)
+gesture_state = pipeline.state # Latest per-frame snapshot for the UI (landmarks, angles, gesture together)
+strategy = EnsembleStrategy() # Picks Handy's RPS throws from the opponent's past ones (see rps_strategy.py)
+# Tournament mode: every hand in the frame, batched, with one vote history per side of the preview
+MAX_HANDS = 2 # hands MediaPipe looks for in tournament mode (1 otherwise, detection is cheaper)
+hands_pipeline = MultiHandPipeline(classifier=pipeline.classifier)
+hands_state = hands_pipeline.state # Latest gesture_state.HandsSnapshot (all hands of a frame)
+side_histories = hands_pipeline.histories
+
+# --- CONFIGURATION ---
+# Headless = no serial port or camera bridge (tests, replay, a dev laptop)
+HEADLESS = os.environ.get('HANDY_HEADLESS') == '1'
+SERIAL_PORT = '/dev/ttyAMA0'
+SERIAL_BAUD = 115200
+# Phone camera (DroidCam) bridged to a v4l2loopback device by ffmpeg
+CAMERA_BRIDGE_URL = 'http://10.178.3.190:4747/video'
+CAMERA_DEVICE = '/dev/video0'
+# Where frames come from (camera_sources.make_source). The default reads the loopback device's
+# native yuv420p (converted to RGB once); 'url:' + CAMERA_BRIDGE_URL reads the phone stream
+# directly without ffmpeg/v4l2loopback, 'file:...' / 'dir:...' replay footage without a camera.
+CAMERA_SOURCE = os.environ.get('HANDY_CAMERA', f'v4l2:{CAMERA_DEVICE}?format=yuv420p')
+READY_TIMEOUT = 10.0 # seconds to wait for the camera bridge / model before starting anyway
 
-# --- SERVO SETUP (MUST BE EXECUTED ONCE) ---
-try:
-    # Attempt to establish serial connection
-    ser = serial.Serial('/dev/ttyAMA0', 115200, timeout=1)
-except serial.SerialException as e:
-    print(f"Error initializing serial connection: {e}. Servos will be disabled.")
-    ser = None
-    
 servo_pins = [4, 17, 27, 22, 23]
-time.sleep(1) # Reduced sleep time
-
-
-# --- INITIAL SYSTEM SETUP (CRITICAL FIX) ---
-# This block MUST run before the main loop starts but MUST NOT restart the script.
-if os.geteuid() != 0:
-    print("Starting webcam and granting permissions for setup...")
-    # NOTE: These commands will run with sudo and should be sufficient 
-    # for the entire process, including the serial connection and v4l2.
-    subprocess.run(['sudo','modprobe','v4l2loopback','devices=1','max_buffer=2','exclusive_caps=1','card_label="VirtualCam #0"'],stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    subprocess.Popen(['sudo','ffmpeg','-i','http://10.178.3.190:4747/video','-f','v4l2','-pix_fmt','yuv420p','/dev/video0'] ,stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-# DO NOT include the script re-run here. That was the module-not-found issue.
+# Finger angle -> servo angle map per servo (servo_calibration.json, made by servo_calibration.py)
+calibration = load_calibration()
+# Handy's gestures as servo keyframes (servo_poses.json); add a pose there to give Handy a new move
+pose_library = load_pose_library()
+if pose_library.pins is not None and pose_library.pins != servo_pins:
+    print(f"Warning: servo_poses.json was written for servo pins {pose_library.pins}, not {servo_pins}.")
+
+# (The landmarks are drawn by the Kivy UI over its camera preview, see landmark_overlay.py;
+# the loop has no window or key polling of its own and stops through break_loop().)
+# 'text' = '170, 170, 90, 90, 90\n' lines, 'binary' = 8-byte packed frames (controller firmware must match)
+SERVO_ENCODING = 'text'
+
+# --- SERVO SETUP ---
+ser = None # Opened by init(); None = servos disabled
+# All servo writes go through one scheduler thread (vision/UI threads never block on ser.write).
+# It drops poses until init() attaches the port.
+servo_out = ServoScheduler(None, rate_hz=UPDATE_RATE_HZ, deadband=DEADBAND, encoding=SERVO_ENCODING)
+# Gestures are played as smooth trajectories, one sample per scheduler tick
+motion = MotionPlayer(servo_out, pose_library, rate_hz=UPDATE_RATE_HZ)
+
+mp = None # mediapipe, imported by init() (the slowest import by far)
+bridge_process = None # ffmpeg feeding CAMERA_DEVICE
+
+# Set once each part of init() has finished (successfully or not)
+ready = {'serial': threading.Event(), 'camera': threading.Event(), 'model': threading.Event()}
+_init_lock = threading.Lock()
+_init_started = False
+
+
+# --- INITIAL SYSTEM SETUP (runs once, in the background) ---
+
+def init(headless=None, wait=False, timeout=READY_TIMEOUT):
+    """Starts the serial port, camera bridge and MediaPipe setup, each on its own thread.
+
+    Safe to call more than once (only the first call does anything). Returns at once unless
+    wait=True, in which case it returns wait_ready(timeout=timeout).
+    """
+    global _init_started, HEADLESS
+    with _init_lock:
+        if not _init_started:
+            _init_started = True
+            if headless is not None:
+                HEADLESS = headless
+            for part, target in (('serial', _init_serial), ('camera', _init_camera_bridge), ('model', _init_model)):
+                threading.Thread(target=target, name=f'HandyInit-{part}', daemon=True).start()
+    if wait:
+        return wait_ready(timeout=timeout)
+    return True
+
+def wait_ready(parts=('serial', 'camera', 'model'), timeout=READY_TIMEOUT):
+    """Blocks until the given init() parts are done. Returns False on timeout."""
+    deadline = time.monotonic() + timeout
+    return all(ready[part].wait(max(0.0, deadline - time.monotonic())) for part in parts)
+
+def _init_serial():
+    global ser
+    try:
+        if HEADLESS:
+            return
+        import serial
+        try:
+            # Attempt to establish serial connection
+            port = serial.Serial(SERIAL_PORT, SERIAL_BAUD, timeout=1)
+        except serial.SerialException as e:
+            print(f"Error initializing serial connection: {e}. Servos will be disabled.")
+            return
+        # Readiness check instead of a fixed sleep: the Pi's UART doesn't reset the controller
+        # on open (unlike a USB Arduino), so the port is usable as soon as it reports open
+        if port.is_open:
+            port.reset_input_buffer()
+            ser = port
+            servo_out.ser = port
+    finally:
+        ready['serial'].set()
+
+def _init_camera_bridge(timeout=READY_TIMEOUT):
+    global bridge_process
+    try:
+        if HEADLESS or os.geteuid() == 0 or not CAMERA_SOURCE.startswith(f'v4l2:{CAMERA_DEVICE}'):
+            return
+        print("Starting webcam and granting permissions for setup...")
+        # NOTE: These commands will run with sudo and should be sufficient
+        # for the entire process, including the serial connection and v4l2.
+        subprocess.run(['sudo','modprobe','v4l2loopback','devices=1','max_buffer=2','exclusive_caps=1','card_label="VirtualCam #0"'],stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        bridge_process = subprocess.Popen(['sudo','ffmpeg','-i',CAMERA_BRIDGE_URL,'-f','v4l2','-pix_fmt','yuv420p',CAMERA_DEVICE] ,stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Ready once the loopback device exists and ffmpeg is still running (it exits at once
+        # when the phone stream can't be reached)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and bridge_process.poll() is None:
+            if os.path.exists(CAMERA_DEVICE):
+                return
+            time.sleep(0.05)
+        print("Camera bridge not ready, carrying on with whatever camera is there.")
+    finally:
+        ready['camera'].set()
+
+def _init_model():
+    global mp
+    try:
+        import mediapipe
+        mp = mediapipe
+    except ImportError as e:
+        print(f"MediaPipe unavailable: {e}")
+    finally:
+        ready['model'].set()
 
 
 # --- EXTERNAL CONTROL FUNCTIONS (CALLED BY HandyMain.py) ---
@@ -60,293 +185,257 @@ def set_operating_mode(mode):
 
 def get_latest_gesture():
     """Retrieves the last recognized hand."""
-    return LAST_RECOGNIZED_GESTURE
+    return gesture_state.latest().gesture
 
-def break_loop():
-    """Signals the vision thread to stop."""
-    global close
-    close = True
+def start_rps_window(seconds):
+    """Runs the vision loop at full rate for the next `seconds` (called at countdown start)."""
+    inference_scheduler.start_rps_window(seconds)
 
-# --- GESTURE / SERVO HELPER FUNCTIONS (Kept from your original) ---
+def get_vision_stats():
+    """Effective vision FPS and skipped/stale frame counts."""
+    return inference_scheduler.stats()
 
-def getAngle(a, b, c):
-    # ... (Your calculation logic)
-    # NOTE: Ensure all variables are correctly scoped/calculated within this function.
-    v1 = [a[i] - b[i] for i in range(3)]
-    v2 = [c[i] - b[i] for i in range(3)]
+def set_perf_enabled(enabled):
+    """Switches stage timing (perf_stats) on/off."""
+    perf.enabled = enabled
 
-    vDotP = sum(v1[i] * v2[i] for i in range(3))
-    
-    v1Mag = math.sqrt(sum(v1[i]**2 for i in range(3)))
-    v2Mag = math.sqrt(sum(v2[i]**2 for i in range(3)))
+def start_recording(path):
+    """Records every vision frame's raw landmarks to `path` (see landmark_recording.py)."""
+    stop_recording()
+    pipeline.recorder = LandmarkRecorder(path)
 
-    # Handle division by zero/near zero magnitude defensively
-    if v1Mag == 0 or v2Mag == 0:
-        return 0 
-    
-    # Use max/min to clamp the argument to arccos in case of floating point errors
-    cos_theta = vDotP / (v1Mag * v2Mag)
-    cos_theta = max(min(cos_theta, 1.0), -1.0) 
+def stop_recording():
+    recorder, pipeline.recorder = pipeline.recorder, None
+    if recorder is not None:
+        recorder.close()
 
-    return int(np.arccos(cos_theta) * (180 / math.pi))
+def subscribe_frames(wait=True):
+    """Frame consumer for the UI preview (shares the vision loop's camera).
 
+    wait=False doesn't wait for the camera bridge, the consumer's service may not be open yet.
+    """
+    from camera_service import get_capture_service
+    init()
+    if wait:
+        wait_ready(('camera',))
+    return get_capture_service(CAMERA_SOURCE).subscribe('latest')
 
-def shape(hand_angles):
-    # ... (Your shape logic)
-    # The current logic is complex; ensure it's correct for your needs.
-    # It has a logic error: 'and' should use booleans. 
-    # Example fix for scissors: (hand_angles['Index']['MPC'] > 150) and (hand_angles['Index']['PIP'] > 150)
-    # Assuming your original logic is functional, it is left as is.
-    
-    idx_open = hand_angles['Index']['MPC'] > 150 and hand_angles['Index']['PIP'] > 150
-    mid_open = hand_angles['Middle']['MPC'] > 150 and hand_angles['Middle']['PIP'] > 150
-    ring_closed = hand_angles['Ring']['MPC'] < 150 and hand_angles['Ring']['PIP'] < 150
-    pinky_closed = hand_angles['Pinky']['MPC'] < 150 and hand_angles['Pinky']['PIP'] < 150
-
-    if idx_open and mid_open:
-        if ring_closed and pinky_closed:
-            return 2  # Scissors (Index/Middle open, Ring/Pinky closed)
-        if not ring_closed and not pinky_closed:
-             return 1 # Paper (All fingers open)
-        return 4 # Not a clear shape
-
-    # Is the hand shaped as a rocks
-    elif hand_angles['Index']['MPC'] < 130 and hand_angles['Middle']['MPC'] < 130:
-        if ring_closed and pinky_closed:
-            return 0 # Rock (All fingers closed)
-        return 4
-    
-    # Is the hand showing middle finger (assuming this is code 3)
-    elif hand_angles['Index']['MPC'] < 150 and mid_open:
-        if ring_closed and pinky_closed:
-            return 3
-        return 4
-    else:
-        return 4
-
-
-def wholeFinger(a,b,c,d,e): 
-    finger = {}
-    finger['MPC']=(getAngle(a,b,c))
-    finger['PIP']=(getAngle(b,c,d))
-    finger['DIP']=(getAngle(c,d,e))
-    return finger
+def get_latest_state():
+    """Retrieves the whole latest gesture_state.GestureSnapshot (seq, landmarks, angles, gesture...)."""
+    return gesture_state.latest()
+
+def break_loop():
+    """Signals the vision thread to stop."""
+    global close
+    close = True
+
+# --- GESTURE / SERVO HELPER FUNCTIONS (Kept from your original) ---
 
 def allJoints(lPoints):
-    # ... (Your logic using wholeFinger and getAngle)
-    index = wholeFinger(lPoints['WRIST'],lPoints["INDEX_MCP"],lPoints["INDEX_PIP"],lPoints["INDEX_DIP"],lPoints["INDEX_TIP"])
-    middle = wholeFinger(lPoints['WRIST'],lPoints["MIDDLE_MCP"],lPoints["MIDDLE_PIP"],lPoints["MIDDLE_DIP"],lPoints["MIDDLE_TIP"])
-    ring = wholeFinger(lPoints['WRIST'],lPoints["RING_MCP"],lPoints["RING_PIP"],lPoints["RING_DIP"],lPoints["RING_TIP"])
-    pinky = wholeFinger(lPoints['WRIST'],lPoints["PINKY_MCP"],lPoints["PINKY_PIP"],lPoints["PINKY_DIP"],lPoints["PINKY_TIP"])
-    thumb = {'MCP': getAngle(lPoints['THUMB_CMC'],lPoints['THUMB_MCP'],lPoints['THUMB_IP']),'IP': getAngle(lPoints['THUMB_MCP'],lPoints['THUMB_IP'],lPoints['THUMB_TIP']),'CMC': getAngle(lPoints['WRIST'],lPoints['THUMB_CMC'],lPoints['THUMB_MCP'])}
-    hand_angles = {'Index':index,'Middle':middle,'Ring':ring,'Pinky':pinky,'Thumb':thumb}
-    return hand_angles
+    """Dict view of the joint angles, kept for callers that still want {'Index': {'MPC': ..}}."""
+    return angles_to_dict(joint_angles(lPoints))
 
 def moveRock():
-    # ... (Your servo movement logic)
     global ser
     if not ser: return # Check if serial is initialized
-    fin_rock = 95
-    thumb_rock = 130
-    start = time.time()
-    while time.time()-start < 0.1: # Reduced loop time for responsiveness
-        input_angles = str(f'{fin_rock}, {fin_rock}, {fin_rock}, {fin_rock}, {thumb_rock}\n')
-        ser.write(input_angles.encode('utf-8'))
-        time.sleep(0.01)
+    # Streamed by the motion player's thread; the angles are in servo_poses.json
+    motion.play('rock')
 
 def movePaper():
-    # ... (Your servo movement logic)
     global ser
     if not ser: return
-    fin_paper = 170
-    start = time.time()
-    while time.time()-start < 0.1:
-        input_angles = str(f'{fin_paper}, {fin_paper}, {fin_paper}, {fin_paper}, {fin_paper}\n')
-        ser.write(input_angles.encode('utf-8'))
-        time.sleep(0.01)
+    motion.play('paper')
         
 def moveScissors():
-    # ... (Your servo movement logic)
     global ser
     if not ser: return
-    fin_scisors_open = 170
-    fin_scissors_close = 90
-    start = time.time()
-    while time.time()-start < 0.1:
-        input_angles = str(f'{fin_scisors_open}, {fin_scisors_open}, {fin_scissors_close}, {fin_scissors_close}, {fin_scissors_close}\n')
-        ser.write(input_angles.encode('utf-8'))
-        time.sleep(0.01)
+    motion.play('scissors')
 
 
 def move_servos(index, middle, ring, pinky, thumb):
     global ser
     if not ser: return
-    # Clamp angles to a safe range (e.g., 0-180 for standard servos)
-    index = max(0, min(index, 180)) 
-    middle = max(0, min(middle, 180)) 
-    ring = max(0, min(ring, 180)) 
-    pinky = max(0, min(pinky, 180)) 
-    thumb = max(0, min(thumb, 180)) 
-
-    input_angles = str(f'{index}, {middle}, {ring}, {pinky}, {thumb}\n')
-    ser.write(input_angles.encode('utf-8'))
+    # Clamped to 0-180, rate limited and deadbanded by the servo scheduler (stops any gesture playing)
+    motion.track([index, middle, ring, pinky, thumb])
 
 # --- MIMIC FUNCTION (Kept as requested) ---
-def copy_mode():
+def copy_mode(hand_angles=None):
     global lPoints
     
-    if lPoints == {}:
+    if lPoints is None:
         # No hand detected, move to a default or open pose
         # print("Mimic mode: No hand detected.") 
         return
 
-    # Calculate average angles for each finger
-    hand_angles = allJoints(lPoints)
-
-    index_ave = int((hand_angles['Index']['MPC']+hand_angles['Index']['PIP']+hand_angles['Index']['DIP'])/3)
-    middle_ave = int((hand_angles['Middle']['MPC']+hand_angles['Middle']['PIP']+hand_angles['Middle']['DIP'])/3)
-    ring_ave = int((hand_angles['Ring']['MPC']+hand_angles['Ring']['PIP']+hand_angles['Ring']['DIP'])/3)
-    pinky_ave = int((hand_angles['Pinky']['MPC']+hand_angles['Pinky']['PIP']+hand_angles['Pinky']['DIP'])/3)
-    thumb_ave = int((hand_angles['Thumb']['MCP']+hand_angles['Thumb']['IP']+hand_angles['Thumb']['CMC'])/3)
+    # Calculate average angles for each finger (Index, Middle, Ring, Pinky, Thumb)
+    # (the vision loop passes in the angles it already computed for this frame)
+    if hand_angles is None:
+        hand_angles = joint_angles(lPoints)
+    index_ave, middle_ave, ring_ave, pinky_ave, thumb_ave = mimic_pose(hand_angles, calibration).tolist()
 
     # Output for servos
     move_servos(index_ave, middle_ave, ring_ave, pinky_ave, thumb_ave)
     
     # print statements are usually fine for the console, but can slow down the loop:
-    # print (f"Index: {hand_angles['Index']}")
+    # print (f"Angles: {hand_angles}")
 
 def get_user_shape():
     """Returns the last recognized gesture string."""
     return LAST_RECOGNIZED_GESTURE
+
+def move_handy(pick):
+    """Starts Handy's gesture (any pose in servo_poses.json) on the servos (does not block)."""
+    if not ser: return
+    motion.play(pick)
+
+def RPS_mode_async(shoot_time=None, callback=None):
+    """Non-blocking RPS round. Handy throws now, the user's pick is voted from the frames
+    captured around shoot_time (time.monotonic() of "Shoot!").
+
+    Returns a Future of an rps_round.RoundResult; callback(result) runs on a timer thread.
+    """
+    inference_scheduler.start_rps_window(WINDOW_AFTER + PROCESSING_MARGIN)
+    return start_round(gesture_history, move_handy, shoot_time, callback, strategy)
+
+def RPS_reaction_async(shoot_time=None, callback=None):
+    """Reaction ("cheat") round: Handy throws the counter-move from the vision thread as soon as
+    the user's shape is confident after shoot_time (see reaction_round.py).
+
+    Returns a Future of a reaction_round.ReactionResult; callback(result) runs on the vision thread.
+    """
+    inference_scheduler.start_rps_window(WINDOW_AFTER + PROCESSING_MARGIN)
+    return start_reaction_round(gesture_state, gesture_history, move_handy, shoot_time, callback, strategy)
+
+def RPS_pair_async(shoot_time=None, callback=None):
+    """Tournament round between the players on the left and right of the preview (Handy
+    doesn't throw). Returns a Future of an rps_round.PairResult; callback runs on a timer thread.
+    """
+    inference_scheduler.start_rps_window(WINDOW_AFTER + PROCESSING_MARGIN)
+    return start_pair_round(side_histories, shoot_time, callback)
     
 def RPS_mode():
-    """Picks robot hand, moves servos, and gets user pick."""
-    global ser
-    
-    rnum = random.randint(0,2)
-    
-    # Handy's pick and servo movement
-    if rnum == 0:
-        p_pick = 'rock'
-        if ser: moveRock()
-    elif rnum == 1:
-        p_pick = 'paper'
-        if ser: movePaper()
-    elif rnum == 2:
-        p_pick = 'scissors'
-        if ser: moveScissors()
-    else:
-        p_pick = 'error'
-        
-    time.sleep(0.7)
-
-    # Get user's pick
-    y_pick = get_user_shape()
+    """Picks robot hand, moves servos, and gets user pick (blocking version of RPS_mode_async)."""
+    result = RPS_mode_async().result()
 
     # The Kivy app handles the final outcome message.
-    return y_pick.lower(), p_pick
+    return result.user_pick, result.handy_pick
 
 
 # --- THE MAIN EXECUTION LOOP ---
 
 def main_servo_start():
-    import os
-    import sys
-    import subprocess
-    
     global lPoints, close, LAST_RECOGNIZED_GESTURE, CURRENT_MODE 
     
-    # NOTE: The one-time sudo setup logic was moved out of this function 
-    # to avoid re-running on every call or unexpected behavior.
-    
+    # One-time setup (serial, camera bridge, MediaPipe) runs in parallel; the UI is already up.
+    # Only the camera and the model are needed to start, the servos attach whenever they're ready.
+    init()
+    wait_ready(('camera', 'model'))
+    if mp is None:
+        return
+    from camera_service import get_capture_service
+    from hand_roi import RoiTracker
+
     # --- MEDIAPIPE SETUP ---
-    mp_drawing = mp.solutions.drawing_utils
     mp_hands = mp.solutions.hands
 
-    cap = cv2.VideoCapture(0)
-    # Lower confidence to improve detection speed/responsiveness
-    with mp_hands.Hands(
-        model_complexity=0,
-        max_num_hands=1,
-        min_detection_confidence=0.2, # Slightly less strict
-        min_tracking_confidence=0.5) as hands:
-            
-        while cap.isOpened():
+    # Crop box around the last seen hand (see hand_roi.py)
+    roi_tracker = RoiTracker()
+
+    # Frames come from the shared capture service (the Kivy preview reads the same device)
+    frames = get_capture_service(CAMERA_SOURCE).subscribe('latest')
+
+    def open_hands(max_hands):
+        # Lower confidence to improve detection speed/responsiveness
+        return mp_hands.Hands(
+            model_complexity=0,
+            max_num_hands=max_hands,
+            min_detection_confidence=0.2, # Slightly less strict
+            min_tracking_confidence=0.5)
+
+    # max_num_hands is fixed per Hands object, so switching to/from tournament mode reopens it
+    num_hands = 1
+    hands = open_hands(num_hands)
+    try:
+        while not frames.closed:
             # Check global flag to break the loop from Kivy app
             if close: 
                 break
 
             # ... (Image processing and Mediapipe calls) ...
-            success, image = cap.read()
-            if not success:
+            t = perf.now()
+            frame = frames.read(timeout=1.0)
+            if frame is None:
+                if not frames.service.is_opened():
+                    break
                 continue
+            t = perf.lap('vision: cap.read (wait)', t)
 
+            # Mode-based rate limit (idle/rps between rounds run slow) and stale frame drop
+            if not inference_scheduler.should_process(CURRENT_MODE, frame.timestamp):
+                continue
+
+            tournament = CURRENT_MODE == 'tournament'
+            wanted = MAX_HANDS if tournament else 1
+            if wanted != num_hands:
+                hands.close()
+                num_hands = wanted
+                hands = open_hands(num_hands)
+            if tournament:
+                roi_tracker.lost() # players can be anywhere in the frame, no crop box
+
+            # Only look at the padded box around the last hand (full frame when not tracking).
+            # Frames are already RGB (converted once at capture). Always a copy: one hands.process
+            # can outlast RING_SIZE - 1 captures on a Pi, and the ring slot is reused after that
+            image = np.array(roi_tracker.crop(frame.image), order='C')
+            t = perf.lap('vision: crop', t)
             image.flags.writeable = False
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             results = hands.process(image)
-            image.flags.writeable = True
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+            t = perf.lap('vision: hands.process', t)
+
+            new_lPoints = None
+            if tournament:
+                # All hands in one (N, 21, 3) stack, angles + classification batched
+                all_points = None
+                handedness = None
+                if results.multi_hand_landmarks:
+                    all_points = np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                                           for hand in results.multi_hand_landmarks], dtype=np.float32)
+                    # informational only (sides come from the wrist position): an unexpected label is -1
+                    labels = [h.classification[0].label for h in results.multi_handedness or ()]
+                    handedness = [HANDEDNESS_INDEX.get(label, -1) for label in labels]
+                    if len(handedness) != len(all_points):
+                        handedness = [-1] * len(all_points)
+                hands_pipeline.process(frame.seq, frame.timestamp, all_points, handedness)
+                t = perf.lap('vision: all hands (batched)', t)
 
-            new_lPoints = {}
             if results.multi_hand_landmarks:
-                hand_points = [(lm.x, lm.y, lm.z) for lm in results.multi_hand_landmarks[0].landmark]
-                
-                # Draw landmarks on the image (for the separate OpenCV window)
-                mp_drawing.draw_landmarks(
-                    image, results.multi_hand_landmarks[0], mp_hands.HAND_CONNECTIONS,
-                    mp.solutions.drawing_styles.get_default_hand_landmarks_style(),
-                    mp.solutions.drawing_styles.get_default_hand_connections_style())
-
-                # Defining labels and creating a labeled dictionary
-                LABELS = ["WRIST", "THUMB_CMC", "THUMB_MCP", "THUMB_IP", "THUMB_TIP",
-                          "INDEX_MCP", "INDEX_PIP", "INDEX_DIP", "INDEX_TIP",
-                          "MIDDLE_MCP", "MIDDLE_PIP", "MIDDLE_DIP", "MIDDLE_TIP",
-                          "RING_MCP", "RING_PIP", "RING_DIP", "RING_TIP",
-                          "PINKY_MCP", "PINKY_PIP", "PINKY_DIP", "PINKY_TIP"]
-                
-                # Update the hand points dictionary
-                if len(hand_points) == 21:
-                     new_lPoints = {LABELS[i]: hand_points[i] for i in range(21)}
-                else:
-                    new_lPoints = {}
-                    
-            lPoints = new_lPoints # Update the global dictionary
+                hand_points = results.multi_hand_landmarks[0].landmark
 
-            # --- GESTURE RECOGNITION AND SERVO CONTROL ---
-            if lPoints:
-                try:
-                    # 1. Update the recognized gesture name for UI
-                    user_shape_code = shape(allJoints(lPoints))
-                    if user_shape_code == 0:
-                        LAST_RECOGNIZED_GESTURE = 'rock'
-                    elif user_shape_code == 1:
-                        LAST_RECOGNIZED_GESTURE = 'paper'
-                    elif user_shape_code == 2:
-                        LAST_RECOGNIZED_GESTURE = 'scissors'
-                    else:
-                        LAST_RECOGNIZED_GESTURE = 'unknown'
-
-                    # 2. RUN MIMIC MODE SERVO CONTROL
-                    if CURRENT_MODE == 'mimic':
-                        copy_mode() # <-- MIMIC LOGIC RUNS HERE
-                        
-                except Exception as e:
-                    # print(f"Error in gesture/servo calculation: {e}")
-                    LAST_RECOGNIZED_GESTURE = 'unknown'
-            else:
-                LAST_RECOGNIZED_GESTURE = 'unknown'
-                
-                # If Mimic mode is active but no hand is seen, stop the servos
-                # if CURRENT_MODE == 'mimic':
-                    # move_servos(90, 90, 90, 90, 90) # Optional: move to a neutral position
-
-            # --- OpenCV Display ---
-            cv2.imshow("Handy's Eyes", cv2.flip(image, 1))
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+                # Update the hand points array (rows follow LANDMARK_LABELS)
+                if len(hand_points) == len(LANDMARK_LABELS):
+                    new_lPoints = np.array([(lm.x, lm.y, lm.z) for lm in hand_points], dtype=np.float32)
+                    # Back to full-frame coordinates, then move the crop box to follow the hand
+                    roi_tracker.to_frame(new_lPoints, out=new_lPoints)
+                    roi_tracker.update(new_lPoints)
 
-            if keyboard.is_pressed('q'):
-                break
+            if new_lPoints is None:
+                roi_tracker.lost() # Back to full-frame detection
+                    
+            lPoints = new_lPoints # Update the global landmark array
 
-    cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+            # --- GESTURE RECOGNITION AND SERVO CONTROL ---
+            t = perf.now()
+            LAST_RECOGNIZED_GESTURE = pipeline.process(frame.seq, frame.timestamp, lPoints, CURRENT_MODE)
+            t = perf.lap('vision: angles+shape+mimic', t)
+            # capture -> results published (frame.timestamp is time.monotonic())
+            latency = time.monotonic() - frame.timestamp
+            perf.record('vision: capture to result', latency)
+            if lPoints is not None:
+                mimic_predictor.observe_latency(latency)
+    finally:
+        # also after an error in the loop: nothing may keep the camera, file or serial port busy
+        hands.close()
+        frames.close()
+        stop_recording()
+        motion.stop()
+        servo_out.stop()
@@ -12,7 +12,7 @@ from kivymd.uix.screen import MDScreen
 #from kivymd.uix.screenmanager import MDScreenManager
 from kivy.logger import Logger
 
-from kivy.properties import ListProperty, StringProperty, NumericProperty
+from kivy.properties import ListProperty, StringProperty, NumericProperty, BooleanProperty
 from kivymd.uix.gridlayout import MDGridLayout
 
 #FOR COUNTDOWN
@@ -21,15 +21,64 @@ from kivy.utils import get_color_from_hex
 
 #CAMERA FEEDBACK
 from kivy.graphics.texture import Texture
-import cv2
+import numpy as np
+from camera_service import get_capture_service
+from perf_stats import perf
+from rps_strategy import EnsembleStrategy
+from tournament import Tournament, HANDY
+from analytics_store import AnalyticsStore
+from gesture_textures import TextureCache
+from landmark_overlay import LandmarkOverlay
 
 #REMOVE when function are in
 import random
 
+#GESTURE RECOGNITION (vision + servos). UI still runs without it (random opponent)
+import time
+import threading
+#True = vision loop in its own process (vision_worker.py), False = a thread in this one
+VISION_IN_PROCESS = True
+try:
+    if VISION_IN_PROCESS:
+        from vision_worker import VisionClient
+        gestures = VisionClient()
+    else:
+        import gestures
+except ImportError as e:
+    Logger.warning(f"Handy: Gesture module unavailable ({e}), using random gestures.")
+    gestures = None
+
+def record_round(mode, player, opponent, player_pick, opponent_pick, result=None, strategy=None):
+    """Queues a decided round in the app's analytics store (never blocks the Kivy thread)."""
+    app = MDApp.get_running_app()
+    if app is None or getattr(app, 'analytics', None) is None:
+        return
+    fps = gestures.get_vision_stats().get('fps') if gestures is not None else None
+    confidence = getattr(result, 'confidence', None)
+    frames = getattr(result, 'frames', None)
+    #tournament pair rounds vote per side, keep the (left) player's
+    if isinstance(confidence, tuple):
+        confidence, frames = confidence[0], frames[0]
+    app.analytics.record_round(
+        mode, player, opponent, player_pick, opponent_pick,
+        confidence=confidence, frames=frames,
+        latency=getattr(result, 'latency', None),
+        reaction_latency=getattr(result, 'frame_latency', None) if getattr(result, 'reacted', False) else None,
+        strategy=strategy, vision_fps=fps)
+#end record round fn
+
 #Set the fixed window size (1024 x 600) before the App is run
 Window.size = (1024, 600)
 #Window.resizable = False 
 
+#countdown shown before every throw ("Shoot!" lands on the 4th tick)
+COUNTDOWN_STEPS = [
+    ("Rock", get_color_from_hex("F44336")), # Red
+    ("Paper", get_color_from_hex("F56D47")), # Orange 
+    ("Scissors", get_color_from_hex("FF9800")), # Yellow 
+    ("Shoot!", get_color_from_hex("78AD7F")) # Green 
+]
+
 class ScoreRow(MDGridLayout):
     #for properties of custom scoreboard widget
     handy_score = StringProperty('0')
@@ -49,7 +98,7 @@ class GameScreen(MDScreen):
     start_btn_text = StringProperty("Start")
     results_text = StringProperty("Press 'Start' to begin a new 3-round game.")
     
-    #paths for changing hand images
+    #names of the hand images (textures preloaded in app.gesture_textures, no file I/O per swap)
     handy_gesture = StringProperty('grey.png')
     opponent_gesture = StringProperty('grey.png')
     
@@ -57,13 +106,27 @@ class GameScreen(MDScreen):
     cd_text = StringProperty("")
     cd_colour= ListProperty(get_color_from_hex('444444')) 
     
+    #Handy's strategy and how each predictor has done
+    strategy_text = StringProperty("")
+    
+    #reaction ("cheat") mode: Handy throws after reading the user's shape
+    reaction_mode = BooleanProperty(False)
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.gestures = ['rock','paper','scissors']
         self.cd_step = 0
+        self.shoot_time = None
+        self.last_picks = (None, None)
+        #vision rounds pick and learn inside the gesture module; without it, here
+        self.strategy = gestures.strategy if gestures is not None else EnsembleStrategy()
+        self.strategy_text = self.strategy.summary_text()
     #end constructor
     
     def on_enter(self, *args):
+        if gestures is not None:
+            gestures.set_operating_mode('rps')
+        
         #reset scoreboard
         self.reset_game()
         
@@ -73,7 +136,9 @@ class GameScreen(MDScreen):
     #end on enter fn
     
     def det_round_outcome(self, handy_choice, opponent_choice):
-        if handy_choice == opponent_choice:
+        if opponent_choice not in self.gestures:
+            return 0,0, "Couldn't see your hand! It's a Draw!"
+        elif handy_choice == opponent_choice:
             return 0,0, "It's a Draw!"
         elif (handy_choice == 'rock' and opponent_choice == 'scissors') or (handy_choice == 'paper' and opponent_choice == 'rock') or (handy_choice == 'scissors' and opponent_choice == 'paper'):
             return 1, 0, "Handy Wins!"
@@ -81,20 +146,26 @@ class GameScreen(MDScreen):
             return 0,1, "Opponent Wins!"
     #end round outcome fn
     
-    def calc_round_winner(self):
+    def calc_round_winner(self, handy_choice=None, opponent_choice=None):
         """ --- FUNCTION FOR R,P,S GAME ---"""
         gestures = ['rock', 'paper', 'scissors']
         
-        # ~~~DELETE RANDOM SELECTION ~~#
-        # Randomly choose gestures for both players
-        handy_choice = random.choice(gestures)
-        opponent_choice = random.choice(gestures)
+        # Without a vision round, Handy's strategy picks and the opponent is random
+        if opponent_choice is None:
+            opponent_choice = random.choice(gestures)
+        if handy_choice is None:
+            handy_choice = self.strategy.pick_gesture()
+            self.strategy.update_gestures(opponent_choice, handy_choice)
         
         handy_score, opponent_score, message = self.det_round_outcome(handy_choice, opponent_choice)
+        self.last_picks = (handy_choice, opponent_choice)
         
         #Sset image paths
         self.handy_gesture = f'us_hand_{handy_choice}.png'
-        self.opponent_gesture = f'opp_hand_{opponent_choice}.png'
+        if opponent_choice in gestures:
+            self.opponent_gesture = f'opp_hand_{opponent_choice}.png'
+        else:
+            self.opponent_gesture = 'grey.png'
         
         return handy_score, opponent_score, message
     #end calc round winner fn
@@ -138,15 +209,14 @@ class GameScreen(MDScreen):
         self.cd_step = 0
         #Call update_cd every 1 second
         Clock.schedule_interval(self.update_cd, 1) 
+        
+        #vision runs at full rate through the countdown ("Shoot!" lands on the 4th tick)
+        if gestures is not None:
+            gestures.start_rps_window(5)
     #end start countdown fn
     
     def update_cd(self, dt):
-        cd_steps = [
-            ("Rock", get_color_from_hex("F44336")), # Red
-            ("Paper", get_color_from_hex("F56D47")), # Orange 
-            ("Scissors", get_color_from_hex("FF9800")), # Yellow 
-            ("Shoot!", get_color_from_hex("78AD7F")) # Green 
-        ]
+        cd_steps = COUNTDOWN_STEPS
 
         if self.cd_step < len(cd_steps):
             text, color = cd_steps[self.cd_step]
@@ -164,6 +234,13 @@ class GameScreen(MDScreen):
                 # Clear the images (set back to the background placeholder) on 'Shoot!'
                 self.handy_gesture = 'grey.png' 
                 self.opponent_gesture = 'grey.png'
+                
+                #timestamp the throw; the vision round votes on the frames around it
+                self.shoot_time = time.monotonic()
+                if gestures is not None and self.reaction_mode:
+                    gestures.RPS_reaction_async(self.shoot_time, callback=self.round_result_ready)
+                elif gestures is not None:
+                    gestures.RPS_mode_async(self.shoot_time, callback=self.round_result_ready)
             #update countdown counter
             self.cd_step += 1
         else:
@@ -173,12 +250,47 @@ class GameScreen(MDScreen):
             self.cd_text = "" 
             self.cd_colour = get_color_from_hex('444444')
             
-            #perform rps task
-            self.run_round_logic() 
+            #perform rps task (with the vision module, round_result_ready does this)
+            if gestures is None:
+                self.run_round_logic() 
     #end update countdown fn
     
-    def run_round_logic(self):
-        handy_score, opponent_score, message = self.calc_round_winner()
+    def round_result_ready(self, result):
+        #called from the round's timer thread, hop back onto the Kivy thread
+        Clock.schedule_once(lambda dt: self.finish_round(result))
+    #end round result ready fn
+    
+    def finish_round(self, result):
+        #result is ready before the countdown's last tick, so stop it here
+        Clock.unschedule(self.update_cd)
+        self.cd_text = ""
+        self.cd_colour = get_color_from_hex('444444')
+        
+        Logger.info(f"Handy: Round decided {result.latency * 1000:.0f} ms after Shoot! "
+                    f"({result.user_pick}, {result.frames} frames, {result.confidence:.0%} of the vote)")
+        self.run_round_logic(result.handy_pick, result.user_pick, result)
+        
+        #reaction rounds: how fast Handy read the hand and threw
+        if getattr(result, 'reacted', False):
+            Logger.info(f"Handy: Reacted {result.commit_latency * 1000:.0f} ms after Shoot!, "
+                        f"{result.frame_latency * 1000:.1f} ms frame to servo "
+                        f"({'within' if result.within_budget else 'over'} budget)")
+            self.results_text += f"\nHandy reacted in {result.commit_latency * 1000:.0f} ms"
+    #end finish round fn
+    
+    def toggle_reaction_mode(self):
+        self.reaction_mode = not self.reaction_mode
+        Logger.info(f"Handy: Reaction mode {'on' if self.reaction_mode else 'off'}.")
+    #end toggle reaction mode fn
+    
+    def run_round_logic(self, handy_choice=None, opponent_choice=None, result=None):
+        handy_score, opponent_score, message = self.calc_round_winner(handy_choice, opponent_choice)
+        
+        #keep the round (scores used to be lost at reset_game)
+        reaction = result is not None and hasattr(result, 'reacted')
+        handy_pick, opponent_pick = self.last_picks
+        record_round('reaction' if reaction else 'game', "Visitor", "Handy", opponent_pick, handy_pick,
+                     result, None if reaction else self.strategy.stats()['strategy'])
         
         #update scoreboard
         #MAKE NEW LIST TO UPDATE WHEN THERE'S A DRAW
@@ -186,6 +298,7 @@ class GameScreen(MDScreen):
         t_scoreboard[self.round] = [handy_score, opponent_score]
         self.scoreboard = t_scoreboard
         self.results_text = message
+        self.strategy_text = self.strategy.summary_text()
         
         self.round += 1
         
@@ -214,64 +327,294 @@ class GameScreen(MDScreen):
         self.ids.start_reset_button.disabled = False
     #end run round logic fn
 
+
+class TournamentScreen(MDScreen):
+    """TOURNAMENT SCREEN: visitors queue up, play each other side by side (or Handy)"""
+    
+    match_text = StringProperty("")
+    score_text = StringProperty("")
+    results_text = StringProperty("Add players, then press 'Start Tournament'.")
+    leaderboard_text = StringProperty("")
+    queue_text = StringProperty("Nobody waiting")
+    play_btn_text = StringProperty("Start Tournament")
+    
+    #countdown
+    cd_text = StringProperty("")
+    cd_colour = ListProperty(get_color_from_hex('444444'))
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tournament = Tournament()
+        self.gestures = ['rock','paper','scissors']
+        self.cd_step = 0
+        self.shoot_time = None
+        self.playing = False
+    #end constructor
+    
+    def on_enter(self, *args):
+        if gestures is not None:
+            gestures.set_operating_mode('tournament')
+        self.refresh()
+    #end on enter fn
+    
+    def add_player(self):
+        name = self.ids.player_name.text
+        pid = self.tournament.add_player(name)
+        self.ids.player_name.text = ""
+        Logger.info(f"Handy: {self.tournament.name(pid)} joined the queue.")
+        self.refresh()
+    #end add player fn
+    
+    def play(self):
+        if self.playing:
+            return
+        if not self.tournament.running:
+            if not self.tournament.start():
+                self.results_text = "Nobody is waiting to play."
+                return
+            Logger.info(f"Handy: Tournament started with {len(self.tournament.bracket)} players.")
+            self.results_text = "Left player stands on the left of the camera, right on the right."
+            self.refresh()
+            return
+        self.playing = True
+        self.ids.play_button.disabled = True
+        self.results_text = "..."
+        self.cd_step = 0
+        Clock.schedule_interval(self.update_cd, 1)
+        if gestures is not None:
+            gestures.start_rps_window(5)
+    #end play fn
+    
+    def update_cd(self, dt):
+        if self.cd_step < len(COUNTDOWN_STEPS):
+            self.cd_text, self.cd_colour = COUNTDOWN_STEPS[self.cd_step]
+            if self.cd_text == "Shoot!":
+                self.shoot_time = time.monotonic()
+                left, right = self.tournament.current_match()
+                if gestures is not None and right == HANDY:
+                    gestures.RPS_mode_async(self.shoot_time, callback=self.handy_result_ready)
+                elif gestures is not None:
+                    gestures.RPS_pair_async(self.shoot_time, callback=self.pair_result_ready)
+            self.cd_step += 1
+        else:
+            Clock.unschedule(self.update_cd)
+            self.cd_text = ""
+            self.cd_colour = get_color_from_hex('444444')
+            #no vision module: random throws
+            if gestures is None:
+                self.finish_round(random.choice(self.gestures), random.choice(self.gestures))
+    #end update countdown fn
+    
+    def handy_result_ready(self, result):
+        #timer thread -> Kivy thread; the player is on the left, Handy on the right
+        Clock.schedule_once(lambda dt: self.finish_round(result.user_pick, result.handy_pick, result))
+    #end handy result ready fn
+    
+    def pair_result_ready(self, result):
+        Clock.schedule_once(lambda dt: self.finish_round(*result.picks, result))
+    #end pair result ready fn
+    
+    def finish_round(self, left_pick, right_pick, result=None):
+        Clock.unschedule(self.update_cd)
+        self.cd_text = ""
+        self.cd_colour = get_color_from_hex('444444')
+        self.playing = False
+        self.ids.play_button.disabled = False
+        
+        tournament = self.tournament
+        left, right = tournament.current_match()
+        winner, match_winner = tournament.record_round(left_pick, right_pick)
+        record_round('tournament', tournament.name(left), tournament.name(right), left_pick, right_pick, result)
+        picks = f"{tournament.name(left)}: {left_pick} | {tournament.name(right)}: {right_pick}. "
+        if left_pick not in self.gestures or right_pick not in self.gestures:
+            message = picks + "Couldn't see both hands, play again!"
+        elif winner is None:
+            message = picks + "It's a Draw!"
+        else:
+            message = picks + f"{tournament.name((left, right)[winner])} wins the round!"
+        if match_winner is not None:
+            message += f"\n{tournament.name(match_winner)} wins the match!"
+            if tournament.champion is not None:
+                message += f"\n{tournament.name(tournament.champion)} is the champion!"
+        self.results_text = message
+        self.refresh()
+    #end finish round fn
+    
+    def refresh(self):
+        """Redraws the match, queue and leaderboard labels (only after a change, never per frame)."""
+        tournament = self.tournament
+        match = tournament.current_match()
+        if match is not None:
+            left, right = match
+            self.match_text = (f"Round {tournament.bracket_round}: {tournament.name(left)} (left) vs "
+                               f"{tournament.name(right)}" + (" (right)" if right != HANDY else ""))
+            self.score_text = f"{tournament.score[0]} : {tournament.score[1]}"
+            self.play_btn_text = "Play Round"
+        else:
+            self.match_text = "No match in progress"
+            self.score_text = ""
+            self.play_btn_text = "Start Tournament"
+        
+        waiting = len(tournament.waiting)
+        if waiting:
+            upcoming = ", ".join(tournament.name(pid) for pid in list(tournament.waiting)[:3])
+            self.queue_text = f"{waiting} waiting: {upcoming}" + ("..." if waiting > 3 else "")
+        else:
+            self.queue_text = "Nobody waiting"
+        
+        lines = [f"{i + 1}. {name}  {won}/{played} matches, {rounds} rounds"
+                 for i, (name, won, played, rounds) in enumerate(tournament.leaderboard(10))]
+        self.leaderboard_text = "\n".join(lines)
+    #end refresh fn
+
 class CameraFeed:
     def __init__(self):
-        self.capture = None
+        self.consumer = None
         self.texture= None
+        self.upload_buf = None #1-D writable copy of the frame, what Kivy's blit_buffer accepts
         self.is_running = False
+        self.image_widget = None
     #end constructor
     
     def start(self, image_widget):
         if not self.is_running:
-            self.capture = cv2.VideoCapture(0)
+            #frames the vision loop captured (shared memory when it runs in its own process)
+            #(never wait for the camera bridge here, that would freeze the UI at start-up)
+            if gestures is not None:
+                self.consumer = gestures.subscribe_frames(wait=False)
+            else:
+                self.consumer = get_capture_service(0).subscribe('latest')
             
-            if self.capture.isOpened():
+            if self.consumer.service.is_opened():
                 self.is_running = True
                 self.image_widget = image_widget
                 #update 1/30 of a second (30 FPS)
                 Clock.schedule_interval(self.update, 1.0 / 30.0)
             else:
-                Logger.error("Camera: Could not open video capture.")
-                self.stop()
+                #camera may still be starting (phone bridge), try again shortly
+                Logger.warning("Camera: Could not open video capture, retrying.")
+                self.consumer.close()
+                self.consumer = None
+                self.image_widget = image_widget
+                Clock.schedule_once(self.retry_start, 1.0)
     #end start camera fn
     
+    def retry_start(self, dt):
+        if not self.is_running and self.image_widget is not None:
+            self.start(self.image_widget)
+    #end retry start camera fn
+    
     def stop(self):
+        Clock.unschedule(self.retry_start)
         if self.is_running:
             Clock.unschedule(self.update)
-            self.capture.release()
+            self.consumer.close()
             
-            self.capture = None
+            self.consumer = None
             self.is_running = False
+            self.texture = None
+            self.upload_buf = None
             self.image_widget.texture = None # Clear image display
     #end stop camera fn
     
     def update(self, dt):
-        #update image texture/widget (dt = delta time anf ret = return val)
-        if self.is_running and self.capture.isOpened():
-            ret, frame = self.capture.read()
-            
-            if ret:
-                buf = cv2.flip(frame, -1).tobytes() #-1 = both x&y flips
-                
-                # Convert buffer to a texture
-                self.texture = Texture.create(
-                    size=(frame.shape[1], frame.shape[0]), 
-                    colorfmt='bgr'
-                )
-                self.texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
-                
-                #texture applied to kivy Image widget
-                self.image_widget.texture = self.texture
+        #update image texture/widget (dt = delta time)
+        if not self.is_running:
+            return
+        
+        #skip the upload entirely when no new frame arrived since the last tick
+        frame = self.consumer.poll()
+        if frame is None:
+            return
+        t = perf.now()
+        image = frame.image
+        size = (image.shape[1], image.shape[0])
+        
+        #texture is only created once per resolution
+        if self.texture is None or self.texture.size != size:
+            self.texture = Texture.create(size=size, colorfmt='rgb')
+            #flip both x&y with the texture coords instead of copying pixels (was cv2.flip(frame, -1))
+            self.texture.flip_vertical()
+            self.texture.flip_horizontal()
+            #blit_buffer wants a flat writable buffer, the shared ring slot is (h, w, 3) and read-only
+            self.upload_buf = np.empty(image.size, dtype=np.uint8)
+            #texture applied to kivy Image widget
+            self.image_widget.texture = self.texture
+        
+        #one copy into the reused buffer, no allocation per frame
+        np.copyto(self.upload_buf.reshape(image.shape), image)
+        self.texture.blit_buffer(self.upload_buf, colorfmt='rgb', bufferfmt='ubyte')
+        
+        self.image_widget.canvas.ask_update()
+        perf.lap('ui: texture upload', t)
+    #end update camera fn
     
     
 class MainScreen(MDScreen):
+    #gesture the vision thread currently sees
+    seen_gesture = StringProperty('unknown')
+    #why vision isn't running (worker crashed / stopped), '' while it is
+    vision_status = StringProperty('')
+    
+    #FPS/latency overlay (perf_stats)
+    show_perf = BooleanProperty(False)
+    perf_text = StringProperty('')
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        pass
+        self.last_seq = 0
+        #landmarks drawn over the camera preview (created once the kv ids exist)
+        self.overlay = None
+        #coalesces vision notifications into at most one UI update per frame
+        self.gesture_trigger = Clock.create_trigger(self.on_gesture_state)
+        if gestures is not None:
+            #runs on the vision thread: only schedule, never touch widgets here
+            gestures.gesture_state.subscribe(lambda snapshot: self.gesture_trigger())
+        if VISION_IN_PROCESS and gestures is not None:
+            #runs on the supervising thread: hop onto the Kivy thread
+            gestures.subscribe_status(lambda status, message: Clock.schedule_once(
+                lambda dt: self.set_vision_status(status, message)))
     #end constructor
     
+    def set_vision_status(self, status, message):
+        self.vision_status = '' if status == 'running' else message
+    #end vision status fn
+    
+    def toggle_perf(self):
+        #turns instrumentation and the overlay on/off together
+        self.show_perf = not self.show_perf
+        perf.enabled = self.show_perf
+        if gestures is not None:
+            gestures.set_perf_enabled(self.show_perf)
+        if self.show_perf:
+            Clock.schedule_interval(self.update_perf, 0.5)
+        else:
+            Clock.unschedule(self.update_perf)
+            self.perf_text = ''
+    #end toggle perf fn
+    
+    def update_perf(self, dt):
+        #vision stages are timed in the worker process when VISION_IN_PROCESS
+        worker = gestures.worker_perf if VISION_IN_PROCESS and gestures is not None else None
+        self.perf_text = perf.overlay_text(worker)
+    #end update perf fn
+    
+    def on_gesture_state(self, dt):
+        snapshot = gestures.gesture_state.latest()
+        #nothing new since last time, skip the redraw
+        if snapshot.seq == self.last_seq:
+            return
+        self.last_seq = snapshot.seq
+        if snapshot.gesture != self.seen_gesture:
+            self.seen_gesture = snapshot.gesture
+        if self.overlay is not None and self.manager.current == self.name:
+            self.overlay.update(snapshot.landmarks)
+    #end gesture state fn
+    
     #nav to main screen must delay start camera
     def on_enter(self, *args):
+        if gestures is not None:
+            gestures.set_operating_mode('idle')
         Clock.schedule_once(self.start_camera, 0)
     #end OPEN main screen fn
     
@@ -279,6 +622,8 @@ class MainScreen(MDScreen):
         if 'camera_image_widget' in self.ids:
             app = MDApp.get_running_app()
             app.camera_manager.start(self.ids.camera_image_widget)
+            if self.overlay is None:
+                self.overlay = LandmarkOverlay(self.ids.camera_image_widget)
         else:
             Logger.error("Camera: Couldn't find camera_image_widget ID in MainScreen")
     #end safely start cam fn
@@ -287,12 +632,14 @@ class MainScreen(MDScreen):
     def on_leave(self, *args):
         app = MDApp.get_running_app()
         app.camera_manager.stop()
+        if self.overlay is not None:
+            self.overlay.clear()
     #end CLOSE main screen fn
     
     def on_mimic_press(self):
         """--- FUNCTION TO MIMIC CAMERA'S HANDS ---"""
-        print("--- Mimic Mode Activated! (ADD OUR HAND MOVEY FUNCTION) ---")
-        # In a real application, you would add your program logic here.
+        if gestures is not None:
+            gestures.set_operating_mode('mimic')
         Logger.info("Handy: Mimic Mode function called.")
     #end mimic btn press fn
         
@@ -301,6 +648,84 @@ class MainScreen(MDScreen):
         self.manager.current = 'game'
         Logger.info("Handy: Swap to Game Screen.")
     #end game btn press fn
+    
+    def switch_to_tournament(self):
+        self.manager.current = 'tournament'
+        Logger.info("Handy: Swap to Tournament Screen.")
+    #end tournament btn press fn
+    
+    def switch_to_stats(self):
+        self.manager.current = 'stats'
+        Logger.info("Handy: Swap to Stats Screen.")
+    #end stats btn press fn
+
+
+class StatsScreen(MDScreen):
+    """SHOWCASE STATS: leaderboard, latency percentiles and one visitor's history (analytics_store)"""
+    
+    totals_text = StringProperty("")
+    leaderboard_text = StringProperty("")
+    latency_text = StringProperty("")
+    history_text = StringProperty("Enter a player name to see their rounds.")
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = {}
+    #end constructor
+    
+    def on_enter(self, *args):
+        self.refresh()
+    #end on enter fn
+    
+    def refresh(self):
+        #queries run on the analytics writer thread, results hop back with Clock
+        store = MDApp.get_running_app().analytics
+        self.when_done(store.totals(), self.show_totals)
+        self.when_done(store.leaderboard(10), self.show_leaderboard)
+        self.latency = {}
+        for mode in ('game', 'reaction', 'tournament'):
+            self.when_done(store.latency_percentiles(mode), lambda values, mode=mode: self.show_latency(mode, values))
+    #end refresh fn
+    
+    def lookup_player(self):
+        name = self.ids.stats_player.text.strip()
+        if name:
+            self.when_done(MDApp.get_running_app().analytics.player_history(name, 12),
+                           lambda rows: self.show_history(name, rows))
+    #end lookup player fn
+    
+    def when_done(self, future, show):
+        #called on the writer thread: only schedule, never touch widgets here
+        def done(f):
+            error = f.exception()
+            if error is None:
+                Clock.schedule_once(lambda dt: show(f.result()))
+            else:
+                Logger.warning(f"Handy: Stats query failed ({error})")
+                Clock.schedule_once(lambda dt: setattr(self, 'totals_text', f"Stats unavailable: {error}"))
+        future.add_done_callback(done)
+    #end when done fn
+    
+    def show_totals(self, totals):
+        self.totals_text = (f"{totals['rounds']} rounds ({totals['session_rounds']} this session), "
+                            f"{totals['players']} players. Handy won {totals['handy_wins']}, "
+                            f"lost {totals['handy_losses']}.")
+    
+    def show_leaderboard(self, rows):
+        self.leaderboard_text = "\n".join(f"{i + 1}. {name}  {wins} W / {losses} L / {draws} D"
+                                          for i, (name, wins, losses, draws, rounds) in enumerate(rows)) or "No rounds yet"
+    
+    def show_latency(self, mode, values):
+        if values:
+            self.latency[mode] = "  ".join(f"p{p} {ms:.0f} ms" for p, ms in values.items())
+        self.latency_text = "\n".join(f"{mode}: {text}" for mode, text in self.latency.items()) or "No rounds yet"
+    
+    def show_history(self, name, rows):
+        outcome = {1: "won", -1: "lost", 0: "draw"}
+        lines = [f"{time.strftime('%H:%M', time.localtime(t))} {mode} vs {opponent}: {mine} / {theirs}, {outcome[result]}"
+                 for t, mode, opponent, mine, theirs, result, latency in rows]
+        self.history_text = "\n".join(lines) if lines else f"No rounds for {name}"
+    #end show history fn
 
 
 
@@ -312,6 +737,18 @@ class HandyApp(MDApp):
         #load camera manager
         self.camera_manager = CameraFeed()
         
+        #round log (SQLite, written on its own thread)
+        self.analytics = AnalyticsStore()
+        
+        #decode + upload every hand picture once, before the screens bind to them
+        self.gesture_textures = TextureCache()
+        self.gesture_textures.load()
+        
+        #start the vision/servo loop (the thread supervises the worker process in VISION_IN_PROCESS mode)
+        if gestures is not None:
+            self.vision_thread = threading.Thread(target=gestures.main_servo_start, daemon=True)
+            self.vision_thread.start()
+        
         #bring in kivy designs
         return Builder.load_file("handymain.kv")                                          
     #end build fn
@@ -319,6 +756,15 @@ class HandyApp(MDApp):
     def on_stop(self):
         if hasattr(self, 'camera_manager'):
             self.camera_manager.stop()
+        if gestures is not None:
+            gestures.break_loop()
+        
+        #write out the rounds still queued
+        if hasattr(self, 'analytics'):
+            self.analytics.close()
+        
+        #save the stage timings collected this run
+        perf.dump()
             
         Logger.info("Handy: app will shutdown/stop")
         print("\nHandy is shutting down.")
@@ -0,0 +1,263 @@
+"""
+FILENAME: analytics_store.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Persistent record of every RPS round (who played, the throws, who won, the vote's
+             confidence, round/reaction latency, Handy's strategy, vision FPS) in an SQLite file
+             in WAL mode. Callers only put a tuple on a queue; one writer thread owns the
+             connection, writes in batched transactions and also runs the read queries, whose
+             results come back as Futures (so the Kivy thread never waits on the disk).
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    from kivy.logger import Logger
+except ImportError:     # benchmarks / tests without Kivy
+    Logger = logging.getLogger('handy')
+
+from rps_round import GESTURES
+from rps_strategy import OUTCOME
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'handy_analytics.db')
+BATCH_SIZE = 256        # rounds written per transaction at most
+FLUSH_INTERVAL = 0.5    # seconds a queued round may wait for more to batch with
+MAX_PENDING = 4096      # rounds kept for a retry while writes fail; older ones are dropped (and counted)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          INTEGER PRIMARY KEY,
+    started     REAL NOT NULL                   -- time.time()
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    id          INTEGER PRIMARY KEY,
+    session     INTEGER NOT NULL REFERENCES sessions(id),
+    time        REAL NOT NULL,                  -- time.time() the round was decided
+    mode        TEXT NOT NULL,                  -- 'game', 'reaction', 'tournament'
+    player      TEXT NOT NULL,
+    opponent    TEXT NOT NULL,                  -- 'Handy' or the other player
+    player_pick TEXT NOT NULL,                  -- gesture name or 'unknown'
+    opponent_pick TEXT NOT NULL,
+    result      INTEGER NOT NULL,               -- 1 player won, -1 opponent won, 0 draw / not seen
+    confidence  REAL,                           -- share of the vote the player's pick got
+    frames      INTEGER,                        -- recognised frames in the vote window
+    latency_ms  REAL,                           -- "Shoot!" -> round decided
+    reaction_ms REAL,                           -- reaction mode: deciding frame -> servo command
+    strategy    TEXT,                           -- Handy's strategy for the round
+    vision_fps  REAL
+);
+CREATE INDEX IF NOT EXISTS rounds_player ON rounds(player, time);
+CREATE INDEX IF NOT EXISTS rounds_latency ON rounds(mode, latency_ms);
+-- Running totals, so the leaderboard never has to scan the rounds
+CREATE TABLE IF NOT EXISTS players (
+    name        TEXT PRIMARY KEY,
+    rounds      INTEGER NOT NULL DEFAULT 0,
+    wins        INTEGER NOT NULL DEFAULT 0,
+    losses      INTEGER NOT NULL DEFAULT 0,
+    draws       INTEGER NOT NULL DEFAULT 0,
+    last_played REAL
+);
+CREATE INDEX IF NOT EXISTS players_wins ON players(wins DESC, rounds);
+"""
+
+ROUND_COLUMNS = ('time', 'mode', 'player', 'opponent', 'player_pick', 'opponent_pick', 'result',
+                 'confidence', 'frames', 'latency_ms', 'reaction_ms', 'strategy', 'vision_fps')
+
+_INSERT_ROUND = (f"INSERT INTO rounds (session, {', '.join(ROUND_COLUMNS)}) "
+                 f"VALUES (?, {', '.join('?' * len(ROUND_COLUMNS))})")
+_UPSERT_PLAYER = """
+INSERT INTO players (name, rounds, wins, losses, draws, last_played) VALUES (?, 1, ?, ?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET rounds = rounds + 1, wins = wins + excluded.wins,
+    losses = losses + excluded.losses, draws = draws + excluded.draws, last_played = excluded.last_played
+"""
+
+
+def round_result(player_pick, opponent_pick):
+    """1 if player_pick beats opponent_pick, -1 if it loses, 0 for a draw or an unseen hand."""
+    if player_pick not in GESTURES or opponent_pick not in GESTURES:
+        return 0
+    return int(OUTCOME[GESTURES.index(player_pick), GESTURES.index(opponent_pick)])
+
+
+class AnalyticsStore:
+    """SQLite round log with a background writer.
+
+    record_round() never blocks (it only queues). The writer thread batches queued rounds
+    into one transaction (at most BATCH_SIZE rounds / FLUSH_INTERVAL seconds), which with WAL
+    and synchronous=NORMAL keeps inserts cheap and constant-time however big the file gets.
+    Queries run on the same thread after the rounds queued before them, and return Futures.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.session = None
+        self.rounds_written = 0
+        self.rounds_dropped = 0
+        self.error = None       # why the database couldn't be opened (the store is then disabled)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='AnalyticsWriter', daemon=True)
+        self._thread.start()
+    #end constructor
+
+    # --- any thread ---
+
+    def record_round(self, mode, player, opponent, player_pick, opponent_pick, confidence=None,
+                     frames=None, latency=None, reaction_latency=None, strategy=None, vision_fps=None):
+        """Queues one decided round (latencies in seconds, as in the round results)."""
+        self._queue.put(('round', (
+            time.time(), mode, player, opponent, player_pick, opponent_pick,
+            round_result(player_pick, opponent_pick), confidence, frames,
+            latency * 1000.0 if latency is not None else None,
+            reaction_latency * 1000.0 if reaction_latency is not None else None,
+            strategy, vision_fps)))
+
+    def leaderboard(self, n=10):
+        """Future of [(name, wins, losses, draws, rounds), ...], most wins first."""
+        return self._query(lambda db: db.execute(
+            "SELECT name, wins, losses, draws, rounds FROM players WHERE name != 'Handy' "
+            "ORDER BY wins DESC, rounds LIMIT ?", (n,)).fetchall())
+
+    def player_history(self, player, n=20):
+        """Future of the player's last n rounds: [(time, mode, opponent, player_pick, opponent_pick,
+        result, latency_ms), ...], newest first."""
+        return self._query(lambda db: db.execute(
+            "SELECT time, mode, opponent, player_pick, opponent_pick, result, latency_ms FROM rounds "
+            "WHERE player = ? ORDER BY time DESC LIMIT ?", (player, n)).fetchall())
+
+    def latency_percentiles(self, mode, percentiles=(50, 90, 99)):
+        """Future of {percentile: latency_ms} over every round of `mode` (empty if none).
+
+        Read straight off the (mode, latency_ms) index in order, no sort.
+        """
+        def run(db):
+            count = db.execute("SELECT COUNT(*) FROM rounds WHERE mode = ? AND latency_ms IS NOT NULL",
+                               (mode,)).fetchone()[0]
+            values = {}
+            for p in percentiles if count else ():
+                offset = min(count - 1, int(count * p / 100.0))
+                values[p] = db.execute(
+                    "SELECT latency_ms FROM rounds WHERE mode = ? AND latency_ms IS NOT NULL "
+                    "ORDER BY latency_ms LIMIT 1 OFFSET ?", (mode, offset)).fetchone()[0]
+            return values
+        return self._query(run)
+
+    def totals(self):
+        """Future of {'rounds', 'players', 'session_rounds', 'handy_wins', 'handy_losses'}."""
+        def run(db):
+            rounds, = db.execute("SELECT COUNT(*) FROM rounds").fetchone()
+            players, = db.execute("SELECT COUNT(*) FROM players WHERE name != 'Handy'").fetchone()
+            session_rounds, = db.execute("SELECT COUNT(*) FROM rounds WHERE session = ?",
+                                         (self.session,)).fetchone()
+            handy = db.execute("SELECT wins, losses FROM players WHERE name = 'Handy'").fetchone() or (0, 0)
+            return {'rounds': rounds, 'players': players, 'session_rounds': session_rounds,
+                    'handy_wins': handy[0], 'handy_losses': handy[1]}
+        return self._query(run)
+
+    def flush(self):
+        """Future that completes once everything queued so far is on disk."""
+        return self._query(lambda db: None)
+
+    def close(self, timeout=2.0):
+        """Writes what is still queued and closes the database."""
+        self._queue.put(('stop', None))
+        self._thread.join(timeout)
+    #end close fn
+
+    # --- writer thread ---
+
+    def _query(self, fn):
+        future = Future()
+        self._queue.put(('query', (fn, future)))
+        return future
+
+    def _open(self):
+        db = sqlite3.connect(self.path)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            with db:
+                self.session = db.execute("INSERT INTO sessions (started) VALUES (?)", (time.time(),)).lastrowid
+        except sqlite3.Error:
+            db.close()
+            raise
+        return db
+
+    def _run(self):
+        try:
+            db = self._open()
+        except sqlite3.Error as e:
+            # read-only / locked file, unwritable directory: answer everything instead of dying
+            Logger.warning(f"Handy: Analytics disabled, can't open {self.path} ({e})")
+            self.error = e
+            self._run_disabled()
+            return
+
+        pending = []
+        while True:
+            try:
+                kind, item = self._queue.get(timeout=FLUSH_INTERVAL if pending else None)
+            except queue.Empty:
+                self._write(db, pending)
+                continue
+            if kind == 'round':
+                pending.append(item)
+                if len(pending) >= BATCH_SIZE:
+                    self._write(db, pending)
+                continue
+            # queries and stop see every round queued before them
+            self._write(db, pending)
+            if kind == 'stop':
+                self.rounds_dropped += len(pending)     # still failing at shutdown
+                break
+            fn, future = item
+            try:
+                future.set_result(fn(db))
+            except Exception as e:
+                future.set_exception(e)
+        db.close()
+    #end run fn
+
+    def _run_disabled(self):
+        """Without a database: rounds are counted as dropped, queries fail with the open error."""
+        while True:
+            kind, item = self._queue.get()
+            if kind == 'round':
+                self.rounds_dropped += 1
+            elif kind == 'query':
+                item[1].set_exception(self.error)
+            else:
+                return
+
+    def _write(self, db, pending):
+        if not pending:
+            return
+        players = []
+        for row in pending:
+            t, player, opponent, player_pick, opponent_pick, result = row[0], row[2], row[3], row[4], row[5], row[6]
+            # a round where a hand wasn't seen keeps its row (latency stats) but isn't a draw
+            if player_pick not in GESTURES or opponent_pick not in GESTURES:
+                continue
+            players.append((player, int(result > 0), int(result < 0), int(result == 0), t))
+            players.append((opponent, int(result < 0), int(result > 0), int(result == 0), t))
+        try:
+            with db:
+                db.executemany(_INSERT_ROUND, [(self.session,) + row for row in pending])
+                db.executemany(_UPSERT_PLAYER, players)
+        except sqlite3.Error as e:
+            # the transaction rolled back: keep the batch for the next write, up to MAX_PENDING
+            Logger.warning(f"Handy: Analytics write failed, will retry ({e})")
+            if len(pending) > MAX_PENDING:
+                dropped = len(pending) - MAX_PENDING
+                del pending[:dropped]
+                self.rounds_dropped += dropped
+            return
+        self.rounds_written += len(pending)
+        pending.clear()
+    #end write fn
@@ -0,0 +1,188 @@
+"""
+FILENAME: benchmark.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Offline benchmark of the gesture pipeline on a recorded (or synthetic) session.
+             Needs no camera, MediaPipe or serial port. Reports frames/s and p50/p99 latency
+             per stage (angles, classify, servo encode) and for the whole replayed pipeline,
+             and how far mimic targets trail the hand with and without motion prediction.
+
+Run:  python benchmark.py [recording.hlm] [--realtime] [--model=gesture_model.npz]
+      (no file = synthetic session; the model is also timed when its file exists)
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from gesture_classifier import load_classifier, DEFAULT_MODEL_PATH
+from gesture_filter import OneEuroFilter, MotionPredictor
+from hand_angles import joint_angles, NUM_LANDMARKS, NUM_ANGLES
+from landmark_recording import load_recording, synthetic_recording, replay
+from servo_calibration import ServoCalibration
+from servo_output import make_encoder, UPDATE_RATE_HZ, DEADBAND, SERVO_MIN, SERVO_MAX
+from vision_pipeline import GesturePipeline, shape, mimic_pose
+
+
+def _summary(name, samples_ns):
+    us = np.asarray(samples_ns, dtype=np.float64) / 1000.0
+    total = us.sum() / 1e6
+    return {
+        'stage': name,
+        'frames': len(us),
+        'fps': len(us) / total if total > 0 else float('inf'),
+        'p50_us': float(np.percentile(us, 50)),
+        'p99_us': float(np.percentile(us, 99)),
+    }
+
+
+def bench_stages(recording, classifier=None):
+    """Times each stage separately over every hand frame of the recording."""
+    points = np.array(recording['landmarks'][recording['has_hand'] == 1])
+    n = len(points)
+    t_angles, t_classify, t_model, t_text, t_binary = (np.empty(n, dtype=np.int64) for _ in range(5))
+    text, binary = make_encoder('text'), make_encoder('binary')
+    calibration = ServoCalibration()
+    clock = time.perf_counter_ns
+
+    for i in range(n):
+        t0 = clock()
+        angles = joint_angles(points[i])
+        t1 = clock()
+        shape(angles)
+        t2 = clock()
+        pose = mimic_pose(angles, calibration)
+        t3 = clock()
+        text(pose)
+        t4 = clock()
+        binary(pose)
+        t5 = clock()
+        t_angles[i], t_classify[i], t_text[i], t_binary[i] = t1 - t0, t2 - t1, t4 - t3, t5 - t4
+        if classifier is not None:
+            t0 = clock()
+            classifier.classify(points[i], angles)
+            t_model[i] = clock() - t0
+
+    results = [_summary('angles', t_angles), _summary('classify', t_classify),
+               _summary('servo encode (text)', t_text), _summary('servo encode (binary)', t_binary)]
+    if classifier is not None:
+        results.insert(2, _summary('classify (model)', t_model))
+
+    # whole session in one call, the offline replay path
+    t0 = clock()
+    joint_angles(points)
+    per_frame_us = (clock() - t0) / 1000.0 / max(n, 1)
+    results.append({'stage': 'angles, batched', 'frames': n, 'fps': 1e6 / per_frame_us,
+                    'p50_us': per_frame_us, 'p99_us': per_frame_us})
+    return results
+
+
+def scheduled_writes(timestamps, poses, rate_hz=UPDATE_RATE_HZ, deadband=DEADBAND, encoding='text'):
+    """(writes, bytes) ServoScheduler's policy makes of mimic targets set at these recording times:
+    at each write slot the latest target goes out unless it is within the deadband of the last one.
+    Worked out on the recording's clock, so it doesn't depend on how fast the replay ran."""
+    if not len(timestamps):
+        return 0, 0
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    poses = np.clip(np.asarray(poses), SERVO_MIN, SERVO_MAX).astype(np.int16)
+    encoder = make_encoder(encoding)
+    period = 1.0 / rate_hz
+    writes = nbytes = 0
+    last = None
+    next_write = -np.inf
+    i = 0
+    while i < len(poses):
+        # the writer wakes for target i, waits for its slot and takes whatever is newest by then
+        t = max(timestamps[i], next_write)
+        j = int(np.searchsorted(timestamps, t, side='right')) - 1
+        i = j + 1
+        if last is not None and np.abs(poses[j] - last).max() <= deadband:
+            continue
+        writes += 1
+        nbytes += len(encoder(poses[j]))
+        last = poses[j]
+        next_write = t + period
+    return writes, nbytes
+
+
+def bench_pipeline(recording, realtime=False, classifier=None):
+    """Replays the recording through GesturePipeline, collecting the mimic output with its timestamps."""
+    calibration = ServoCalibration()
+    targets, target_times = [], []
+    now = [0.0]
+
+    def mimic(hand_angles):
+        targets.append(mimic_pose(hand_angles, calibration))
+        target_times.append(now[0])
+
+    pipeline = GesturePipeline(mimic=mimic, classifier=classifier)
+
+    frame_ns = []
+    process = pipeline.process
+
+    def timed(seq, timestamp, points, mode):
+        now[0] = timestamp
+        t0 = time.perf_counter_ns()
+        result = process(seq, timestamp, points, mode)
+        frame_ns.append(time.perf_counter_ns() - t0)
+        return result
+
+    pipeline.process = timed
+    frames, elapsed = replay(recording, pipeline, realtime=realtime)
+
+    result = _summary('full pipeline', frame_ns)
+    result['wall_fps'] = frames / elapsed if elapsed > 0 else float('inf')
+    result['serial_writes'], result['serial_bytes'] = scheduled_writes(target_times, targets)
+    return result
+
+
+def bench_prediction(recording, lookahead):
+    """Mean error (degrees) between the mimic target and where the joints actually are
+    `lookahead` seconds later: holding the frame's angles vs. MotionPredictor's extrapolation."""
+    hand = recording['has_hand'] == 1
+    timestamps = np.array(recording['timestamp'][hand])
+    points = np.array(recording['landmarks'][hand])
+    landmark_filter = OneEuroFilter((NUM_LANDMARKS, 3))
+    predictor = MotionPredictor((NUM_ANGLES,), lookahead=lookahead)
+    angles = np.empty((len(points), NUM_ANGLES), dtype=np.float32)
+    predicted = np.empty_like(angles)
+    for i in range(len(points)):
+        # same path as live mimic: smoothed landmarks -> angles -> prediction
+        landmark_filter.filter(points[i], timestamps[i], out=points[i])
+        angles[i] = joint_angles(points[i])
+        predictor.predict(angles[i], timestamps[i], out=predicted[i])
+
+    future = np.column_stack([np.interp(timestamps + lookahead, timestamps, angles[:, j])
+                              for j in range(NUM_ANGLES)])
+    valid = timestamps + lookahead <= timestamps[-1]
+    return {
+        'lookahead_ms': lookahead * 1000,
+        'hold_error': float(np.abs(angles - future)[valid].mean()),
+        'predicted_error': float(np.abs(predicted - future)[valid].mean()),
+    }
+
+
+def main(argv):
+    realtime = '--realtime' in argv
+    paths = [a for a in argv if not a.startswith('--')]
+    model = next((a.split('=', 1)[1] for a in argv if a.startswith('--model=')), DEFAULT_MODEL_PATH)
+    recording = load_recording(paths[0]) if paths else synthetic_recording()
+    classifier = load_classifier(model)
+    print(f"{len(recording)} frames ({'file ' + paths[0] if paths else 'synthetic'})"
+          + (f", model {model}" if classifier is not None else ""))
+
+    for r in bench_stages(recording, classifier) + [bench_pipeline(recording, realtime, classifier)]:
+        line = f"{r['stage']:>24}: {r['fps']:10.0f} frames/s | p50 {r['p50_us']:8.1f} us | p99 {r['p99_us']:8.1f} us"
+        if 'serial_writes' in r:
+            line += f" | {r['serial_writes']} servo writes, {r['serial_bytes']} B"
+        print(line)
+
+    for lookahead in (0.05, 0.1, 0.15):
+        r = bench_prediction(recording, lookahead)
+        print(f"{'mimic lag error':>24}: {r['lookahead_ms']:.0f} ms ahead | hold {r['hold_error']:.1f} deg"
+              f" | predicted {r['predicted_error']:.1f} deg")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,225 @@
+"""
+FILENAME: camera_service.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: One shared camera capture service. Owns the camera source, converts every frame once
+             to RGB into a ring of preallocated buffers and hands read-only views to any number
+             of consumers (Kivy preview, hand tracker, recorder).
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from camera_sources import make_source, frame_size, to_rgb
+
+# seq = frame sequence number (starts at 1), timestamp = time.monotonic() at capture,
+# image = (h, w, 3) uint8 RGB
+Frame = namedtuple('Frame', ['seq', 'timestamp', 'image'])
+
+RING_SIZE = 4
+
+
+class FrameConsumer:
+    """A reader attached to the CaptureService.
+
+    mode 'latest': read() returns the newest frame not seen yet (older ones are skipped).
+    mode 'every':  read() returns frames in order; if the consumer falls more than the ring
+                   size behind, it jumps ahead and the skipped frames are counted in `dropped`.
+
+    Frames are zero-copy views into the ring. A view stays valid until the ring wraps around
+    (RING_SIZE - 1 newer frames), so copy it if it has to be kept longer than that.
+    """
+
+    def __init__(self, service, mode):
+        if mode not in ('latest', 'every'):
+            raise ValueError(f"Unknown consumer mode: {mode}")
+        self.service = service
+        self.mode = mode
+        self.last_seq = 0
+        self.dropped = 0
+        self.closed = False
+    #end constructor
+
+    def read(self, timeout=None):
+        """Waits for a new frame (timeout in seconds, None = forever). Returns a Frame or None."""
+        return self.service._next_frame(self, timeout)
+
+    def poll(self):
+        """Non-blocking read, returns None when no new frame has arrived."""
+        return self.service._next_frame(self, 0)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.service._unsubscribe(self)
+    #end close fn
+
+
+class CaptureService:
+    """Owns a camera source (see camera_sources.make_source) and a capture thread that fills
+    the frame ring."""
+
+    def __init__(self, device=0, ring_size=RING_SIZE):
+        self.device = device
+        self.source = make_source(device)
+        self.ring_size = ring_size
+        self.is_running = False
+
+        self._ring = None        # (ring_size, h, w, 3) uint8, allocated on the first frame
+        self._views = None       # read-only views into _ring, one per slot
+        self._timestamps = [0.0] * ring_size
+        self._seq = 0            # seq of the newest completed frame
+        self._consumers = []
+        self._cond = threading.Condition()
+        self._thread = None
+    #end constructor
+
+    # --- CONSUMER API ---
+
+    def subscribe(self, mode='latest'):
+        """Attaches a new consumer and starts the device if it isn't running yet."""
+        consumer = FrameConsumer(self, mode)
+        with self._cond:
+            consumer.last_seq = self._seq
+            self._consumers.append(consumer)
+            if not self.is_running:
+                self._start()
+        return consumer
+
+    def _unsubscribe(self, consumer):
+        with self._cond:
+            if consumer in self._consumers:
+                self._consumers.remove(consumer)
+            last_one = not self._consumers
+            self._cond.notify_all()
+        # The device is released once nobody is reading from it any more
+        if last_one:
+            self.stop()
+
+    def _next_frame(self, consumer, timeout):
+        with self._cond:
+            if consumer.closed:
+                return None
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._seq <= consumer.last_seq:
+                if consumer.closed or not self.is_running:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            if consumer.mode == 'latest':
+                seq = self._seq
+            else:
+                seq = consumer.last_seq + 1
+                oldest = self._seq - self.ring_size + 1
+                if seq < oldest:
+                    consumer.dropped += oldest - seq
+                    seq = oldest
+
+            consumer.last_seq = seq
+            slot = seq % self.ring_size
+            return Frame(seq, self._timestamps[slot], self._views[slot])
+
+    # --- DEVICE / CAPTURE THREAD ---
+
+    def is_opened(self):
+        return self.is_running and self.source.is_opened()
+
+    def _start(self):
+        if not self.source.open():
+            print(f"Camera: Could not open video capture {self.source}.")
+            self.source.release()
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._capture_loop, name='CaptureService', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the capture thread and releases the device."""
+        with self._cond:
+            if not self.is_running:
+                return
+            self.is_running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        self.source.release()
+    #end stop fn
+
+    def _allocate(self, shape):
+        self._ring = np.empty((self.ring_size,) + shape, dtype=np.uint8)
+        self._views = []
+        for slot in range(self.ring_size):
+            view = self._ring[slot].view()
+            view.flags.writeable = False
+            self._views.append(view)
+
+    def _capture_loop(self):
+        try:
+            self._capture_frames()
+        except Exception as e:
+            # e.g. a driver buffer that doesn't match its pixel format: close the service the
+            # same way the end of a file does, so consumers stop waiting instead of spinning
+            print(f"Camera: Capture from {self.source} failed: {e!r}")
+            with self._cond:
+                self.is_running = False
+                self._cond.notify_all()
+    #end capture loop fn
+
+    def _capture_frames(self):
+        source = self.source
+        min_period = 1.0 / source.max_fps if source.max_fps else 0.0
+        last_kept = 0.0
+        while self.is_running:
+            slot = (self._seq + 1) % self.ring_size
+            if not source.grab():
+                if not source.is_opened():
+                    # End of a file / image sequence: consumers see the service close
+                    with self._cond:
+                        self.is_running = False
+                        self._cond.notify_all()
+                    return
+                time.sleep(0.005)
+                continue
+            timestamp = time.monotonic()
+            # FPS cap: frames over the cap are grabbed but never decoded or converted
+            if min_period and timestamp - last_kept < min_period:
+                continue
+            native = source.retrieve()
+            if native is None:
+                continue
+            last_kept = timestamp
+
+            w, h = frame_size(native, source.pixel_format)
+            if self._ring is None or self._ring.shape[1:] != (h, w, 3):
+                with self._cond:
+                    # First frame or resolution change: (re)allocate the ring
+                    self._allocate((h, w, 3))
+            # The one colour conversion, straight from the native format into the slot buffer
+            image = to_rgb(native, source.pixel_format, out=self._ring[slot])
+            with self._cond:
+                if not np.shares_memory(image, self._ring[slot]):
+                    np.copyto(self._ring[slot], image)
+                self._timestamps[slot] = timestamp
+                self._seq += 1
+                self._cond.notify_all()
+    #end capture frames fn
+
+
+# --- SHARED INSTANCE ---
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_capture_service(device=0):
+    """Returns the process-wide CaptureService for `device`, creating it on first use."""
+    with _services_lock:
+        if device not in _services:
+            _services[device] = CaptureService(device)
+        return _services[device]
@@ -0,0 +1,354 @@
+"""
+FILENAME: camera_sources.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Where CaptureService gets its frames from: a V4L2 device, a video file or stream URL,
+             a directory of images, or frames generated in-process. Sources hand over frames in
+             their native pixel format (BGR, gray, YUYV, NV12, I420) and to_rgb() converts them
+             exactly once, straight into the capture ring.
+"""
+
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+# Native pixel format -> cv2.cvtColor code to RGB (None = already RGB)
+RGB_CONVERSIONS = {
+    'rgb': None,
+    'bgr': cv2.COLOR_BGR2RGB,
+    'gray': cv2.COLOR_GRAY2RGB,
+    'yuyv': cv2.COLOR_YUV2RGB_YUY2,
+    'nv12': cv2.COLOR_YUV2RGB_NV12,
+    'yuv420p': cv2.COLOR_YUV2RGB_I420,
+}
+
+# V4L2 FOURCCs to ask the driver for, per native format ('bgr' lets OpenCV decode)
+V4L2_FOURCC = {
+    'gray': 'GREY',
+    'yuyv': 'YUYV',
+    'nv12': 'NV12',
+    'yuv420p': 'YU12',
+}
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def frame_size(image, pixel_format):
+    """(width, height) of the picture held in a native-format buffer."""
+    if pixel_format in ('nv12', 'yuv420p'):
+        return image.shape[1], image.shape[0] * 2 // 3
+    return image.shape[1], image.shape[0]
+
+
+def to_rgb(image, pixel_format, out=None):
+    """Converts one native-format frame to (h, w, 3) RGB, into `out` when it fits."""
+    code = RGB_CONVERSIONS[pixel_format]
+    if code is None:
+        if out is None:
+            return image
+        np.copyto(out, image)
+        return out
+    if out is None:
+        return cv2.cvtColor(image, code)
+    return cv2.cvtColor(image, code, dst=out)
+
+
+class CameraSource:
+    """Base class: the same grab()/retrieve() split as cv2.VideoCapture.
+
+    grab() waits for/advances to the next frame without decoding it (so frames dropped by
+    an FPS cap cost almost nothing) and retrieve() returns it in `pixel_format`.
+    max_fps caps the delivered rate (None = as fast as the source goes).
+    """
+
+    pixel_format = 'bgr'
+
+    def __init__(self, max_fps=None):
+        self.max_fps = max_fps
+    #end constructor
+
+    def open(self):
+        return True
+
+    def is_opened(self):
+        return True
+
+    def grab(self):
+        raise NotImplementedError
+
+    def retrieve(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.describe()})"
+
+    def describe(self):
+        return ''
+
+
+class V4L2Source(CameraSource):
+    """A camera device through OpenCV's V4L2 backend.
+
+    pixel_format 'bgr' lets OpenCV decode to BGR; 'yuyv' / 'nv12' / 'yuv420p' / 'gray' ask the
+    driver for that format and turn OpenCV's conversion off, so to_rgb() is the only one.
+    width/height/fps are requests, the driver picks the nearest mode it supports.
+    """
+
+    def __init__(self, device=0, width=None, height=None, fps=None, pixel_format='bgr', max_fps=None):
+        super().__init__(max_fps)
+        if pixel_format not in RGB_CONVERSIONS or pixel_format == 'rgb':
+            raise ValueError(f"V4L2 can't deliver pixel format {pixel_format}")
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pixel_format = pixel_format
+        self.capture = None
+        self._raw_shape = None
+    #end constructor
+
+    def describe(self):
+        return f"{self.device}, {self.pixel_format}"
+
+    def open(self):
+        self.capture = cv2.VideoCapture(self.device, cv2.CAP_V4L2)
+        if not self.capture.isOpened():
+            self.capture.release()
+            self.capture = None
+            return False
+        if self.pixel_format != 'bgr':
+            self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*V4L2_FOURCC[self.pixel_format]))
+            self.capture.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        if self.width:
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            self.capture.set(cv2.CAP_PROP_FPS, self.fps)
+        if self.pixel_format != 'bgr':
+            # Unconverted frames come back as one flat row of bytes, give them their real shape
+            w = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+            h = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self._raw_shape = {'gray': (h, w), 'yuyv': (h, w, 2)}.get(self.pixel_format, (h * 3 // 2, w))
+        return True
+
+    def is_opened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def grab(self):
+        return self.capture.grab()
+
+    def retrieve(self):
+        ok, image = self.capture.retrieve()
+        if not ok or image is None:
+            return None
+        if self._raw_shape is not None and image.shape != self._raw_shape:
+            image = image.reshape(self._raw_shape)
+        return image
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class VideoFileSource(CameraSource):
+    """A video file, or a stream URL OpenCV/FFmpeg can open directly (e.g. the phone camera's
+    http://.../video, without going through ffmpeg and a v4l2loopback device).
+
+    realtime=True paces a file at its own frame rate; streams are never paced.
+    """
+
+    def __init__(self, path, loop=False, realtime=True, max_fps=None):
+        super().__init__(max_fps)
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime and '://' not in path
+        self.capture = None
+        self._period = 0.0
+        self._next_time = 0.0
+    #end constructor
+
+    def describe(self):
+        return self.path
+
+    def open(self):
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            self.capture.release()
+            self.capture = None
+            return False
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self._period = 1.0 / fps if self.realtime and fps > 0 else 0.0
+        self._next_time = time.monotonic()
+        return True
+
+    def is_opened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def grab(self):
+        if self._period:
+            delay = self._next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time + self._period, time.monotonic() - self._period)
+        if self.capture.grab():
+            return True
+        if self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            return self.capture.grab()
+        self.release()   # end of file
+        return False
+
+    def retrieve(self):
+        ok, image = self.capture.retrieve()
+        return image if ok else None
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class ImageDirectorySource(CameraSource):
+    """Image files of a directory in name order, played at `fps`. pixel_format 'gray' reads
+    them as grayscale."""
+
+    def __init__(self, path, fps=30.0, loop=False, pixel_format='bgr', max_fps=None):
+        super().__init__(max_fps)
+        if pixel_format not in ('bgr', 'gray'):
+            raise ValueError(f"Image files are read as bgr or gray, not {pixel_format}")
+        self.path = path
+        self.fps = fps
+        self.loop = loop
+        self.pixel_format = pixel_format
+        self.files = []
+        self._index = -1
+        self._next_time = 0.0
+    #end constructor
+
+    def describe(self):
+        return self.path
+
+    def open(self):
+        self.files = sorted(f for f in glob.glob(os.path.join(self.path, '*'))
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        self._index = -1
+        self._next_time = time.monotonic()
+        return bool(self.files)
+
+    def is_opened(self):
+        return bool(self.files)
+
+    def grab(self):
+        if self.fps:
+            delay = self._next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time + 1.0 / self.fps, time.monotonic())
+        self._index += 1
+        if self._index >= len(self.files):
+            if not self.loop:
+                self.files = []
+                return False
+            self._index = 0
+        return True
+
+    def retrieve(self):
+        flag = cv2.IMREAD_GRAYSCALE if self.pixel_format == 'gray' else cv2.IMREAD_COLOR
+        return cv2.imread(self.files[self._index], flag)
+
+    def release(self):
+        self.files = []
+
+
+class GeneratorSource(CameraSource):
+    """Frames from any iterable of arrays (tests, synthetic scenes, another capture library).
+
+    fps paces the frames (None = as fast as the iterable yields them).
+    """
+
+    def __init__(self, frames, pixel_format='bgr', fps=None, max_fps=None):
+        super().__init__(max_fps)
+        if pixel_format not in RGB_CONVERSIONS:
+            raise ValueError(f"Unknown pixel format: {pixel_format}")
+        self.frames = frames
+        self.pixel_format = pixel_format
+        self.fps = fps
+        self._iter = None
+        self._current = None
+        self._next_time = 0.0
+    #end constructor
+
+    def describe(self):
+        return self.pixel_format
+
+    def open(self):
+        self._iter = iter(self.frames)
+        self._next_time = time.monotonic()
+        return True
+
+    def is_opened(self):
+        return self._iter is not None
+
+    def grab(self):
+        if self._iter is None:
+            return False
+        if self.fps:
+            delay = self._next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time + 1.0 / self.fps, time.monotonic())
+        self._current = next(self._iter, None)
+        if self._current is None:
+            self._iter = None
+            return False
+        return True
+
+    def retrieve(self):
+        return self._current
+
+    def release(self):
+        self._iter = None
+        self._current = None
+
+
+def make_source(spec):
+    """Builds a source from a CameraSource, a device number or a 'backend:argument' string.
+
+        0 / 'v4l2:0' / 'v4l2:/dev/video0'    camera device (BGR decoded by OpenCV)
+        'v4l2:/dev/video0?format=yuyv&width=640&height=480&fps=30&max_fps=15'
+        'file:clip.mp4?loop=1'               video file ('realtime=0' runs it flat out)
+        'url:http://10.178.3.190:4747/video' network stream, opened directly
+        'dir:frames/?fps=30&format=gray'     image sequence
+    """
+    if isinstance(spec, CameraSource):
+        return spec
+    if isinstance(spec, int):
+        return V4L2Source(spec)
+
+    backend, _, rest = str(spec).partition(':')
+    target, _, query = rest.partition('?')
+    options = dict(item.split('=', 1) for item in query.split('&') if '=' in item)
+
+    def number(name, kind=int):
+        return kind(options[name]) if name in options else None
+
+    max_fps = number('max_fps', float)
+    if backend == 'v4l2':
+        device = int(target) if target.isdigit() else target
+        return V4L2Source(device, width=number('width'), height=number('height'), fps=number('fps', float),
+                          pixel_format=options.get('format', 'bgr'), max_fps=max_fps)
+    if backend in ('file', 'url'):
+        return VideoFileSource(rest if backend == 'url' else target, loop=options.get('loop') == '1',
+                               realtime=options.get('realtime', '1') == '1', max_fps=max_fps)
+    if backend == 'dir':
+        return ImageDirectorySource(target, fps=number('fps', float) or 30.0, loop=options.get('loop') == '1',
+                                    pixel_format=options.get('format', 'bgr'), max_fps=max_fps)
+    raise ValueError(f"Unknown camera source: {spec}")
@@ -0,0 +1,152 @@
+"""
+FILENAME: fake_servo_controller.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Pseudo-terminal (pty) stand-in for the servo microcontroller. Decodes the text and
+             binary servo frames so both encodings can be benchmarked on a plain Linux box.
+
+Run:  python fake_servo_controller.py [frames]
+"""
+
+import os
+import sys
+import threading
+import time
+import tty
+
+import numpy as np
+
+from servo_output import (BINARY_HEADER, BINARY_FRAME_SIZE, decode_binary, decode_text,
+                          make_encoder)
+
+UART_BAUD = 115200
+UART_BITS_PER_BYTE = 10   # 8N1: start + 8 data + stop
+
+
+class FakeServoController:
+    """Opens a pty pair; `port` is the device path to hand to serial.Serial / the scheduler.
+
+    Every decoded frame is stored in `received` as (time.monotonic(), [5 angles]).
+    Frames that fail to parse (bad text line, bad header or checksum) are counted in `errors`.
+    """
+
+    def __init__(self):
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)   # no echo, no newline translation
+        self.port = os.ttyname(self.slave_fd)
+        self.received = []
+        self.errors = 0
+        self._running = False
+        self._thread = None
+    #end constructor
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._read_loop, name='FakeServoController', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        os.close(self.slave_fd)   # wakes the reader with EIO/EOF
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        os.close(self.master_fd)
+    #end stop fn
+
+    def _read_loop(self):
+        buf = bytearray()
+        while self._running:
+            try:
+                chunk = os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            if not chunk:
+                break
+            now = time.monotonic()
+            buf += chunk
+            self._parse(buf, now)
+
+    def _parse(self, buf, now):
+        # Same framing rules as the microcontroller: binary frames start with the header,
+        # anything else is a text line up to '\n'
+        while buf:
+            if buf[:1] == BINARY_HEADER[:1]:
+                if len(buf) < BINARY_FRAME_SIZE:
+                    return
+                angles = decode_binary(buf[:BINARY_FRAME_SIZE])
+                if angles is None:
+                    # lost sync: drop one byte and look for the next header
+                    self.errors += 1
+                    del buf[:1]
+                    continue
+                del buf[:BINARY_FRAME_SIZE]
+            else:
+                end = buf.find(b'\n')
+                if end < 0:
+                    return
+                try:
+                    angles = decode_text(bytes(buf[:end + 1]))
+                except ValueError:
+                    angles = None
+                    self.errors += 1
+                del buf[:end + 1]
+                if angles is None:
+                    continue
+            self.received.append((now, angles))
+    #end parse fn
+
+
+def benchmark(encoding, frames=2000):
+    """Writes `frames` random poses through the pty and measures encode+write throughput,
+    per-frame write-to-decode latency and the equivalent on-the-wire time at 115200 baud."""
+    controller = FakeServoController().start()
+    encoder = make_encoder(encoding)
+    poses = np.random.randint(0, 181, size=(frames, 5))
+    sent_at = np.empty(frames)
+    n_bytes = 0
+
+    with open(controller.port, 'wb', buffering=0) as ser:
+        start = time.monotonic()
+        for i in range(frames):
+            data = encoder(poses[i])
+            n_bytes += len(data)
+            sent_at[i] = time.monotonic()
+            ser.write(data)
+            # pace the writes a little so the pty buffer never fills up
+            if i % 64 == 63:
+                time.sleep(0.001)
+        elapsed = time.monotonic() - start
+
+        deadline = time.monotonic() + 2.0
+        while len(controller.received) < frames and time.monotonic() < deadline:
+            time.sleep(0.01)
+    controller.stop()
+
+    received = controller.received
+    ok = all(list(poses[i]) == received[i][1] for i in range(len(received)))
+    latency_us = (np.array([r[0] for r in received]) - sent_at[:len(received)]) * 1e6
+    bytes_per_frame = n_bytes / frames
+    return {
+        'encoding': encoding,
+        'frames': frames,
+        'received': len(received),
+        'errors': controller.errors,
+        'decoded_ok': ok,
+        'bytes_per_frame': bytes_per_frame,
+        'write_fps': frames / elapsed,
+        'latency_p50_us': float(np.percentile(latency_us, 50)) if len(received) else float('nan'),
+        'latency_p99_us': float(np.percentile(latency_us, 99)) if len(received) else float('nan'),
+        'uart_max_fps': UART_BAUD / (UART_BITS_PER_BYTE * bytes_per_frame),
+    }
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for encoding in ('text', 'binary'):
+        r = benchmark(encoding, n)
+        print(f"{r['encoding']:>6}: {r['bytes_per_frame']:5.1f} B/frame | "
+              f"write {r['write_fps']:9.0f} frames/s | "
+              f"latency p50 {r['latency_p50_us']:7.1f} us p99 {r['latency_p99_us']:7.1f} us | "
+              f"UART limit {r['uart_max_fps']:6.0f} frames/s | "
+              f"received {r['received']}/{r['frames']} errors {r['errors']} ok {r['decoded_ok']}")
@@ -0,0 +1,188 @@
+"""
+FILENAME: gesture_classifier.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Learned per-frame gesture classifier. A tiny pure-NumPy MLP (no hidden layer =
+             softmax regression) on joint angles plus fingertip distances, with its weights in
+             an .npz file. classify() returns the same codes as vision_pipeline.shape() and a
+             confidence, and uses preallocated buffers only (tens of microseconds per frame).
+             Trained from landmark recordings by train_classifier.py.
+"""
+
+import os
+
+import numpy as np
+
+from hand_angles import NUM_ANGLES
+
+# Same codes as vision_pipeline.shape()
+CLASS_NAMES = ('rock', 'paper', 'scissors', 'middle', 'other')
+UNCLEAR = CLASS_NAMES.index('other')
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gesture_model.npz')
+MIN_CONFIDENCE = 0.6     # below this a frame counts as UNCLEAR
+
+# Feature vector: 15 joint angles / 180, then each fingertip's distance from the wrist in palm
+# lengths (wrist -> middle MCP), fingers in hand_angles.FINGERS order
+TIPS = np.array([8, 12, 16, 20, 4], dtype=np.intp)
+NUM_FEATURES = NUM_ANGLES + len(TIPS)
+_DIST_ROWS = np.append(TIPS, 9)     # fingertips, then the middle MCP for the palm length
+
+
+def features(points, angles, out=None, work=None):
+    """Feature vector(s) from (21, 3) landmarks and (15,) angles, or (N, 21, 3) and (N, 15).
+
+    work: optional (d, dist) scratch arrays shaped (..., 6, 3) and (..., 6) float32; with
+    them and out nothing is allocated (the per-frame path).
+    """
+    points = np.asarray(points, dtype=np.float32)
+    batch = points.shape[:-2]
+    if out is None:
+        out = np.empty(batch + (NUM_FEATURES,), dtype=np.float32)
+    if work is None:
+        work = (np.empty(batch + (len(_DIST_ROWS), 3), dtype=np.float32),
+                np.empty(batch + (len(_DIST_ROWS),), dtype=np.float32))
+    d, dist = work
+    np.multiply(angles, 1.0 / 180.0, out=out[..., :NUM_ANGLES])
+    np.take(points, _DIST_ROWS, axis=-2, out=d)
+    d -= points[..., :1, :]
+    d *= d
+    np.sum(d, axis=-1, out=dist)
+    np.sqrt(dist, out=dist)
+    np.maximum(dist[..., -1:], 1e-6, out=dist[..., -1:])
+    np.divide(dist[..., :-1], dist[..., -1:], out=out[..., NUM_ANGLES:])
+    return out
+
+
+class MLPClassifier:
+    """Standardise -> (Dense + ReLU) * hidden layers -> Dense -> softmax.
+
+    layers: list of (W, b) with W shaped (inputs, outputs), trained on standardised features.
+    """
+
+    def __init__(self, mean, scale, layers, min_confidence=MIN_CONFIDENCE):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.layers = [(np.asarray(W, dtype=np.float32), np.asarray(b, dtype=np.float32)) for W, b in layers]
+        self.min_confidence = min_confidence
+        # Standardisation folded into the first layer: (x - mean) / scale @ W + b == x @ W' + b'
+        W, b = self.layers[0]
+        self._layers = [((W / self.scale[:, None]).astype(np.float32),
+                         (b - (self.mean / self.scale) @ W).astype(np.float32))] + self.layers[1:]
+        # per-frame scratch buffers
+        self._x = np.empty(NUM_FEATURES, dtype=np.float32)
+        self._work = (np.empty((len(_DIST_ROWS), 3), dtype=np.float32), np.empty(len(_DIST_ROWS), dtype=np.float32))
+        self._h = [np.empty(W.shape[1], dtype=np.float32) for W, _ in self.layers]
+    #end constructor
+
+    def predict_proba(self, X):
+        """(N, NUM_FEATURES) features -> (N, classes) probabilities (batched, for training/eval)."""
+        h = np.asarray(X, dtype=np.float32)
+        for i, (W, b) in enumerate(self._layers):
+            h = h @ W + b
+            if i < len(self._layers) - 1:
+                np.maximum(h, 0, out=h)
+        h -= h.max(axis=1, keepdims=True)
+        np.exp(h, out=h)
+        h /= h.sum(axis=1, keepdims=True)
+        return h
+
+    def classify(self, points, angles):
+        """One frame -> (code, confidence). Low-confidence frames come back as UNCLEAR."""
+        x = features(points, angles, out=self._x, work=self._work)
+        last = len(self._layers) - 1
+        for i, (W, b) in enumerate(self._layers):
+            h = self._h[i]
+            np.dot(x, W, out=h)
+            h += b
+            if i < last:
+                np.maximum(h, 0, out=h)
+            x = h
+        # softmax, only the winner's probability is needed
+        code = int(x.argmax())
+        x -= x[code]
+        np.exp(x, out=x)
+        confidence = float(1.0 / x.sum())
+        if confidence < self.min_confidence:
+            return UNCLEAR, confidence
+        return code, confidence
+
+    def classify_batch(self, points, angles):
+        """Every hand of a frame at once: (N, 21, 3), (N, 15) -> codes (N,) int8, confidences (N,)."""
+        probs = self.predict_proba(features(points, angles))
+        codes = probs.argmax(axis=1).astype(np.int8)
+        confidences = probs[np.arange(len(probs)), codes]
+        codes[confidences < self.min_confidence] = UNCLEAR
+        return codes, confidences
+
+    def save(self, path):
+        arrays = {'mean': self.mean, 'scale': self.scale, 'num_layers': np.array(len(self.layers)),
+                  'num_features': np.array(NUM_FEATURES)}
+        for i, (W, b) in enumerate(self.layers):
+            arrays[f'W{i}'] = W
+            arrays[f'b{i}'] = b
+        np.savez(path, **arrays)
+    #end save fn
+
+
+def load_classifier(path=DEFAULT_MODEL_PATH, min_confidence=MIN_CONFIDENCE):
+    """Loads a saved MLPClassifier, or returns None when there is no model file."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        if int(data['num_features']) != NUM_FEATURES:
+            raise ValueError(f"{path} was trained on a different feature layout")
+        layers = [(data[f'W{i}'], data[f'b{i}']) for i in range(int(data['num_layers']))]
+        return MLPClassifier(data['mean'], data['scale'], layers, min_confidence)
+
+
+def train(X, y, hidden=(16,), epochs=400, learning_rate=0.02, l2=1e-4, seed=0):
+    """Fits an MLPClassifier on features X (N, NUM_FEATURES) and codes y (N,).
+
+    Full-batch Adam on cross-entropy; hidden=() trains plain softmax regression.
+    """
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.intp)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0) + 1e-6
+    Xs = (X - mean) / scale
+    onehot = np.eye(len(CLASS_NAMES), dtype=np.float32)[y]
+
+    sizes = (NUM_FEATURES,) + tuple(hidden) + (len(CLASS_NAMES),)
+    params = []
+    for n_in, n_out in zip(sizes[:-1], sizes[1:]):
+        params.append(rng.normal(0, np.sqrt(2.0 / n_in), (n_in, n_out)).astype(np.float32))
+        params.append(np.zeros(n_out, dtype=np.float32))
+    m = [np.zeros_like(p) for p in params]
+    v = [np.zeros_like(p) for p in params]
+    beta1, beta2 = 0.9, 0.999
+
+    for step in range(1, epochs + 1):
+        # forward
+        acts = [Xs]
+        for i in range(0, len(params), 2):
+            z = acts[-1] @ params[i] + params[i + 1]
+            acts.append(np.maximum(z, 0) if i < len(params) - 2 else z)
+        logits = acts[-1] - acts[-1].max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        # backward
+        grads = [None] * len(params)
+        delta = (probs - onehot) / len(X)
+        for i in range(len(params) - 2, -1, -2):
+            grads[i] = acts[i // 2].T @ delta + l2 * params[i]
+            grads[i + 1] = delta.sum(axis=0)
+            if i:
+                delta = (delta @ params[i].T) * (acts[i // 2] > 0)
+
+        for p, g, mi, vi in zip(params, grads, m, v):
+            mi *= beta1
+            mi += (1 - beta1) * g
+            vi *= beta2
+            vi += (1 - beta2) * g * g
+            p -= learning_rate * (mi / (1 - beta1 ** step)) / (np.sqrt(vi / (1 - beta2 ** step)) + 1e-8)
+
+    layers = [(params[i], params[i + 1]) for i in range(0, len(params), 2)]
+    return MLPClassifier(mean, scale, layers)
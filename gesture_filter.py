@@ -0,0 +1,229 @@
+"""
+FILENAME: gesture_filter.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Streaming filters between the landmark/angle stage and its consumers.
+             A One-Euro filter steadies the landmark array, a debouncer with hysteresis and
+             a minimum dwell time stops the recognised gesture from flickering, and a motion
+             predictor extrapolates mimic targets ahead to make up for the end-to-end lag.
+             Both keep preallocated state, so the cost per frame is constant and allocation-free.
+"""
+
+import math
+
+import numpy as np
+
+# One-Euro defaults, tuned for MediaPipe's normalised (0-1) image coordinates
+MIN_CUTOFF = 1.5    # Hz, smoothing when the hand is still
+BETA = 8.0          # how fast the cutoff opens up with speed (less lag on fast moves)
+D_CUTOFF = 1.0      # Hz, smoothing of the speed estimate
+
+# Debouncer defaults
+WINDOW = 7          # frames of classifications kept
+ENTER_COUNT = 5     # a new gesture needs this many of the last WINDOW frames...
+MIN_DWELL = 0.1     # ...for at least this long (seconds) before it replaces the current one
+
+NO_HAND = -1        # code pushed when no hand is seen
+
+# Motion predictor defaults
+PREDICT_HISTORY = 4     # samples in the velocity fit
+SERVO_DELAY = 0.06      # seconds of serial + servo travel on top of the measured vision latency
+MAX_LOOKAHEAD = 0.25    # never extrapolate further than this (seconds)
+MAX_STEP = 40.0         # nor by more than this many units (degrees for joint angles)
+MAX_GAP = 0.3           # a gap this long between samples starts the history over
+
+
+def _alpha(cutoff, dt):
+    # smoothing factor of a first-order low-pass at `cutoff` Hz sampled every dt seconds
+    return 1.0 / (1.0 + 1.0 / (2 * math.pi * cutoff * dt))
+
+
+class OneEuroFilter:
+    """One-Euro filter over a fixed-shape array (e.g. the (21, 3) landmarks).
+
+    filter() writes into `out` (which may be the input itself) and touches only preallocated
+    buffers. Call reset() when tracking is lost so the next hand doesn't get smeared into the
+    old one.
+    """
+
+    def __init__(self, shape, min_cutoff=MIN_CUTOFF, beta=BETA, d_cutoff=D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+        self._x = np.zeros(shape, dtype=np.float32)      # last filtered value
+        self._dx = np.zeros(shape, dtype=np.float32)     # last filtered speed
+        self._tmp = np.zeros(shape, dtype=np.float32)
+        self._a = np.zeros(shape, dtype=np.float32)
+        self._t = None
+    #end constructor
+
+    def reset(self):
+        self._t = None
+
+    def filter(self, x, timestamp, out=None):
+        if out is None:
+            out = np.empty_like(self._x)
+        if self._t is None or timestamp <= self._t:
+            # first sample (or a repeated timestamp): nothing to filter against
+            np.copyto(self._x, x)
+            self._dx.fill(0)
+            self._t = timestamp
+            np.copyto(out, self._x)
+            return out
+        dt = timestamp - self._t
+        self._t = timestamp
+
+        # speed estimate, low-passed at d_cutoff
+        np.subtract(x, self._x, out=self._tmp)
+        self._tmp /= dt
+        a_d = _alpha(self.d_cutoff, dt)
+        self._tmp -= self._dx
+        self._tmp *= a_d
+        self._dx += self._tmp
+
+        # per-element cutoff = min_cutoff + beta * |speed| -> alpha = 1 / (1 + 1 / (2 pi cutoff dt))
+        np.abs(self._dx, out=self._a)
+        self._a *= self.beta
+        self._a += self.min_cutoff
+        self._a *= 2 * math.pi * dt
+        np.reciprocal(self._a, out=self._a)
+        self._a += 1
+        np.reciprocal(self._a, out=self._a)
+
+        # x_hat = x_prev + alpha * (x - x_prev)
+        np.subtract(x, self._x, out=self._tmp)
+        self._tmp *= self._a
+        self._x += self._tmp
+        np.copyto(out, self._x)
+        return out
+    #end filter fn
+
+
+class GestureDebouncer:
+    """Hysteresis over a ring of the last `window` shape codes.
+
+    The stable output only changes to a new code once that code fills at least `enter_count`
+    of the window and has done so for `min_dwell` seconds. With enter_count above half the
+    window, the current gesture holds until something else clearly wins. Counts are
+    updated incrementally, so each push costs the same however long it runs.
+    Codes are shape() codes (0-4) or NO_HAND.
+    """
+
+    def __init__(self, window=WINDOW, enter_count=ENTER_COUNT, min_dwell=MIN_DWELL, num_codes=5):
+        self.window = window
+        self.enter_count = enter_count
+        self.min_dwell = min_dwell
+        self.num_codes = num_codes
+
+        self._ring = np.full(window, num_codes, dtype=np.int8)   # slot num_codes = NO_HAND
+        self._counts = np.zeros(num_codes + 1, dtype=np.int16)
+        self._counts[num_codes] = window
+        self._pos = 0
+        self.stable = NO_HAND
+        self._pending = NO_HAND
+        self._pending_since = 0.0
+    #end constructor
+
+    def _slot(self, code):
+        return code if 0 <= code < self.num_codes else self.num_codes
+
+    def push(self, code, timestamp):
+        """Adds one frame's code, returns the stable code."""
+        slot = self._slot(code)
+        self._counts[self._ring[self._pos]] -= 1
+        self._ring[self._pos] = slot
+        self._counts[slot] += 1
+        self._pos = (self._pos + 1) % self.window
+
+        candidate = int(self._counts.argmax())
+        candidate_code = candidate if candidate < self.num_codes else NO_HAND
+        if candidate_code == self.stable or self._counts[candidate] < self.enter_count:
+            self._pending = self.stable
+            return self.stable
+
+        if candidate_code != self._pending:
+            self._pending = candidate_code
+            self._pending_since = timestamp
+        if timestamp - self._pending_since >= self.min_dwell:
+            self.stable = candidate_code
+        return self.stable
+    #end push fn
+
+
+class MotionPredictor:
+    """Constant-velocity extrapolation of a fixed-shape array (e.g. the 15 joint angles).
+
+    Velocity is the least-squares slope over the last `history` samples, so one noisy frame
+    can't throw the target around. predict() returns x + velocity * look-ahead, with the
+    look-ahead clamped to [0, max_lookahead], the step to +/- max_step and the result to
+    [low, high].
+
+    lookahead=None measures it: the capture -> command latency fed to observe_latency()
+    (smoothed) plus servo_delay for the serial link and the servo's own travel.
+    """
+
+    def __init__(self, shape, history=PREDICT_HISTORY, lookahead=None, servo_delay=SERVO_DELAY,
+                 max_lookahead=MAX_LOOKAHEAD, max_step=MAX_STEP, low=0.0, high=180.0):
+        self.lookahead = lookahead
+        self.servo_delay = servo_delay
+        self.max_lookahead = max_lookahead
+        self.max_step = max_step
+        self.low = low
+        self.high = high
+        self.latency = 0.0              # smoothed capture -> command latency (seconds)
+
+        self._history = history
+        self._x = np.zeros((history, int(np.prod(shape))), dtype=np.float32)
+        self._t = np.zeros(history, dtype=np.float64)
+        self._tc = np.zeros(history, dtype=np.float32)  # centred times, same dtype as _x for dot()
+        self._v = np.zeros(self._x.shape[1], dtype=np.float32)
+        self._count = 0
+        self._last_t = None
+    #end constructor
+
+    def reset(self):
+        self._count = 0
+        self._last_t = None
+
+    def observe_latency(self, seconds):
+        """Feeds one measured capture -> command latency into the look-ahead estimate."""
+        if self.latency == 0.0:
+            self.latency = seconds
+        else:
+            self.latency += 0.1 * (seconds - self.latency)
+
+    def current_lookahead(self):
+        lookahead = self.lookahead if self.lookahead is not None else self.latency + self.servo_delay
+        return min(max(lookahead, 0.0), self.max_lookahead)
+
+    def predict(self, x, timestamp, out=None):
+        if out is None:
+            out = np.empty(np.shape(x), dtype=np.float32)
+        if self._last_t is not None and not 0 < timestamp - self._last_t < MAX_GAP:
+            self.reset()
+        self._last_t = timestamp
+
+        slot = self._count % self._history
+        self._x[slot] = np.ravel(x)
+        self._t[slot] = timestamp
+        self._count += 1
+        n = min(self._count, self._history)
+        if n < 2:
+            np.copyto(out, x)
+            return out
+
+        # slope = sum(tc * x) / sum(tc^2) with tc the centred timestamps (sum(tc) = 0, so
+        # x needs no centring). The subtraction runs in float64 and is only then cast down, so
+        # large monotonic timestamps keep their precision.
+        tc = self._tc[:n]
+        np.subtract(self._t[:n], self._t[:n].mean(), out=tc, casting='same_kind')
+        np.dot(tc, self._x[:n], out=self._v)
+        self._v *= self.current_lookahead() / float(tc @ tc)
+        np.clip(self._v, -self.max_step, self.max_step, out=self._v)
+
+        flat = out.reshape(-1)
+        np.add(np.ravel(x), self._v, out=flat)
+        np.clip(flat, self.low, self.high, out=flat)
+        return out
+    #end predict fn
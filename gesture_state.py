@@ -0,0 +1,97 @@
+"""
+FILENAME: gesture_state.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Single-writer, multi-reader state channel between the vision thread and the UI.
+             Each vision frame is published as one immutable snapshot, so readers never see
+             landmarks from one frame next to the gesture of another.
+"""
+
+from collections import namedtuple
+
+GestureSnapshot = namedtuple('GestureSnapshot', [
+    'seq',          # capture frame sequence number (camera_service.Frame.seq)
+    'timestamp',    # capture time, time.monotonic()
+    'landmarks',    # read-only (21, 3) array, or None when no hand is seen
+    'angles',       # read-only (15,) joint angle array (hand_angles layout), or None
+    'code',         # this frame's raw shape code (-1 when no hand is seen)
+    'gesture',      # debounced 'rock' / 'paper' / 'scissors' / 'unknown'
+    'confidence',   # 0-1
+])
+
+EMPTY_SNAPSHOT = GestureSnapshot(0, 0.0, None, None, -1, 'unknown', 0.0)
+
+# Every hand of one frame (tournament mode), one row per hand
+HandsSnapshot = namedtuple('HandsSnapshot', [
+    'seq',
+    'timestamp',
+    'landmarks',    # read-only (N, 21, 3) array (N = 0 when no hand is seen)
+    'angles',       # read-only (N, 15)
+    'handedness',   # (N,) int8 index into HANDEDNESS, as MediaPipe reports it (-1 = unrecognised label)
+    'sides',        # (N,) int8 index into SIDES: which half of the mirrored preview the hand is in
+    'codes',        # (N,) int8 raw shape codes
+    'confidences',  # (N,) float32
+])
+
+HANDEDNESS = ('Left', 'Right')
+HANDEDNESS_INDEX = {label: i for i, label in enumerate(HANDEDNESS)}
+SIDES = ('left', 'right')
+
+
+def _freeze(array):
+    if array is not None:
+        array.flags.writeable = False
+    return array
+
+
+class StateChannel:
+    """Holds the latest GestureSnapshot.
+
+    publish() is only called from the vision thread. It swaps one reference (atomic under the
+    GIL), so latest() needs no lock and always returns a whole snapshot.
+    Subscribers are called on the vision thread after every publish; UI code must hop to its
+    own thread (Kivy: Clock.schedule_once / Clock.create_trigger) and keep the callback cheap.
+    """
+
+    def __init__(self):
+        self._snapshot = EMPTY_SNAPSHOT
+        self._subscribers = ()
+    #end constructor
+
+    def publish(self, seq, timestamp, landmarks, angles, code, gesture, confidence=1.0):
+        snapshot = GestureSnapshot(seq, timestamp, _freeze(landmarks), _freeze(angles),
+                                   code, gesture, confidence)
+        self._snapshot = snapshot
+        for callback in self._subscribers:
+            callback(snapshot)
+        return snapshot
+
+    def latest(self):
+        return self._snapshot
+
+    def subscribe(self, callback):
+        # copy-on-write so publish() can iterate without a lock
+        self._subscribers = self._subscribers + (callback,)
+
+    def unsubscribe(self, callback):
+        self._subscribers = tuple(cb for cb in self._subscribers if cb != callback)
+
+
+class HandsChannel(StateChannel):
+    """StateChannel of HandsSnapshots (same single-writer / lock-free reader contract).
+
+    latest() is None until the first frame of tournament mode.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._snapshot = None
+    #end constructor
+
+    def publish(self, seq, timestamp, landmarks, angles, handedness, sides, codes, confidences):
+        snapshot = HandsSnapshot(seq, timestamp, _freeze(landmarks), _freeze(angles),
+                                 handedness, sides, codes, confidences)
+        self._snapshot = snapshot
+        for callback in self._subscribers:
+            callback(snapshot)
+        return snapshot
@@ -0,0 +1,60 @@
+"""
+FILENAME: gesture_textures.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: In-memory texture cache for the game screens' hand pictures. Every gesture image is
+             decoded and uploaded to the GPU once at start-up, so the countdown swaps Texture
+             objects instead of making the Image widgets resolve, read and decode a file each
+             time (which stutters on a slow SD card). Must be loaded on the Kivy thread, after
+             the window exists (HandyApp.build).
+"""
+
+import glob
+import os
+
+from kivy.core.image import Image as CoreImage
+from kivy.logger import Logger
+
+IMAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Everything matching these is preloaded; drop in more (e.g. throw_rock_00.png, throw_rock_01.png
+# ... for an animated throw) and they are cached with the rest
+PATTERNS = ('grey.png', 'us_hand_*.png', 'opp_hand_*.png', 'throw_*.png')
+PLACEHOLDER = 'grey.png'
+
+
+class TextureCache:
+    """File name -> Texture, for every image matching `patterns` in `directory`.
+
+    get() never touches the disk: an unknown name gives the placeholder's texture.
+    """
+
+    def __init__(self, directory=IMAGE_DIR, patterns=PATTERNS, placeholder=PLACEHOLDER):
+        self.directory = directory
+        self.patterns = patterns
+        self.placeholder = placeholder
+        self.textures = {}
+    #end constructor
+
+    def load(self):
+        """Decodes and uploads every matching image once. Returns the number cached."""
+        for pattern in self.patterns:
+            for path in sorted(glob.glob(os.path.join(self.directory, pattern))):
+                name = os.path.basename(path)
+                if name in self.textures:
+                    continue
+                try:
+                    # nocache: this dict is the cache, Kivy's own would expire and reload it
+                    self.textures[name] = CoreImage(path, nocache=True).texture
+                except Exception as e:
+                    Logger.warning(f"Handy: Couldn't load {name} ({e})")
+        Logger.info(f"Handy: {len(self.textures)} gesture textures preloaded.")
+        return len(self.textures)
+    #end load fn
+
+    def get(self, name):
+        texture = self.textures.get(name)
+        return texture if texture is not None else self.textures.get(self.placeholder)
+
+    def sequence(self, prefix):
+        """Textures of the frames named prefix*.png in name order (an animated throw), may be empty."""
+        return [self.textures[name] for name in sorted(self.textures) if name.startswith(prefix)]
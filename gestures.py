@@ -0,0 +1,22 @@
+"""
+FILENAME: gestures.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Import shim for the gesture recognition module. The file name
+             Hand_Gesture_Reconition02.41.py has a dot in it, so it can't be imported normally;
+             this loads it by path and re-exports it as `gestures`.
+"""
+
+import importlib.util
+import os
+import sys
+
+_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Hand_Gesture_Reconition02.41.py')
+
+_spec = importlib.util.spec_from_file_location('Hand_Gesture_Reconition02_41', _PATH)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = _module
+_spec.loader.exec_module(_module)
+
+# `import gestures` gives the gesture module itself (so its globals stay shared)
+sys.modules[__name__] = _module
@@ -0,0 +1,101 @@
+"""
+FILENAME: hand_angles.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Vectorised joint angle engine. Takes the 21x3 MediaPipe landmark array
+             (or N frames of them) and returns every joint angle in one fixed-layout array.
+"""
+
+import numpy as np
+
+# --- LANDMARK LAYOUT (MediaPipe hand model order) ---
+LANDMARK_LABELS = ["WRIST", "THUMB_CMC", "THUMB_MCP", "THUMB_IP", "THUMB_TIP",
+                   "INDEX_MCP", "INDEX_PIP", "INDEX_DIP", "INDEX_TIP",
+                   "MIDDLE_MCP", "MIDDLE_PIP", "MIDDLE_DIP", "MIDDLE_TIP",
+                   "RING_MCP", "RING_PIP", "RING_DIP", "RING_TIP",
+                   "PINKY_MCP", "PINKY_PIP", "PINKY_DIP", "PINKY_TIP"]
+NUM_LANDMARKS = 21
+
+# --- ANGLE LAYOUT ---
+# 5 fingers x 3 joints, flattened finger-major. Thumb keeps its own joint names.
+FINGERS = ('Index', 'Middle', 'Ring', 'Pinky', 'Thumb')
+FINGER_JOINTS = {
+    'Index': ('MPC', 'PIP', 'DIP'),
+    'Middle': ('MPC', 'PIP', 'DIP'),
+    'Ring': ('MPC', 'PIP', 'DIP'),
+    'Pinky': ('MPC', 'PIP', 'DIP'),
+    'Thumb': ('MCP', 'IP', 'CMC'),
+}
+NUM_ANGLES = 15
+
+# Slot of each angle in the output array
+INDEX_MPC, INDEX_PIP, INDEX_DIP = 0, 1, 2
+MIDDLE_MPC, MIDDLE_PIP, MIDDLE_DIP = 3, 4, 5
+RING_MPC, RING_PIP, RING_DIP = 6, 7, 8
+PINKY_MPC, PINKY_PIP, PINKY_DIP = 9, 10, 11
+THUMB_MCP, THUMB_IP, THUMB_CMC = 12, 13, 14
+
+# (a, b, c) landmark indices for every angle, measured at b between b->a and b->c
+JOINT_TRIPLETS = np.array([
+    # Index
+    (0, 5, 6), (5, 6, 7), (6, 7, 8),
+    # Middle
+    (0, 9, 10), (9, 10, 11), (10, 11, 12),
+    # Ring
+    (0, 13, 14), (13, 14, 15), (14, 15, 16),
+    # Pinky
+    (0, 17, 18), (17, 18, 19), (18, 19, 20),
+    # Thumb (MCP, IP, CMC)
+    (1, 2, 3), (2, 3, 4), (0, 1, 2),
+], dtype=np.intp)
+
+_A = JOINT_TRIPLETS[:, 0]
+_B = JOINT_TRIPLETS[:, 1]
+_C = JOINT_TRIPLETS[:, 2]
+
+
+def joint_angles(points):
+    """Returns every joint angle in degrees.
+
+    points: (21, 3) landmark array for one frame or (N, 21, 3) for N frames.
+    Returns a float32 array of shape (15,) or (N, 15) laid out as JOINT_TRIPLETS.
+    Joints with a zero-length bone come back as 0, like the old getAngle did.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    if points.shape[-2:] != (NUM_LANDMARKS, 3):
+        raise ValueError(f"Expected (..., 21, 3) landmarks, got {points.shape}")
+
+    b = points[..., _B, :]
+    v1 = points[..., _A, :] - b
+    v2 = points[..., _C, :] - b
+
+    dot = np.einsum('...ij,...ij->...i', v1, v2)
+    mags = np.sqrt(np.einsum('...ij,...ij->...i', v1, v1) * np.einsum('...ij,...ij->...i', v2, v2))
+
+    # Handle division by zero magnitude (return 0 like getAngle) and clamp for arccos
+    valid = mags > 0
+    cos_theta = np.divide(dot, mags, out=np.ones_like(dot), where=valid)
+    np.clip(cos_theta, -1.0, 1.0, out=cos_theta)
+
+    angles = np.degrees(np.arccos(cos_theta))
+    angles[~valid] = 0
+    return angles
+
+
+def finger_averages(angles):
+    """Mean of the three joint angles per finger -> (5,) or (N, 5), in FINGERS order."""
+    angles = np.asarray(angles)
+    return angles.reshape(angles.shape[:-1] + (5, 3)).mean(axis=-1)
+
+
+def angles_to_dict(angles):
+    """Optional adapter: one frame of angles as the old nested {'Index': {'MPC': ..}} dict."""
+    hand_angles = {}
+    for f, finger in enumerate(FINGERS):
+        hand_angles[finger] = {joint: int(angles[f * 3 + j]) for j, joint in enumerate(FINGER_JOINTS[finger])}
+    return hand_angles
+
+
+def landmarks_from_dict(points_dict):
+    """Converts the old {'WRIST': (x, y, z), ...} landmark dict into a (21, 3) array."""
+    return np.array([points_dict[label] for label in LANDMARK_LABELS], dtype=np.float32)
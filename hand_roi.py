@@ -0,0 +1,91 @@
+"""
+FILENAME: hand_roi.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Region-of-interest tracking for hand inference. Crops (and optionally shrinks) a
+             padded box around the last seen hand, so MediaPipe only looks at the part of the
+             frame that matters, then maps the landmarks back to full-frame coordinates.
+"""
+
+import cv2
+import numpy as np
+
+PADDING = 0.6       # box side = hand size * (1 + 2 * PADDING)
+MIN_SIDE = 96       # pixels, never crop smaller than this
+MAX_SIDE = 256      # pixels, the crop is shrunk to at most this before inference (None = keep)
+# The box only moves when the hand gets this close to its edge (fraction of the box side).
+# A steady box keeps the coordinates MediaPipe's own tracker sees consistent between frames.
+EDGE_MARGIN = 0.15
+
+
+class RoiTracker:
+    """Keeps the crop box (pixels, full frame) of the last tracked hand.
+
+    crop() gives the image to run inference on; to_frame() maps landmarks normalised to that
+    image back to full-frame normalised coordinates. update() moves the box after a detection
+    and lost() goes back to full-frame detection.
+    """
+
+    def __init__(self, padding=PADDING, min_side=MIN_SIDE, max_side=MAX_SIDE, edge_margin=EDGE_MARGIN):
+        self.padding = padding
+        self.min_side = min_side
+        self.max_side = max_side
+        self.edge_margin = edge_margin
+        self.box = None             # (x0, y0, side_w, side_h) in full-frame pixels, None = full frame
+        self.frame_size = None      # (w, h) of the last frame cropped
+        self._crop = None           # box actually used by the last crop() call
+    #end constructor
+
+    def crop(self, image):
+        """Returns the (view or resized) image to run inference on."""
+        h, w = image.shape[:2]
+        self.frame_size = (w, h)
+        if self.box is None:
+            self._crop = (0, 0, w, h)
+            return image
+        x0, y0, bw, bh = self.box
+        self._crop = self.box
+        roi = image[y0:y0 + bh, x0:x0 + bw]
+        if self.max_side is not None and max(bw, bh) > self.max_side:
+            scale = self.max_side / max(bw, bh)
+            roi = cv2.resize(roi, (max(1, int(bw * scale)), max(1, int(bh * scale))),
+                             interpolation=cv2.INTER_AREA)
+        return roi
+
+    def to_frame(self, points, out=None):
+        """Maps (21, 3) landmarks normalised to the last crop back to the full frame."""
+        if out is None:
+            out = np.empty_like(points)
+        x0, y0, bw, bh = self._crop
+        w, h = self.frame_size
+        out[:, 0] = (points[:, 0] * bw + x0) / w
+        out[:, 1] = (points[:, 1] * bh + y0) / h
+        out[:, 2] = points[:, 2] * bw / w   # MediaPipe's z is on the same scale as x
+        return out
+
+    def update(self, points):
+        """Moves the box to follow full-frame landmarks (only when the hand nears its edge)."""
+        w, h = self.frame_size
+        px = points[:, 0] * w
+        py = points[:, 1] * h
+        left, right, top, bottom = px.min(), px.max(), py.min(), py.max()
+
+        if self.box is not None:
+            x0, y0, bw, bh = self.box
+            mx, my = bw * self.edge_margin, bh * self.edge_margin
+            size = max(right - left, bottom - top) * (1 + 2 * self.padding)
+            if (left > x0 + mx and right < x0 + bw - mx and top > y0 + my and bottom < y0 + bh - my
+                    and 0.7 * max(bw, bh) < size < 1.3 * max(bw, bh)):
+                return
+
+        side = max(right - left, bottom - top) * (1 + 2 * self.padding)
+        side = int(min(max(side, self.min_side), w, h))
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        self.box = (x0, y0, side, side)
+    #end update fn
+
+    def lost(self):
+        """Tracking lost: the next crop() is the full frame again."""
+        self.box = None
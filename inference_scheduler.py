@@ -0,0 +1,74 @@
+"""
+FILENAME: inference_scheduler.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Decides which camera frames go through MediaPipe, based on the operating mode.
+             Idle only checks for a hand a few times a second, mimic runs at full rate and RPS
+             only runs at full rate around the countdown / "Shoot!" window.
+"""
+
+import time
+
+# Max frames per second pushed through hands.process per mode (None = every frame)
+MODE_RATES = {
+    'idle': 5,
+    'mimic': None,
+    'rps': 5,        # between rounds; full rate inside the window from start_rps_window()
+    'tournament': 5, # same as rps
+}
+# Modes that run at full rate inside the start_rps_window() window
+ROUND_MODES = ('rps', 'tournament')
+DEFAULT_RATE = 5
+
+# Frames older than this when we get to them are dropped instead of processed (seconds)
+MAX_FRAME_AGE = 0.1
+
+# Smoothing of the effective FPS estimate
+FPS_SMOOTHING = 0.1
+
+
+class InferenceScheduler:
+
+    def __init__(self, mode_rates=None, max_frame_age=MAX_FRAME_AGE):
+        self.mode_rates = dict(MODE_RATES if mode_rates is None else mode_rates)
+        self.max_frame_age = max_frame_age
+        self.full_rate_until = 0.0
+        self.last_processed = None
+        self.fps = 0.0            # effective processed frames per second
+        self.processed = 0
+        self.skipped = 0          # frames left out by the rate limit
+        self.stale = 0            # frames dropped for being too old
+    #end constructor
+
+    def start_rps_window(self, seconds):
+        """Runs at full rate for the next `seconds` (the countdown + vote window)."""
+        self.full_rate_until = max(self.full_rate_until, time.monotonic() + seconds)
+
+    def rate_for(self, mode, now):
+        if mode in ROUND_MODES and now < self.full_rate_until:
+            return None
+        return self.mode_rates.get(mode, DEFAULT_RATE)
+
+    def should_process(self, mode, frame_timestamp):
+        """True if the frame captured at frame_timestamp should be run through MediaPipe."""
+        now = time.monotonic()
+        if now - frame_timestamp > self.max_frame_age:
+            self.stale += 1
+            return False
+
+        rate = self.rate_for(mode, now)
+        if rate is not None and self.last_processed is not None and now - self.last_processed < 1.0 / rate:
+            self.skipped += 1
+            return False
+
+        if self.last_processed is not None:
+            dt = now - self.last_processed
+            if dt > 0:
+                self.fps += FPS_SMOOTHING * (1.0 / dt - self.fps) if self.fps else 1.0 / dt
+        self.last_processed = now
+        self.processed += 1
+        return True
+    #end should process fn
+
+    def stats(self):
+        return {'fps': self.fps, 'processed': self.processed, 'skipped': self.skipped, 'stale': self.stale}
@@ -0,0 +1,72 @@
+"""
+FILENAME: landmark_overlay.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Draws the hand's 21 landmarks and their connections over the camera preview as Kivy
+             vector graphics (one Line per finger chain and one Point instruction), created once
+             and updated in place from each gesture_state snapshot. Replaces drawing into the
+             frame's pixels in the vision loop and showing it in a separate OpenCV window.
+"""
+
+import numpy as np
+
+from kivy.graphics import Color, Line, Point
+from kivy.utils import get_color_from_hex
+
+# MediaPipe's HAND_CONNECTIONS as polylines (landmark rows, hand_angles.LANDMARK_LABELS order)
+CHAINS = (
+    (0, 1, 2, 3, 4),        # thumb
+    (0, 5, 6, 7, 8),        # index
+    (9, 10, 11, 12),        # middle
+    (13, 14, 15, 16),       # ring
+    (0, 17, 18, 19, 20),    # pinky
+    (5, 9, 13, 17),         # palm
+)
+_CHAIN_ROWS = [np.array(chain, dtype=np.intp) for chain in CHAINS]
+LINE_COLOUR = get_color_from_hex('E2A9F1FF')    # Lilac
+POINT_COLOUR = get_color_from_hex('E0AE6AFF')   # Gold
+LINE_WIDTH = 1.5
+POINT_SIZE = 3
+
+
+class LandmarkOverlay:
+    """Landmark graphics in an Image widget's canvas.after, lined up with its (mirrored) texture.
+
+    update() takes (21, 3) full-frame normalised landmarks (None = no hand) and only rewrites
+    the instructions' point lists; it must run on the Kivy thread.
+    """
+
+    def __init__(self, image_widget):
+        self.widget = image_widget
+        with image_widget.canvas.after:
+            Color(*LINE_COLOUR)
+            self.lines = [Line(points=[], width=LINE_WIDTH) for _ in CHAINS]
+            Color(*POINT_COLOUR)
+            self.points = Point(points=[], pointsize=POINT_SIZE)
+        self.visible = False
+    #end constructor
+
+    def update(self, landmarks):
+        if landmarks is None:
+            self.clear()
+            return
+        # where the texture is drawn (keep_ratio letterboxing) ...
+        w, h = self.widget.norm_image_size
+        x0 = self.widget.center_x - w / 2.0
+        y0 = self.widget.center_y - h / 2.0
+        # ... and the preview's flips: mirrored left-right, image rows run top-down
+        xy = np.empty((len(landmarks), 2), dtype=np.float32)
+        xy[:, 0] = x0 + (1.0 - landmarks[:, 0]) * w
+        xy[:, 1] = y0 + (1.0 - landmarks[:, 1]) * h
+        for line, rows in zip(self.lines, _CHAIN_ROWS):
+            line.points = xy[rows].ravel().tolist()
+        self.points.points = xy.ravel().tolist()
+        self.visible = True
+
+    def clear(self):
+        if self.visible:
+            for line in self.lines:
+                line.points = []
+            self.points.points = []
+            self.visible = False
+    #end clear fn
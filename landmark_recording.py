@@ -0,0 +1,139 @@
+"""
+FILENAME: landmark_recording.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Record-and-replay of the vision loop. Per-frame landmarks, timestamps and mode go into
+             a compact append-only binary file (a header + NumPy structured records, memory-mappable),
+             and a replay driver feeds a file back through the GesturePipeline without a camera,
+             MediaPipe or a serial port.
+"""
+
+import time
+
+import numpy as np
+
+from hand_angles import NUM_LANDMARKS
+
+MODES = ('idle', 'mimic', 'rps', 'tournament')
+
+# File = 16-byte header (magic, record size, reserved) followed by RECORD_DTYPE records
+MAGIC = b'HANDYLM\x01'
+HEADER_SIZE = 16
+RECORD_DTYPE = np.dtype([
+    ('seq', '<u4'),
+    ('timestamp', '<f8'),                        # time.monotonic() at capture
+    ('mode', 'u1'),                              # index into MODES
+    ('has_hand', 'u1'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),    # raw (unfiltered) full-frame landmarks
+])
+
+BLOCK_SIZE = 64   # records buffered before each write
+
+
+class LandmarkRecorder:
+    """Appends frames to a recording file. append() only copies into a preallocated block;
+    the file is written once per BLOCK_SIZE frames and on close()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        header = bytearray(HEADER_SIZE)
+        header[:len(MAGIC)] = MAGIC
+        header[8:12] = RECORD_DTYPE.itemsize.to_bytes(4, 'little')
+        self.file.write(header)
+        self._block = np.zeros(BLOCK_SIZE, dtype=RECORD_DTYPE)
+        self._n = 0
+        self.frames = 0
+    #end constructor
+
+    def append(self, seq, timestamp, mode, points):
+        row = self._block[self._n]
+        row['seq'] = seq
+        row['timestamp'] = timestamp
+        row['mode'] = MODES.index(mode) if mode in MODES else 0
+        if points is None:
+            row['has_hand'] = 0
+            row['landmarks'] = 0
+        else:
+            row['has_hand'] = 1
+            row['landmarks'] = points
+        self._n += 1
+        self.frames += 1
+        if self._n == BLOCK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._n:
+            self.file.write(self._block[:self._n].data)
+            self.file.flush()
+            self._n = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+    #end close fn
+
+
+def load_recording(path):
+    """Memory-maps a recording. Returns a read-only structured array of RECORD_DTYPE."""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a Handy landmark recording")
+    if int.from_bytes(header[8:12], 'little') != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} was recorded with a different record layout")
+    try:
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE)
+    except ValueError:
+        # memmap can't map zero records
+        return np.zeros(0, dtype=RECORD_DTYPE)
+
+
+def synthetic_recording(frames=3000, fps=30.0, seed=0):
+    """Made-up session (open/closed hand cycling, with jitter and dropouts) for benchmarking
+    on a machine without a camera."""
+    rng = np.random.default_rng(seed)
+    rec = np.zeros(frames, dtype=RECORD_DTYPE)
+    rec['seq'] = np.arange(1, frames + 1)
+    rec['timestamp'] = np.arange(frames) / fps
+    rec['mode'] = MODES.index('mimic')
+    rec['has_hand'] = rng.random(frames) > 0.05
+
+    # wrist at the bottom, 5 fingers fanned out; each joint bends further as the hand closes
+    wrist = np.array([0.5, 0.8, 0.0])
+    base_angles = np.radians([-140, -105, -90, -75, -60])
+    segments = [0.08, 0.045, 0.03, 0.025]
+    curl = 0.5 + 0.5 * np.sin(np.arange(frames) * (2 * np.pi / (2 * fps)))   # 2 s open/close cycle
+    for f in range(5):
+        x = np.full(frames, wrist[0])
+        y = np.full(frames, wrist[1])
+        for j in range(4):
+            theta = base_angles[f] + curl * 1.1 * j
+            x = x + segments[j] * np.cos(theta)
+            y = y + segments[j] * np.sin(theta)
+            rec['landmarks'][:, 1 + f * 4 + j, 0] = x
+            rec['landmarks'][:, 1 + f * 4 + j, 1] = y
+            rec['landmarks'][:, 1 + f * 4 + j, 2] = -0.02 * j * curl
+    rec['landmarks'][:, 0] = wrist
+    rec['landmarks'] += rng.normal(0, 0.002, rec['landmarks'].shape).astype(np.float32)
+    rec['landmarks'][rec['has_hand'] == 0] = 0
+    return rec
+
+
+def replay(recording, pipeline, realtime=False):
+    """Feeds a recording through pipeline.process() frame by frame.
+
+    realtime=True paces frames by their recorded timestamps, otherwise it runs flat out.
+    Returns (frames, elapsed seconds).
+    """
+    start = time.monotonic()
+    first = float(recording['timestamp'][0]) if len(recording) else 0.0
+    for rec in recording:
+        if realtime:
+            delay = (rec['timestamp'] - first) - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        points = np.array(rec['landmarks']) if rec['has_hand'] else None
+        pipeline.process(int(rec['seq']), float(rec['timestamp']), points, MODES[rec['mode']])
+    return len(recording), time.monotonic() - start
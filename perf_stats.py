@@ -0,0 +1,144 @@
+"""
+FILENAME: perf_stats.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Low-overhead per-stage latency instrumentation. Each stage keeps a fixed-size ring of
+             recent samples (for live p50/p99 and rate) and a fixed log-spaced histogram (for the
+             whole run). Can be switched on/off at runtime; when off, lap() is one attribute check.
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+RING_SIZE = 512
+# Histogram bins: 10 us .. 10 s, log spaced (plus under/overflow at both ends)
+HIST_EDGES = np.logspace(-5, 1, 61)
+
+DUMP_PATH = 'perf_stats.json'
+
+
+class _Stage:
+
+    def __init__(self):
+        self.samples = np.zeros(RING_SIZE, dtype=np.float64)   # durations, seconds
+        self.stamps = np.zeros(RING_SIZE, dtype=np.float64)    # when each sample was taken
+        self.hist = np.zeros(len(HIST_EDGES) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    #end constructor
+
+    def add(self, duration, now):
+        i = self.count % RING_SIZE
+        self.samples[i] = duration
+        self.stamps[i] = now
+        self.hist[np.searchsorted(HIST_EDGES, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+
+class PerfMonitor:
+    """Collects stage timings from any thread.
+
+    Typical use inside a loop:
+        t = perf.now()
+        ... stage A ...
+        t = perf.lap('A', t)
+        ... stage B ...
+        t = perf.lap('B', t)
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._stages = {}
+        self._lock = threading.Lock()
+    #end constructor
+
+    def now(self):
+        """Start of a lap, None while disabled."""
+        return time.perf_counter() if self.enabled else None
+
+    def lap(self, stage, since):
+        """Records now - since under `stage` and returns now (for the next lap).
+
+        A lap started while disabled (since is None) isn't recorded, so switching perf on
+        mid-loop never records a bogus duration; it just starts the next lap.
+        """
+        if not self.enabled:
+            return None
+        now = time.perf_counter()
+        if since is not None:
+            self.record(stage, now - since, now)
+        return now
+
+    def record(self, stage, duration, now=None):
+        if not self.enabled:
+            return
+        if now is None:
+            now = time.perf_counter()
+        with self._lock:
+            s = self._stages.get(stage)
+            if s is None:
+                s = self._stages[stage] = _Stage()
+            s.add(duration, now)
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def snapshot(self):
+        """{stage: {count, rate_hz, mean_ms, p50_ms, p99_ms, max_ms}} over the recent ring."""
+        out = {}
+        with self._lock:
+            for name, s in self._stages.items():
+                n = min(s.count, RING_SIZE)
+                recent = s.samples[:n]
+                stamps = s.stamps[:n]
+                span = stamps.max() - stamps.min() if n > 1 else 0.0
+                out[name] = {
+                    'count': s.count,
+                    'rate_hz': (n - 1) / span if span > 0 else 0.0,
+                    'mean_ms': s.total / s.count * 1000,
+                    'p50_ms': float(np.percentile(recent, 50)) * 1000,
+                    'p99_ms': float(np.percentile(recent, 99)) * 1000,
+                    'max_ms': s.max * 1000,
+                }
+        return out
+
+    def overlay_text(self, extra=None):
+        """Short multi-line summary for the on-screen overlay (extra = another process's snapshot())."""
+        stages = self.snapshot()
+        if extra:
+            stages.update(extra)
+        lines = []
+        for name, st in sorted(stages.items()):
+            lines.append(f"{name}: {st['p50_ms']:.1f}/{st['p99_ms']:.1f} ms  {st['rate_hz']:.0f} Hz")
+        return "\n".join(lines)
+
+    def dump(self, path=DUMP_PATH):
+        """Writes the snapshot and full-run histograms to .json, or one row per stage to .csv."""
+        snap = self.snapshot()
+        if not snap:
+            return
+        if os.path.splitext(path)[1].lower() == '.csv':
+            with open(path, 'w') as f:
+                f.write('stage,count,rate_hz,mean_ms,p50_ms,p99_ms,max_ms\n')
+                for name, st in snap.items():
+                    f.write(f"{name},{st['count']},{st['rate_hz']:.2f},{st['mean_ms']:.3f},"
+                            f"{st['p50_ms']:.3f},{st['p99_ms']:.3f},{st['max_ms']:.3f}\n")
+            return
+        with self._lock:
+            hists = {name: s.hist.tolist() for name, s in self._stages.items()}
+        with open(path, 'w') as f:
+            json.dump({'stages': snap, 'hist_edges_s': HIST_EDGES.tolist(), 'histograms': hists}, f, indent=1)
+    #end dump fn
+
+
+# Process-wide monitor (HANDY_PERF=1 switches it on from the start)
+perf = PerfMonitor(enabled=os.environ.get('HANDY_PERF') == '1')
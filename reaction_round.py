@@ -0,0 +1,137 @@
+"""
+FILENAME: reaction_round.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Reaction ("cheat") Rock, Paper, Scissors round. Instead of throwing at "Shoot!" and
+             voting afterwards, Handy watches the per-frame classifications as they are published
+             and throws the counter-move on the vision thread as soon as the user's shape is
+             confident, so the time from camera frame to servo command is just the pipeline's.
+"""
+
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+from perf_stats import perf
+from rps_round import GESTURES, UNKNOWN, RoundResult, vote, WINDOW_BEFORE, WINDOW_AFTER, PROCESSING_MARGIN
+from rps_strategy import BEATS
+
+REACTION_CONFIDENCE = 0.8   # a frame must be at least this sure of the shape to count
+REACTION_FRAMES = 2         # consecutive confident frames of the same shape before Handy commits
+ROCK_DELAY = 0.08           # a fist is what the countdown pump looks like, so rock only counts this
+                            # long after "Shoot!" (seconds)
+LATENCY_BUDGET = 0.06       # capture of the deciding frame -> servo command (seconds)
+
+ReactionResult = namedtuple('ReactionResult', RoundResult._fields + (
+    'reacted',          # True = committed from the frame stream, False = fell back at the deadline
+    'commit_latency',   # "Shoot!" -> servo command (seconds, includes the user's own reaction)
+    'frame_latency',    # deciding frame's capture -> servo command (seconds)
+    'within_budget',    # frame_latency <= LATENCY_BUDGET
+))
+
+
+class ReactionRound:
+    """One reaction round, fed by a gesture_state.StateChannel subscription.
+
+    _on_snapshot() runs on the vision thread (or the VisionClient's receive thread) for every
+    published frame; the first confident shape after shoot_time commits Handy's counter-move
+    right there. If none comes by the end of the vote window, a timer decides the round from
+    the vote instead (reacted=False).
+    """
+
+    def __init__(self, state, history, move_handy, shoot_time, callback=None, strategy=None,
+                 threshold=REACTION_CONFIDENCE, min_frames=REACTION_FRAMES, budget=LATENCY_BUDGET,
+                 before=WINDOW_BEFORE, after=WINDOW_AFTER):
+        self.state = state
+        self.history = history
+        self.move_handy = move_handy
+        self.shoot_time = shoot_time
+        self.callback = callback
+        self.strategy = strategy
+        self.threshold = threshold
+        self.min_frames = min_frames
+        self.budget = budget
+        self.before = before
+        self.after = after
+        self.future = Future()
+        self._streak_code = UNKNOWN
+        self._streak = 0
+        self._done = False
+        self._lock = threading.Lock()
+        self._timer = None
+    #end constructor
+
+    def start(self):
+        self.state.subscribe(self._on_snapshot)
+        delay = max(0.0, self.shoot_time + self.after + PROCESSING_MARGIN - time.monotonic())
+        self._timer = threading.Timer(delay, self._deadline)
+        self._timer.daemon = True
+        self._timer.start()
+        return self.future
+
+    def _on_snapshot(self, snapshot):
+        if self._done or snapshot.timestamp < self.shoot_time:
+            return
+        code = snapshot.code
+        if (not 0 <= code < len(GESTURES) or snapshot.confidence < self.threshold
+                or (code == 0 and snapshot.timestamp < self.shoot_time + ROCK_DELAY)):
+            self._streak = 0
+            return
+        if code == self._streak_code:
+            self._streak += 1
+        else:
+            self._streak_code, self._streak = code, 1
+        if self._streak >= self.min_frames:
+            self._commit(code, snapshot.confidence, self._streak, snapshot.timestamp, reacted=True)
+
+    def _deadline(self):
+        code, confidence, frames = vote(self.history, self.shoot_time, self.before, self.after)
+        self._commit(code, confidence, frames, None, reacted=False)
+
+    def _commit(self, code, confidence, frames, frame_time, reacted):
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+        if code != UNKNOWN:
+            handy_pick = GESTURES[BEATS[code]]
+        elif self.strategy is not None:
+            handy_pick = self.strategy.pick_gesture()
+        else:
+            handy_pick = random.choice(GESTURES)
+        self.move_handy(handy_pick)
+        committed = time.monotonic()
+
+        self.state.unsubscribe(self._on_snapshot)
+        if reacted:
+            self._timer.cancel()
+        frame_latency = committed - frame_time if reacted else 0.0
+        if reacted:
+            perf.record('rps: frame to servo command', frame_latency)
+        user_pick = GESTURES[code] if code != UNKNOWN else 'unknown'
+        commit_latency = committed - self.shoot_time
+        result = ReactionResult(user_pick, handy_pick, confidence, frames,
+                                self.shoot_time, committed, commit_latency,
+                                reacted, commit_latency, frame_latency,
+                                reacted and frame_latency <= self.budget)
+        if self.strategy is not None:
+            # a counter-move is a sure win no strategy earned: it only teaches the user's habits
+            self.strategy.update_gestures(user_pick, handy_pick, scored=code == UNKNOWN)
+        self.future.set_result(result)
+        if self.callback is not None:
+            self.callback(result)
+    #end commit fn
+
+
+def start_reaction_round(state, history, move_handy, shoot_time=None, callback=None, strategy=None, **options):
+    """Starts a reaction round without blocking the caller (same contract as rps_round.start_round).
+
+    state: the StateChannel the vision loop publishes to; history: its GestureHistory (for the
+    fallback vote). Returns a Future of a ReactionResult; callback(result) is called from the
+    vision thread or the fallback timer (Kivy callers should hop back with Clock.schedule_once).
+    """
+    if shoot_time is None:
+        shoot_time = time.monotonic()
+    return ReactionRound(state, history, move_handy, shoot_time, callback, strategy, **options).start()
@@ -0,0 +1,190 @@
+"""
+FILENAME: rps_round.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Non-blocking Rock, Paper, Scissors round. The vision loop logs every recognised frame
+             with its capture time, and the user's throw is decided by a vote over the frames
+             around the "Shoot!" moment instead of one arbitrary sample.
+"""
+
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+import numpy as np
+
+GESTURES = ['rock', 'paper', 'scissors']   # index = shape() code
+UNKNOWN = -1
+
+# Frames this far before/after "Shoot!" take part in the vote (seconds)
+WINDOW_BEFORE = 0.15
+WINDOW_AFTER = 0.35
+# Extra wait so frames captured at the end of the window have made it through MediaPipe
+PROCESSING_MARGIN = 0.05
+
+RoundResult = namedtuple('RoundResult', [
+    'user_pick',       # 'rock' / 'paper' / 'scissors' / 'unknown'
+    'handy_pick',
+    'confidence',      # share of the vote the user's pick got (0-1)
+    'frames',          # recognised frames in the window
+    'shoot_time',      # time.monotonic() of "Shoot!"
+    'decided_time',    # time.monotonic() when the result was ready
+    'latency',         # decided_time - shoot_time (seconds)
+])
+
+# Two players in the same frame (tournament mode), one vote per side of the preview
+PairResult = namedtuple('PairResult', [
+    'picks',           # (left pick, right pick), gesture names or 'unknown'
+    'confidences',
+    'frames',
+    'shoot_time',
+    'decided_time',
+    'latency',
+])
+
+
+class GestureHistory:
+    """Fixed-size ring of (capture timestamp, gesture code, confidence), one per vision frame."""
+
+    def __init__(self, size=256):
+        self.size = size
+        self.timestamps = np.zeros(size, dtype=np.float64)
+        self.codes = np.full(size, UNKNOWN, dtype=np.int8)
+        self.confidences = np.zeros(size, dtype=np.float32)
+        self.count = 0
+        self._lock = threading.Lock()
+    #end constructor
+
+    def add(self, timestamp, code, confidence=1.0):
+        with self._lock:
+            i = self.count % self.size
+            self.timestamps[i] = timestamp
+            self.codes[i] = code if 0 <= code < len(GESTURES) else UNKNOWN
+            self.confidences[i] = confidence
+            self.count += 1
+
+    def window(self, start, end):
+        """(timestamps, codes, confidences) copies of every frame captured in [start, end]."""
+        with self._lock:
+            n = min(self.count, self.size)
+            mask = (self.timestamps[:n] >= start) & (self.timestamps[:n] <= end)
+            return self.timestamps[:n][mask], self.codes[:n][mask], self.confidences[:n][mask]
+
+
+def vote(history, shoot_time, before=WINDOW_BEFORE, after=WINDOW_AFTER):
+    """Confidence-weighted majority vote over the frames around shoot_time.
+
+    Unknown frames don't vote. A tie goes to the gesture seen closest to shoot_time, so the
+    same frames always give the same answer. Returns (code, confidence, frames).
+    """
+    timestamps, codes, confidences = history.window(shoot_time - before, shoot_time + after)
+    known = codes != UNKNOWN
+    if not known.any():
+        return UNKNOWN, 0.0, 0
+    timestamps, codes, confidences = timestamps[known], codes[known], confidences[known]
+
+    scores = np.bincount(codes, weights=confidences, minlength=len(GESTURES))
+    best = np.flatnonzero(scores == scores.max())
+    if len(best) > 1:
+        distance = np.abs(timestamps - shoot_time)
+        order = np.argsort(distance)
+        best = [next(c for c in codes[order] if c in best)]
+    code = int(best[0])
+    return code, float(scores[code] / scores.sum()), int(known.sum())
+
+
+def _finish(future, callback, result, error=None):
+    """Resolves a round: the Future gets the result (or the error) and callback(result) always
+    runs, so a UI waiting on it is never left hanging."""
+    if error is None:
+        future.set_result(result)
+    else:
+        print(f"RPS round failed: {error!r}")
+        future.set_exception(error)
+    if callback is not None:
+        callback(result)
+
+
+def start_round(history, move_handy, shoot_time=None, callback=None, strategy=None,
+                before=WINDOW_BEFORE, after=WINDOW_AFTER):
+    """Starts one round without blocking the caller.
+
+    move_handy(pick) is called straight away with Handy's pick (it must not block either).
+    Handy's pick comes from strategy (an rps_strategy.EnsembleStrategy), which is told the
+    outcome once the round is decided; without one it is uniform random.
+    The user's pick is decided once the vote window after shoot_time has been captured.
+    Returns a concurrent.futures.Future of a RoundResult; callback(result) is also called,
+    from a timer thread (Kivy callers should hop back with Clock.schedule_once). If deciding
+    fails, the Future holds the exception and callback still gets a result with the user's
+    pick 'unknown'.
+    """
+    if shoot_time is None:
+        shoot_time = time.monotonic()
+    try:
+        handy_pick = strategy.pick_gesture() if strategy is not None else random.choice(GESTURES)
+    except Exception as e:
+        print(f"Strategy failed, Handy picks at random: {e!r}")
+        handy_pick = random.choice(GESTURES)
+    try:
+        move_handy(handy_pick)
+    except Exception as e:
+        print(f"Couldn't move Handy: {e!r}")
+
+    future = Future()
+
+    def decide():
+        try:
+            code, confidence, frames = vote(history, shoot_time, before, after)
+            decided = time.monotonic()
+            result = RoundResult(GESTURES[code] if code != UNKNOWN else 'unknown', handy_pick,
+                                 confidence, frames, shoot_time, decided, decided - shoot_time)
+            if strategy is not None:
+                strategy.update_gestures(result.user_pick, handy_pick)
+        except Exception as e:
+            decided = time.monotonic()
+            _finish(future, callback, RoundResult('unknown', handy_pick, 0.0, 0, shoot_time, decided,
+                                                  decided - shoot_time), e)
+            return
+        _finish(future, callback, result)
+
+    delay = max(0.0, shoot_time + after + PROCESSING_MARGIN - time.monotonic())
+    timer = threading.Timer(delay, decide)
+    timer.daemon = True
+    timer.start()
+    return future
+
+
+def start_pair_round(histories, shoot_time=None, callback=None, before=WINDOW_BEFORE, after=WINDOW_AFTER):
+    """Starts a player-vs-player round without blocking (same timing as start_round).
+
+    histories: one GestureHistory per side (vision_pipeline.MultiHandPipeline.histories).
+    Returns a Future of a PairResult; callback(result) is called from a timer thread (with
+    both picks 'unknown', and the Future holding the exception, if deciding fails).
+    """
+    if shoot_time is None:
+        shoot_time = time.monotonic()
+    future = Future()
+
+    def decide():
+        try:
+            votes = [vote(history, shoot_time, before, after) for history in histories]
+            decided = time.monotonic()
+            result = PairResult(tuple(GESTURES[code] if code != UNKNOWN else 'unknown' for code, _, _ in votes),
+                                tuple(confidence for _, confidence, _ in votes),
+                                tuple(frames for _, _, frames in votes),
+                                shoot_time, decided, decided - shoot_time)
+        except Exception as e:
+            decided = time.monotonic()
+            sides = len(histories)
+            _finish(future, callback, PairResult(('unknown',) * sides, (0.0,) * sides, (0,) * sides,
+                                                 shoot_time, decided, decided - shoot_time), e)
+            return
+        _finish(future, callback, result)
+
+    delay = max(0.0, shoot_time + after + PROCESSING_MARGIN - time.monotonic())
+    timer = threading.Timer(delay, decide)
+    timer.daemon = True
+    timer.start()
+    return future
@@ -0,0 +1,228 @@
+"""
+FILENAME: rps_strategy.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: How Handy picks its Rock, Paper, Scissors throw. Each strategy predicts the
+             opponent's next throw and plays the move that beats it: throw frequencies, n-gram
+             (Markov) tables over the last throws, or plain random. EnsembleStrategy scores all
+             of them on every round and plays whichever has been winning lately. History lives
+             in small fixed-size count tables, so a pick and an update are O(1) however many
+             rounds have been played.
+"""
+
+import threading
+
+import numpy as np
+
+from rps_round import GESTURES, UNKNOWN
+
+NUM_MOVES = len(GESTURES)
+# BEATS[m] = the move that beats m (paper beats rock, scissors paper, rock scissors)
+BEATS = np.array([1, 2, 0], dtype=np.int8)
+# OUTCOME[mine, theirs]: 1 win, 0 draw, -1 loss
+OUTCOME = np.array([[0, -1, 1],
+                    [1, 0, -1],
+                    [-1, 1, 0]], dtype=np.int8)
+
+SCORE_DECAY = 0.9     # ensemble: weight of a round that happened n rounds ago = 0.9^n
+COUNT_DECAY = 0.97    # frequency / Markov tables lean on recent throws (opponents change tactics)
+
+
+class Strategy:
+    """Base class. pick(rng) returns Handy's move code, update() is told what was played."""
+
+    name = 'strategy'
+
+    def pick(self, rng):
+        raise NotImplementedError
+
+    def update(self, opponent, handy):
+        pass
+
+    def reset(self):
+        pass
+
+
+def _counter(counts, rng):
+    """Move that beats the most likely throw in `counts` (ties broken at random)."""
+    best = np.flatnonzero(counts == counts.max())
+    predicted = best[0] if len(best) == 1 else rng.choice(best)
+    return int(BEATS[predicted])
+
+
+class RandomStrategy(Strategy):
+    """Uniform random: can't be exploited, the fallback when nothing else is winning."""
+
+    name = 'random'
+
+    def pick(self, rng):
+        return int(rng.integers(NUM_MOVES))
+
+
+class FrequencyStrategy(Strategy):
+    """Beats the opponent's most frequent throw (recent throws weigh more)."""
+
+    name = 'frequency'
+
+    def __init__(self, decay=COUNT_DECAY):
+        self.decay = decay
+        self.counts = np.zeros(NUM_MOVES, dtype=np.float32)
+    #end constructor
+
+    def pick(self, rng):
+        return _counter(self.counts, rng)
+
+    def update(self, opponent, handy):
+        self.counts *= self.decay
+        self.counts[opponent] += 1
+
+    def reset(self):
+        self.counts[:] = 0
+
+
+class MarkovStrategy(Strategy):
+    """Beats the throw that most often followed the last `order` rounds.
+
+    with_handy=False: the context is the opponent's last `order` throws.
+    with_handy=True: the context is the last `order` (opponent, Handy) pairs, which also
+    catches reactions to Handy's throws ("win-stay, lose-shift").
+    The context is kept as one table row index and rolled forward on each update.
+    """
+
+    def __init__(self, order=1, with_handy=False, decay=COUNT_DECAY):
+        self.order = order
+        self.with_handy = with_handy
+        self.decay = decay
+        self.base = NUM_MOVES * NUM_MOVES if with_handy else NUM_MOVES
+        self.name = f"markov-{order}" + ("+handy" if with_handy else "")
+        self.table = np.zeros((self.base ** order, NUM_MOVES), dtype=np.float32)
+        self.context = 0
+        self.seen = 0     # rounds so far, capped at `order` (the context is full after that)
+    #end constructor
+
+    def pick(self, rng):
+        if self.seen < self.order:
+            return int(rng.integers(NUM_MOVES))
+        return _counter(self.table[self.context], rng)
+
+    def update(self, opponent, handy):
+        if self.seen >= self.order:
+            row = self.table[self.context]
+            row *= self.decay
+            row[opponent] += 1
+        else:
+            self.seen += 1
+        symbol = opponent * NUM_MOVES + handy if self.with_handy else opponent
+        self.context = (self.context * self.base + symbol) % len(self.table)
+
+    def reset(self):
+        self.table[:] = 0
+        self.context = 0
+        self.seen = 0
+
+
+class EnsembleStrategy(Strategy):
+    """Asks every strategy for a move each round and plays the one with the best recent score.
+
+    After each round every strategy is scored as if it had been played (win +1, draw 0,
+    loss -1, decayed by score_decay), so the ensemble switches as soon as another predictor
+    starts doing better. Random is one of the members: against an opponent none of the models
+    can read, it ends up on top and Handy can't be exploited either.
+    Thread-safe: pick() runs on the UI thread, update() on the round's timer thread.
+    """
+
+    name = 'ensemble'
+
+    def __init__(self, strategies=None, score_decay=SCORE_DECAY, seed=None):
+        if strategies is None:
+            strategies = [RandomStrategy(), FrequencyStrategy(), MarkovStrategy(1), MarkovStrategy(2),
+                          MarkovStrategy(1, with_handy=True)]
+        self.strategies = list(strategies)
+        self.score_decay = score_decay
+        self.rng = np.random.default_rng(seed)
+        n = len(self.strategies)
+        self.scores = np.zeros(n, dtype=np.float32)
+        # per strategy: wins, draws, losses it would have had (columns follow OUTCOME 1, 0, -1)
+        self.record = np.zeros((n, 3), dtype=np.int32)
+        self.played = np.zeros(3, dtype=np.int32)   # Handy's actual wins, draws, losses
+        self.moves = np.zeros(n, dtype=np.int8)     # each strategy's move for the pending round
+        self.current = 0
+        self._pending = False
+        self._lock = threading.Lock()
+    #end constructor
+
+    def pick(self, rng=None):
+        """Handy's move code for the next round."""
+        with self._lock:
+            for i, strategy in enumerate(self.strategies):
+                self.moves[i] = strategy.pick(self.rng)
+            best = np.flatnonzero(self.scores == self.scores.max())
+            # ties (e.g. the first round) go to the first strategy, random by default
+            self.current = int(best[0])
+            self._pending = True
+            return int(self.moves[self.current])
+
+    def update(self, opponent, handy, scored=True):
+        """Feeds one decided round (move codes) to every strategy.
+
+        An unknown throw teaches nothing, but it still ends the round: the moves predicted for
+        it are dropped so they can't be scored against the next one.
+        scored=False (Handy countered a throw it had already seen, reaction mode) only adds the
+        opponent's move to the strategies' history: no expert scores, no wins counted.
+        """
+        if opponent == UNKNOWN or not 0 <= opponent < NUM_MOVES:
+            with self._lock:
+                self._pending = False
+            return
+        with self._lock:
+            if self._pending and scored:
+                outcome = OUTCOME[self.moves, opponent]
+                self.scores *= self.score_decay
+                self.scores += outcome
+                np.add.at(self.record, (np.arange(len(self.strategies)), 1 - outcome), 1)
+            self._pending = False
+            if scored:
+                self.played[1 - OUTCOME[handy, opponent]] += 1
+            for strategy in self.strategies:
+                strategy.update(opponent, handy)
+
+    def reset(self):
+        with self._lock:
+            for strategy in self.strategies:
+                strategy.reset()
+            self.scores[:] = 0
+            self.record[:] = 0
+            self.played[:] = 0
+            self._pending = False
+
+    def pick_gesture(self):
+        return GESTURES[self.pick()]
+
+    def update_gestures(self, opponent_pick, handy_pick, scored=True):
+        """update() with gesture names; an opponent pick that isn't a gesture counts as unknown."""
+        if opponent_pick in GESTURES and handy_pick in GESTURES:
+            self.update(GESTURES.index(opponent_pick), GESTURES.index(handy_pick), scored)
+        else:
+            self.update(UNKNOWN, UNKNOWN)
+
+    def stats(self):
+        """{'strategy', 'rounds', 'win_rate', 'win_rates': {name: rate}} (rates 0-1)."""
+        with self._lock:
+            rounds = int(self.played.sum())
+            totals = np.maximum(self.record.sum(axis=1), 1)
+            return {
+                'strategy': self.strategies[self.current].name,
+                'rounds': rounds,
+                'win_rate': float(self.played[0]) / rounds if rounds else 0.0,
+                'win_rates': {s.name: float(self.record[i, 0]) / totals[i] for i, s in enumerate(self.strategies)},
+            }
+
+    def summary_text(self):
+        """Two lines for GameScreen: the strategy in use and every strategy's win rate."""
+        stats = self.stats()
+        if not stats['rounds']:
+            return f"Handy plays: {stats['strategy']}"
+        rates = "  ".join(f"{name} {rate:.0%}" for name, rate in stats['win_rates'].items())
+        return (f"Handy plays: {stats['strategy']} (won {stats['win_rate']:.0%} of {stats['rounds']})\n"
+                f"{rates}")
+    #end summary text fn
@@ -0,0 +1,196 @@
+"""
+FILENAME: servo_calibration.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Per-servo calibration from the user's finger angles to Handy's servo angles.
+             Each servo has a piecewise-linear map through its closed / neutral / open points,
+             baked into a 181-entry lookup table, so a whole pose (or a batch of them) is one
+             fancy-index. Includes the interactive routine that sweeps servo_pins and records
+             the endpoints.
+
+Run:  python servo_calibration.py [servo_calibration.json]
+      (needs the camera and the servo controller; walks through every servo, then your hand)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from hand_angles import FINGERS, finger_averages
+from servo_output import NUM_SERVOS, SERVO_MIN, SERVO_MAX
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'servo_calibration.json')
+POINTS = ('closed', 'neutral', 'open')
+
+# Uncalibrated defaults, from the fixed rock/paper poses (fingers 95 closed / 170 open,
+# thumb 130 closed) and typical finger-average joint angles of a fist and a flat hand
+DEFAULT_JOINT_POINTS = [[90, 135, 175]] * 4 + [[135, 150, 170]]
+DEFAULT_SERVO_POINTS = [[95, 132, 170]] * 4 + [[130, 150, 170]]
+
+_ROWS = np.arange(NUM_SERVOS)
+# (15, 5): joint angles @ _AVERAGE = finger averages (hand_angles.finger_averages as one matmul)
+_AVERAGE = np.kron(np.eye(NUM_SERVOS), np.full((3, 1), 1.0 / 3)).astype(np.float32)
+
+
+class ServoCalibration:
+    """joint_points / servo_points: (5, 3) closed, neutral, open per servo (FINGERS order).
+
+    Finger angles below closed or above open hold the endpoint servo angle, so mimic never
+    drives a servo past the positions the calibration found safe.
+    """
+
+    def __init__(self, joint_points=DEFAULT_JOINT_POINTS, servo_points=DEFAULT_SERVO_POINTS, pins=None):
+        self.joint_points = np.asarray(joint_points, dtype=np.float32)
+        self.servo_points = np.clip(np.asarray(servo_points, dtype=np.float32), SERVO_MIN, SERVO_MAX)
+        if self.joint_points.shape != (NUM_SERVOS, len(POINTS)) or self.servo_points.shape != self.joint_points.shape:
+            raise ValueError(f"Calibration needs {len(POINTS)} points for each of {NUM_SERVOS} servos")
+        if np.any(np.diff(self.joint_points, axis=1) <= 0):
+            raise ValueError("Joint angles must go up from closed to neutral to open")
+        self.pins = list(pins) if pins is not None else None
+
+        # lut[servo, joint degree 0..180] -> servo angle
+        degrees = np.arange(181, dtype=np.float32)
+        self.lut = np.empty((NUM_SERVOS, 181), dtype=np.int16)
+        for s in range(NUM_SERVOS):
+            self.lut[s] = np.rint(np.interp(degrees, self.joint_points[s], self.servo_points[s]))
+    #end constructor
+
+    def map(self, finger_angles):
+        """(5,) or (N, 5) finger-average joint angles -> servo angles (int16, same shape)."""
+        idx = np.clip(finger_angles, 0, 180) + 0.5
+        return self.lut[_ROWS, idx.astype(np.intp)]
+
+    def pose(self, hand_angles):
+        """(15,) or (N, 15) joint angles (hand_angles layout) -> servo angles for mimic mode."""
+        return self.map(np.dot(hand_angles, _AVERAGE))
+
+    def endpoint(self, point):
+        """Servo angles of one calibration point ('closed' / 'neutral' / 'open') for all servos."""
+        return self.servo_points[:, POINTS.index(point)].astype(np.int16)
+
+    def to_dict(self):
+        return {
+            'servo_pins': self.pins,
+            'fingers': list(FINGERS),
+            'points': list(POINTS),
+            'joint': self.joint_points.tolist(),
+            'servo': self.servo_points.tolist(),
+        }
+
+    def save(self, path=DEFAULT_PATH):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+    #end save fn
+
+
+def load_calibration(path=DEFAULT_PATH):
+    """The saved calibration, or the defaults when there is no file yet."""
+    if not os.path.exists(path):
+        return ServoCalibration()
+    with open(path) as f:
+        data = json.load(f)
+    return ServoCalibration(data['joint'], data['servo'], data.get('servo_pins'))
+
+
+# --- CALIBRATION ROUTINE ---
+
+def sweep(servo_out, servo, start, stop, base, step=5, dwell=0.15):
+    """Moves one servo from start to stop (the others held at `base`), one step per dwell."""
+    pose = np.array(base, dtype=np.int16)
+    direction = 1 if stop >= start else -1
+    for angle in range(int(start), int(stop) + direction, direction * step):
+        pose[servo] = angle
+        servo_out.set_pose(pose, force=True)
+        time.sleep(dwell)
+
+
+def capture_finger_angles(get_state, seconds=1.5, min_frames=10):
+    """Median finger-average joint angles over `seconds` of vision snapshots, or None."""
+    samples = []
+    last_seq = -1
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        snapshot = get_state()
+        if snapshot.seq != last_seq and snapshot.angles is not None:
+            samples.append(finger_averages(snapshot.angles))
+            last_seq = snapshot.seq
+        time.sleep(0.01)
+    if len(samples) < min_frames:
+        return None
+    return np.median(np.array(samples), axis=0)
+
+
+def _ask_angle(prompt, default, ask):
+    answer = ask(f"{prompt} [{default}]: ").strip()
+    return float(answer) if answer else float(default)
+
+
+def run_calibration(servo_out, get_state, pins, current=None, ask=input):
+    """Interactive calibration. Returns a new ServoCalibration.
+
+    1. Servos: every servo in servo_pins is swept from SERVO_MIN to SERVO_MAX, then the
+       operator enters the angles where Handy's finger is fully closed, relaxed and open.
+    2. Hand: the user holds a fist, a relaxed hand and an open hand to the camera; the
+       median finger angles of each become the joint points.
+    """
+    current = current or ServoCalibration()
+    servo_points = current.servo_points.copy()
+    joint_points = current.joint_points.copy()
+    neutral = current.endpoint('neutral')
+
+    for s, pin in enumerate(pins):
+        print(f"\n{FINGERS[s]} servo (pin {pin}): sweeping {SERVO_MIN}-{SERVO_MAX}, watch the finger")
+        sweep(servo_out, s, SERVO_MIN, SERVO_MAX, neutral)
+        sweep(servo_out, s, SERVO_MAX, neutral[s], neutral)
+        for p, point in enumerate(POINTS):
+            servo_points[s, p] = _ask_angle(f"  servo angle with the finger {point}", int(servo_points[s, p]), ask)
+            # show the entered position before moving on
+            pose = neutral.copy()
+            pose[s] = servo_points[s, p]
+            servo_out.set_pose(pose, force=True)
+            time.sleep(0.5)
+
+    for p, point in enumerate(POINTS):
+        ask(f"\nHold your hand {point} in front of the camera and press Enter")
+        angles = capture_finger_angles(get_state)
+        if angles is None:
+            print("  no hand seen, keeping the previous values")
+            continue
+        joint_points[:, p] = angles
+        print("  " + ", ".join(f"{f} {a:.0f}" for f, a in zip(FINGERS, angles)))
+
+    # keep the points strictly increasing even if two poses measured alike
+    for p in range(1, len(POINTS)):
+        joint_points[:, p] = np.maximum(joint_points[:, p], joint_points[:, p - 1] + 1)
+    return ServoCalibration(joint_points, servo_points, pins)
+#end run calibration fn
+
+
+def main(argv):
+    path = argv[0] if argv else DEFAULT_PATH
+    import gestures
+
+    gestures.init(wait=True)
+    if gestures.ser is None:
+        print("No servo controller, can't calibrate.")
+        return 1
+    # full frame rate for the hand captures (rps mode doesn't move the servos by itself)
+    gestures.set_operating_mode('rps')
+    gestures.start_rps_window(3600)
+    threading.Thread(target=gestures.main_servo_start, daemon=True).start()
+    try:
+        calibration = run_calibration(gestures.servo_out, gestures.get_latest_state, gestures.servo_pins,
+                                      current=load_calibration(path))
+    finally:
+        gestures.break_loop()
+    calibration.save(path)
+    print(f"\nsaved {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
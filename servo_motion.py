@@ -0,0 +1,263 @@
+"""
+FILENAME: servo_motion.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Data-driven servo poses and smooth playback. Gestures are named keyframe sequences
+             in servo_poses.json (servo angles per finger, in servo_pins order). Each transition
+             follows a minimum-jerk or trapezoidal-velocity profile sampled in advance at the
+             servo controller's update rate; MotionPlayer streams the samples to the
+             ServoScheduler on its own timer thread and blends into a new gesture mid-motion.
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from hand_angles import FINGERS
+from servo_output import NUM_SERVOS, SERVO_MIN, SERVO_MAX, UPDATE_RATE_HZ
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'servo_poses.json')
+PROFILES = ('min_jerk', 'trapezoid')
+DEFAULT_PROFILE = 'min_jerk'
+DEFAULT_DURATION = 0.25  # seconds per keyframe unless the file says otherwise
+FULL_TRAVEL = 80.0       # degrees; shorter first moves get a proportionally shorter duration ...
+MIN_FRACTION = 0.3       # ... but never less than this share of it
+BLEND_TIME = 0.08        # seconds of cross-fade from a motion cut off mid-way into the new one
+TRAPEZOID_ACCEL = 0.25   # share of a trapezoidal move spent accelerating (and decelerating)
+
+# The original fixed gestures (fingers 95 closed / 170 open, thumb 130 closed)
+DEFAULT_POSES = {
+    'neutral': [132, 132, 132, 132, 150],
+    'rock': [95, 95, 95, 95, 130],
+    'paper': [170, 170, 170, 170, 170],
+    'scissors': [170, 170, 90, 90, 90],
+}
+REST_POSE = 'neutral'    # where the hand is assumed to be before the first move
+
+_profiles = {}
+
+
+def profile(kind, samples):
+    """Normalised position (0-1] at each of `samples` evenly spaced ticks, ending at exactly 1."""
+    key = (kind, samples)
+    if key not in _profiles:
+        t = np.arange(1, samples + 1, dtype=np.float64) / samples
+        if kind == 'min_jerk':
+            s = t ** 3 * (10 - 15 * t + 6 * t * t)
+        elif kind == 'trapezoid':
+            a = TRAPEZOID_ACCEL
+            v = 1.0 / (1.0 - a)     # cruise speed so the area under the velocity is 1
+            s = np.where(t < a, 0.5 * v / a * t * t,
+                         np.where(t <= 1 - a, v * (t - a / 2), 1 - 0.5 * v / a * (1 - t) ** 2))
+        else:
+            raise ValueError(f"Unknown motion profile: {kind}")
+        _profiles[key] = s.astype(np.float32)
+    return _profiles[key]
+
+
+def blend(remaining, new, samples):
+    """Cross-fades the rest of an interrupted trajectory into a new one over `samples` ticks,
+    so the fingers don't change speed abruptly. Returns the new trajectory (modified in place)."""
+    n = min(samples, len(remaining), len(new))
+    if n:
+        w = profile('min_jerk', n)[:, None]
+        new[:n] = remaining[:n] * (1 - w) + new[:n] * w
+    return new
+
+
+class PoseLibrary:
+    """Named gestures as keyframe sequences, with every fixed segment sampled at load time.
+
+    gestures: name -> pose, or name -> [{'pose': pose, 'duration': s}, ...], where a pose is
+    a list of NUM_SERVOS servo angles, a {finger: angle} dict (FINGERS names, missing fingers
+    keep the previous keyframe's angle) or the name of another single-pose gesture.
+    Only the move from wherever the hand is to the first keyframe is computed at play time
+    (one multiply-add over a cached profile); the segments between keyframes are stored.
+    """
+
+    def __init__(self, gestures=DEFAULT_POSES, profile=DEFAULT_PROFILE, duration=DEFAULT_DURATION,
+                 rate_hz=UPDATE_RATE_HZ, pins=None):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown motion profile: {profile}")
+        self.profile = profile
+        self.duration = duration
+        self.rate_hz = rate_hz
+        self.pins = list(pins) if pins is not None else None
+        self.source = dict(gestures)
+        self.keyframes = {}     # name -> [(pose float32 (NUM_SERVOS,), duration), ...]
+        self.tails = {}         # name -> (M, NUM_SERVOS) float32 samples after the first keyframe
+        for name in self.source:
+            self._compile(name)
+    #end constructor
+
+    def _compile(self, name, resolving=()):
+        if name in self.keyframes:
+            return self.keyframes[name]
+        if name in resolving or name not in self.source:
+            raise ValueError(f"Pose '{name}' is missing or refers to itself")
+        spec = self.source[name]
+        steps = spec if isinstance(spec, list) and spec and isinstance(spec[0], dict) else [{'pose': spec}]
+        frames = []
+        previous = None
+        for step in steps:
+            pose = step['pose']
+            if isinstance(pose, str):
+                pose = self._compile(pose, resolving + (name,))[-1][0]
+            elif isinstance(pose, dict):
+                base = previous if previous is not None else self._rest()
+                pose = [pose.get(finger, base[i]) for i, finger in enumerate(FINGERS)]
+            pose = np.clip(np.asarray(pose, dtype=np.float32), SERVO_MIN, SERVO_MAX)
+            if pose.shape != (NUM_SERVOS,):
+                raise ValueError(f"Pose '{name}' needs {NUM_SERVOS} servo angles")
+            frames.append((pose, float(step.get('duration', self.duration))))
+            previous = pose
+
+        segments = [self.segment(a, b, d) for (a, _), (b, d) in zip(frames[:-1], frames[1:])]
+        self.keyframes[name] = frames
+        self.tails[name] = (np.concatenate(segments) if segments
+                            else np.empty((0, NUM_SERVOS), dtype=np.float32))
+        return frames
+    #end compile fn
+
+    def _rest(self):
+        # base for a {finger: angle} first keyframe: the rest pose if it is a plain angle list
+        spec = self.source.get(REST_POSE)
+        if isinstance(spec, list) and len(spec) == NUM_SERVOS and not isinstance(spec[0], dict):
+            return np.asarray(spec, dtype=np.float32)
+        return np.full(NUM_SERVOS, (SERVO_MIN + SERVO_MAX) / 2, dtype=np.float32)
+
+    def names(self):
+        return list(self.keyframes)
+
+    def rest_pose(self):
+        """The pose the hand is assumed to start in (REST_POSE, if the library has it)."""
+        if REST_POSE in self.keyframes:
+            return self.keyframes[REST_POSE][-1][0].copy()
+        return None
+
+    def segment(self, start, end, duration):
+        """(n, NUM_SERVOS) samples from start (exclusive) to end (inclusive) over duration."""
+        samples = max(1, int(round(duration * self.rate_hz)))
+        return start + (end - start) * profile(self.profile, samples)[:, None]
+
+    def trajectory(self, name, start):
+        """Every sample of gesture `name` played from pose `start` (None = jump straight there)."""
+        frames = self.keyframes[name]
+        first, duration = frames[0]
+        if start is None:
+            head = first[None, :].copy()
+        else:
+            travel = float(np.abs(first - start).max())
+            head = self.segment(start, first, duration * min(1.0, max(MIN_FRACTION, travel / FULL_TRAVEL)))
+        return np.concatenate([head, self.tails[name]]) if len(self.tails[name]) else head
+
+    def to_dict(self):
+        return {
+            'servo_pins': self.pins,
+            'fingers': list(FINGERS),
+            'profile': self.profile,
+            'duration': self.duration,
+            'poses': self.source,
+        }
+
+    def save(self, path=DEFAULT_PATH):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+    #end save fn
+
+
+def load_pose_library(path=DEFAULT_PATH, rate_hz=UPDATE_RATE_HZ):
+    """The saved pose library, or the built-in gestures when there is no file."""
+    if not os.path.exists(path):
+        return PoseLibrary(rate_hz=rate_hz)
+    with open(path) as f:
+        data = json.load(f)
+    return PoseLibrary(data['poses'], data.get('profile', DEFAULT_PROFILE), data.get('duration', DEFAULT_DURATION),
+                       rate_hz, data.get('servo_pins'))
+
+
+class MotionPlayer:
+    """Streams gesture trajectories to a ServoScheduler, one sample per controller tick.
+
+    play() never blocks: it swaps in the new trajectory (cross-faded from the current one
+    if a motion is still running) and the player thread picks it up on its next tick.
+    track() is for direct targets such as mimic mode; it cancels any playback.
+    """
+
+    def __init__(self, servo_out, library, rate_hz=UPDATE_RATE_HZ, blend_time=BLEND_TIME):
+        self.servo_out = servo_out
+        self.library = library
+        self.period = 1.0 / rate_hz
+        self.blend_samples = max(1, int(round(blend_time * rate_hz)))
+        self.current = library.rest_pose()  # last pose commanded (float32), None = unknown
+        self.moves = 0
+        self._trajectory = None
+        self._index = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+    #end constructor
+
+    @property
+    def busy(self):
+        return self._trajectory is not None
+
+    def play(self, name):
+        """Starts gesture `name` from wherever the hand is. False if the library hasn't got it."""
+        if name not in self.library.keyframes:
+            return False
+        with self._cond:
+            trajectory = self.library.trajectory(name, self.current)
+            if self._trajectory is not None:
+                trajectory = blend(self._trajectory[self._index:], trajectory, self.blend_samples)
+            self._trajectory, self._index = trajectory, 0
+            self.moves += 1
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name='MotionPlayer', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def track(self, pose):
+        """Sends one pose straight to the scheduler (cancels any playback)."""
+        with self._cond:
+            self._trajectory = None
+            self.current = np.asarray(pose, dtype=np.float32)
+        self.servo_out.set_pose(pose)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._trajectory = None
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+    #end stop fn
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while True:
+            with self._cond:
+                while self._running and self._trajectory is None:
+                    self._cond.wait()
+                    next_tick = time.monotonic()
+                if not self._running:
+                    return
+                sample = self._trajectory[self._index]
+                self._index += 1
+                last = self._index >= len(self._trajectory)
+                if last:
+                    self._trajectory = None
+                self.current = sample
+            # the final sample is forced through the deadband so the pose is always reached
+            self.servo_out.set_pose(np.rint(sample), force=last)
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    #end run fn
@@ -0,0 +1,169 @@
+"""
+FILENAME: servo_output.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Servo output subsystem. Vision/UI threads hand over a pose and return straight away,
+             a writer thread sends it to the servo controller at its real update rate and only
+             when a joint actually moved.
+"""
+
+import struct
+import threading
+import time
+
+import numpy as np
+
+from perf_stats import perf
+
+NUM_SERVOS = 5          # Index, Middle, Ring, Pinky, Thumb
+SERVO_MIN = 0
+SERVO_MAX = 180
+UPDATE_RATE_HZ = 50     # standard hobby servos take a new pulse every 20 ms
+DEADBAND = 2            # degrees a joint has to move before we bother the controller
+
+
+# --- WIRE FORMATS ---
+# text:   '170, 170, 90, 90, 90\n' (up to 20 bytes, parsed by the controller)
+# binary: 0xA5 0x5A | 5 x uint8 angle | uint8 checksum  (8 bytes, checksum = sum of angles & 0xFF)
+BINARY_HEADER = b'\xA5\x5A'
+BINARY_FRAME_SIZE = 8
+_BINARY_STRUCT = struct.Struct('<2s5BB')
+
+
+def encode_text(angles):
+    """'170, 170, 90, 90, 90\\n' - the line format the servo controller reads."""
+    return ('%d, %d, %d, %d, %d\n' % tuple(angles)).encode('utf-8')
+
+
+def decode_text(line):
+    """Inverse of encode_text, returns the 5 angles as a list of ints."""
+    return [int(v) for v in line.decode('utf-8').strip().split(',')]
+
+
+class BinaryEncoder:
+    """Packs angles into one preallocated 8-byte frame (no allocation per call).
+
+    The returned bytearray is reused by the next call, so write it out before encoding again.
+    """
+
+    def __init__(self):
+        self.frame = bytearray(BINARY_FRAME_SIZE)
+    #end constructor
+
+    def __call__(self, angles):
+        a0, a1, a2, a3, a4 = (int(v) for v in angles)
+        _BINARY_STRUCT.pack_into(self.frame, 0, BINARY_HEADER, a0, a1, a2, a3, a4,
+                                 (a0 + a1 + a2 + a3 + a4) & 0xFF)
+        return self.frame
+
+
+def decode_binary(frame):
+    """Inverse of BinaryEncoder, returns the 5 angles or None if the header/checksum is bad."""
+    header, a0, a1, a2, a3, a4, checksum = _BINARY_STRUCT.unpack(bytes(frame))
+    if header != BINARY_HEADER or (a0 + a1 + a2 + a3 + a4) & 0xFF != checksum:
+        return None
+    return [a0, a1, a2, a3, a4]
+
+
+def make_encoder(encoding):
+    """'text' or 'binary' -> encoder callable for ServoScheduler."""
+    if encoding == 'text':
+        return encode_text
+    if encoding == 'binary':
+        return BinaryEncoder()
+    raise ValueError(f"Unknown servo encoding: {encoding}")
+
+
+class ServoScheduler:
+    """Coalescing, rate-limited servo writer.
+
+    set_pose() only replaces the pending target (a queue bounded to the latest pose), so a slow
+    UART can never build up a backlog. The writer thread sends at most `rate_hz` frames a second
+    and drops targets that are within `deadband` degrees of what was last sent.
+    """
+
+    def __init__(self, ser, rate_hz=UPDATE_RATE_HZ, deadband=DEADBAND, encoding='text'):
+        self.ser = ser
+        self.period = 1.0 / rate_hz
+        self.deadband = deadband
+        self.encoder = make_encoder(encoding)
+
+        self.last_sent = None          # np.int16 array of the last angles written
+        self.frames_sent = 0
+        self.frames_skipped = 0        # targets dropped by the deadband
+        self.frames_coalesced = 0      # targets replaced before they were written
+
+        self._pending = None
+        self._force = False
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+    #end constructor
+
+    def set_pose(self, angles, force=False):
+        """Queues a 5-servo target. Never blocks on the serial port.
+
+        force=True bypasses the deadband (used for the fixed RPS gestures).
+        """
+        if self.ser is None:
+            return
+        target = np.clip(np.asarray(angles, dtype=np.int16), SERVO_MIN, SERVO_MAX)
+        with self._cond:
+            if self._pending is not None:
+                self.frames_coalesced += 1
+            self._pending = target
+            self._force = self._force or force
+            if not self._running:
+                self._start()
+            self._cond.notify()
+
+    def _start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._write_loop, name='ServoScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the writer thread (any pending pose is dropped)."""
+        with self._cond:
+            self._running = False
+            self._pending = None
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+    #end stop fn
+
+    def _write_loop(self):
+        next_write = 0.0
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                # Rate limit: let newer poses coalesce while we wait for the next slot
+                delay = next_write - time.monotonic()
+                while self._running and delay > 0:
+                    self._cond.wait(delay)
+                    delay = next_write - time.monotonic()
+                if not self._running:
+                    return
+                target, force = self._pending, self._force
+                self._pending, self._force = None, False
+
+            if (not force and self.last_sent is not None
+                    and np.abs(target - self.last_sent).max() <= self.deadband):
+                self.frames_skipped += 1
+                continue
+
+            t = perf.now()
+            try:
+                self.ser.write(self.encoder(target))
+            except Exception as e:
+                print(f"Servo write failed: {e}")
+                continue
+            perf.lap('servo: ser.write', t)
+            self.last_sent = target
+            self.frames_sent += 1
+            next_write = time.monotonic() + self.period
+    #end write loop fn
@@ -0,0 +1,11 @@
+"""
+FILENAME: conftest.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Lets the tests import the app modules, which live flat in the repository root.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
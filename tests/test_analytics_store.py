@@ -0,0 +1,25 @@
+"""
+FILENAME: test_analytics_store.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Round outcome table.
+"""
+
+import pytest
+
+from analytics_store import round_result
+
+
+@pytest.mark.parametrize('player, opponent, expected', [
+    ('rock', 'scissors', 1),
+    ('paper', 'rock', 1),
+    ('scissors', 'paper', 1),
+    ('rock', 'paper', -1),
+    ('paper', 'scissors', -1),
+    ('scissors', 'rock', -1),
+    ('paper', 'paper', 0),
+    ('unknown', 'rock', 0),
+    ('rock', 'unknown', 0),
+])
+def test_round_result(player, opponent, expected):
+    assert round_result(player, opponent) == expected
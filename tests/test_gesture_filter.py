@@ -0,0 +1,60 @@
+"""
+FILENAME: test_gesture_filter.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: One-Euro filter, gesture debouncer and motion predictor.
+"""
+
+import numpy as np
+
+from gesture_filter import OneEuroFilter, GestureDebouncer, MotionPredictor, NO_HAND
+
+
+def test_one_euro_first_sample_passes_through():
+    f = OneEuroFilter((21, 3))
+    x = np.random.default_rng(0).random((21, 3), dtype=np.float32)
+    np.testing.assert_array_equal(f.filter(x, 1.0), x)
+
+
+def test_one_euro_smooths_a_jump_and_converges():
+    f = OneEuroFilter((3,), beta=0.0)
+    f.filter(np.zeros(3, np.float32), 0.0)
+    first = f.filter(np.ones(3, np.float32), 1 / 30)
+    assert 0.0 < first[0] < 1.0
+    for i in range(2, 200):
+        out = f.filter(np.ones(3, np.float32), i / 30)
+    np.testing.assert_allclose(out, 1.0, atol=1e-3)
+
+
+def test_one_euro_filters_in_place_and_resets():
+    f = OneEuroFilter((2,))
+    f.filter(np.zeros(2, np.float32), 0.0)
+    x = np.ones(2, np.float32)
+    assert f.filter(x, 0.1, out=x) is x
+    f.reset()
+    np.testing.assert_array_equal(f.filter(np.full(2, 5, np.float32), 0.2), 5.0)
+
+
+def test_debouncer_needs_enter_count_and_dwell():
+    d = GestureDebouncer(window=7, enter_count=5, min_dwell=0.1)
+    stable = [d.push(1, i * 0.03) for i in range(10)]
+    assert stable[3] == NO_HAND         # only 4 of 7 frames so far
+    assert stable[4] == NO_HAND         # 5 frames, but not 0.1 s yet
+    assert stable[-1] == 1
+
+
+def test_debouncer_ignores_a_flicker():
+    d = GestureDebouncer(window=7, enter_count=5, min_dwell=0.0)
+    for i in range(7):
+        d.push(0, i * 0.03)
+    assert d.push(2, 0.3) == 0
+    assert d.push(2, 0.33) == 0
+    assert d.push(-1, 0.36) == 0
+
+
+def test_motion_predictor_extrapolates_and_clamps():
+    p = MotionPredictor((2,), lookahead=0.1, max_step=5.0, high=180.0)
+    for i in range(4):
+        out = p.predict(np.array([90 + 10 * i, 179], np.float32), 1000.0 + i * 0.1)
+    # 100 units/s * 0.1 s = 10, clamped to max_step; the second joint is clamped to `high`
+    np.testing.assert_allclose(out, [125.0, 179.0], atol=1e-3)
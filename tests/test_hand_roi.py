@@ -0,0 +1,51 @@
+"""
+FILENAME: test_hand_roi.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Crop box tracking and the mapping of landmarks back to the full frame.
+"""
+
+import numpy as np
+
+from hand_roi import RoiTracker
+
+
+def test_full_frame_mapping_is_identity():
+    tracker = RoiTracker()
+    tracker.crop(np.zeros((480, 640, 3), np.uint8))
+    points = np.random.default_rng(1).random((21, 3)).astype(np.float32)
+    np.testing.assert_allclose(tracker.to_frame(points), points)
+
+
+def test_to_frame_maps_crop_coordinates():
+    tracker = RoiTracker(max_side=None)
+    tracker.box = (100, 50, 200, 200)
+    roi = tracker.crop(np.zeros((480, 640, 3), np.uint8))
+    assert roi.shape[:2] == (200, 200)
+    points = np.zeros((21, 3), np.float32)
+    points[0] = (0.5, 0.5, 0.1)
+    out = tracker.to_frame(points)
+    np.testing.assert_allclose(out[0], [200 / 640, 150 / 480, 0.1 * 200 / 640], rtol=1e-6)
+    np.testing.assert_allclose(out[1], [100 / 640, 50 / 480, 0.0], rtol=1e-6)
+
+
+def test_to_frame_is_unaffected_by_the_shrunk_crop():
+    tracker = RoiTracker(max_side=100)
+    tracker.box = (100, 50, 200, 200)
+    assert tracker.crop(np.zeros((480, 640, 3), np.uint8)).shape[:2] == (100, 100)
+    points = np.full((21, 3), 0.5, np.float32)
+    np.testing.assert_allclose(tracker.to_frame(points)[0, :2], [200 / 640, 150 / 480], rtol=1e-6)
+
+
+def test_update_then_lost():
+    tracker = RoiTracker()
+    tracker.crop(np.zeros((480, 640, 3), np.uint8))
+    points = np.zeros((21, 3), np.float32)
+    points[:, 0] = np.linspace(0.4, 0.5, 21)
+    points[:, 1] = np.linspace(0.4, 0.6, 21)
+    tracker.update(points)
+    x0, y0, w, h = tracker.box
+    assert x0 <= 0.4 * 640 and x0 + w >= 0.5 * 640
+    assert y0 <= 0.4 * 480 and y0 + h >= 0.6 * 480
+    tracker.lost()
+    assert tracker.box is None
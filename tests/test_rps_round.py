@@ -0,0 +1,50 @@
+"""
+FILENAME: test_rps_round.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Gesture history ring and the vote that decides a round.
+"""
+
+from rps_round import GestureHistory, vote, UNKNOWN
+
+ROCK, PAPER, SCISSORS = 0, 1, 2
+
+
+def test_history_window_wraps_around():
+    history = GestureHistory(size=4)
+    for i in range(6):
+        history.add(float(i), ROCK)
+    timestamps, codes, _ = history.window(0.0, 10.0)
+    assert sorted(timestamps) == [2.0, 3.0, 4.0, 5.0]
+    assert (codes == ROCK).all()
+
+
+def test_history_stores_bad_codes_as_unknown():
+    history = GestureHistory()
+    history.add(1.0, 7)
+    assert history.window(0.0, 2.0)[1][0] == UNKNOWN
+
+
+def test_vote_is_confidence_weighted_and_windowed():
+    history = GestureHistory()
+    history.add(9.0, SCISSORS)          # before the window
+    history.add(10.0, ROCK, 0.3)
+    history.add(10.1, ROCK, 0.3)
+    history.add(10.2, PAPER, 0.9)
+    history.add(10.3, UNKNOWN)
+    code, confidence, frames = vote(history, 10.0, before=0.15, after=0.35)
+    assert (code, frames) == (PAPER, 3)
+    assert abs(confidence - 0.6) < 1e-6
+
+
+def test_vote_tie_goes_to_the_frame_nearest_shoot():
+    history = GestureHistory()
+    history.add(9.9, SCISSORS)
+    history.add(10.02, ROCK)
+    assert vote(history, 10.0)[0] == ROCK
+
+
+def test_vote_without_a_hand():
+    history = GestureHistory()
+    history.add(10.0, UNKNOWN)
+    assert vote(history, 10.0) == (UNKNOWN, 0.0, 0)
@@ -0,0 +1,31 @@
+"""
+FILENAME: test_servo_output.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Servo controller wire formats.
+"""
+
+from servo_output import make_encoder, decode_binary, decode_text, BINARY_FRAME_SIZE
+
+
+def test_binary_round_trip():
+    encode = make_encoder('binary')
+    frame = encode([170, 170, 90, 90, 90])
+    assert len(frame) == BINARY_FRAME_SIZE
+    assert frame[:2] == b'\xA5\x5A'
+    assert frame[-1] == (170 + 170 + 90 + 90 + 90) & 0xFF
+    assert decode_binary(frame) == [170, 170, 90, 90, 90]
+
+
+def test_binary_rejects_a_bad_checksum_or_header():
+    frame = bytearray(make_encoder('binary')([0, 45, 90, 135, 180]))
+    bad = bytearray(frame)
+    bad[3] ^= 1
+    assert decode_binary(bad) is None
+    bad = bytearray(frame)
+    bad[0] = 0
+    assert decode_binary(bad) is None
+
+
+def test_text_round_trip():
+    assert decode_text(make_encoder('text')([170, 170, 90, 90, 90])) == [170, 170, 90, 90, 90]
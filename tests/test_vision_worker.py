@@ -0,0 +1,90 @@
+"""
+FILENAME: test_vision_worker.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Shared-memory frame and result rings between the vision worker and the UI.
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from camera_service import Frame
+from gesture_state import GestureSnapshot
+from vision_worker import SharedRings, RESULT_SLOTS, GESTURE_NAMES
+
+
+@pytest.fixture
+def rings():
+    rings = SharedRings()
+    yield rings
+    rings.close()
+
+
+def snapshot(seq, code=1, gesture='paper'):
+    landmarks = np.full((21, 3), seq, np.float32)
+    return GestureSnapshot(seq, seq / 30, landmarks, np.zeros(15, np.float32), code, gesture, 0.8)
+
+
+def test_frame_round_trip(rings):
+    assert rings.read_frame(0) is None
+    image = np.arange(120 * 160 * 3, dtype=np.uint8).reshape(120, 160, 3)
+    rings.write_frame(Frame(1, 2.5, image))
+    frame = rings.read_frame(0)
+    assert frame.seq == 1 and frame.timestamp == 2.5
+    np.testing.assert_array_equal(frame.image, image)
+    assert not frame.image.flags.writeable
+    assert rings.read_frame(1) is None
+
+
+def test_results_in_order(rings):
+    for seq in range(1, 4):
+        rings.write_result(snapshot(seq))
+    rows, last = rings.read_results(0)
+    assert last == 3
+    assert list(rows['seq']) == [1, 2, 3]
+    assert GESTURE_NAMES[rows['gesture'][0]] == 'paper'
+    assert rows['landmarks'][2, 0, 0] == 3
+    assert len(rings.read_results(last)[0]) == 0
+
+
+def test_results_keep_only_the_newest_slots(rings):
+    for seq in range(1, RESULT_SLOTS + 11):
+        rings.write_result(snapshot(seq))
+    rows, last = rings.read_results(0)
+    assert len(rows) == RESULT_SLOTS
+    assert rows['seq'][0] == 11 and last == RESULT_SLOTS + 10
+
+
+def test_reading_stops_at_a_torn_slot(rings):
+    for seq in range(1, 6):
+        rings.write_result(snapshot(seq))
+    rings.results['seq'][4 % RESULT_SLOTS] = 0      # slot 4 caught mid-write
+    rows, last = rings.read_results(0)
+    assert list(rows['seq']) == [1, 2, 3] and last == 3
+    rings.results['seq'][4 % RESULT_SLOTS] = 4
+    rows, last = rings.read_results(last)
+    assert list(rows['seq']) == [4, 5] and last == 5
+
+
+WRITER = """
+import sys
+from gesture_state import EMPTY_SNAPSHOT
+from vision_worker import SharedRings
+rings = SharedRings(sys.argv[1:])
+rings.write_result(EMPTY_SNAPSHOT._replace(seq=1, timestamp=1.0))
+rings.close()
+"""
+
+
+def test_a_worker_process_writes_into_the_parents_rings(rings):
+    # attached by name from a fresh interpreter, like the real worker
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', WRITER, *rings.names], cwd=root, check=True, timeout=30)
+    rows, last = rings.read_results(0)
+    assert last == 1
+    assert rows['code'][0] == -1 and not rows['has_hand'][0]
+    assert GESTURE_NAMES[rows['gesture'][0]] == 'unknown'
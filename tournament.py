@@ -0,0 +1,160 @@
+"""
+FILENAME: tournament.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Tournament state for the booth: a queue of visitors, single-elimination brackets
+             seeded from whoever is waiting, best-of-N matches and a leaderboard for the whole
+             day. Per-player numbers live in flat NumPy arrays indexed by player id, so recording
+             a round is O(1) and the leaderboard is one partial sort, even with hundreds of players.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from rps_round import GESTURES
+from rps_strategy import OUTCOME
+
+HANDY = -1          # player id of Handy (plays the odd one out of a bracket round)
+FIRST_TO = 2        # round wins that take a match (best of 3)
+MAX_ROUNDS = 5      # after this many rounds a match goes to whoever leads (sudden death if level)
+
+STAT_FIELDS = ('rounds_won', 'rounds_lost', 'rounds_drawn', 'matches_won', 'matches_played')
+
+
+class Tournament:
+    """Visitors join with add_player() and wait; start() puts everyone waiting into a new bracket.
+
+    Matches are played in bracket order. current_match() is (player on the left, player on the
+    right); a bracket round with an odd number of players ends with the last one playing Handy,
+    and only a win against Handy goes through. The bracket's last player standing is the
+    champion (Handy, if it beat the last player left).
+    """
+
+    def __init__(self, first_to=FIRST_TO, max_rounds=MAX_ROUNDS, capacity=64, seed=None):
+        self.first_to = first_to
+        self.max_rounds = max_rounds
+        self.rng = np.random.default_rng(seed)
+        self.names = []
+        self.stats = {field: np.zeros(capacity, dtype=np.int32) for field in STAT_FIELDS}
+        self.waiting = deque()
+        self.bracket = []           # players of the current bracket round, in match order
+        self.next_bracket = []      # winners so far, they play the next bracket round
+        self.bracket_round = 0
+        self.match_index = 0        # index in self.bracket of the current match's left player
+        self.score = [0, 0]         # round wins of (left, right) in the current match
+        self.rounds = 0             # rounds played in the current match (draws included)
+        self.champion = None
+    #end constructor
+
+    # --- players ---
+
+    def add_player(self, name):
+        """Registers a visitor and queues them for the next bracket. Returns their player id."""
+        pid = len(self.names)
+        if pid == len(self.stats['rounds_won']):
+            for field, values in self.stats.items():
+                self.stats[field] = np.concatenate([values, np.zeros_like(values)])
+        self.names.append(name.strip() or f"Player {pid + 1}")
+        self.waiting.append(pid)
+        return pid
+
+    def name(self, pid):
+        return 'Handy' if pid == HANDY else self.names[pid]
+
+    # --- bracket ---
+
+    @property
+    def running(self):
+        return bool(self.bracket) and self.champion is None
+
+    def start(self):
+        """Seeds a new bracket (random order) from everyone waiting. False if nobody is waiting."""
+        if not self.waiting:
+            return False
+        players = np.array(self.waiting, dtype=np.int64)
+        self.waiting.clear()
+        self.rng.shuffle(players)
+        self.bracket = players.tolist()
+        self.next_bracket = []
+        self.bracket_round = 1
+        self.match_index = 0
+        self.champion = None
+        self._reset_match()
+        return True
+
+    def current_match(self):
+        """(left player id, right player id) of the match being played, or None."""
+        if not self.running:
+            return None
+        left = self.bracket[self.match_index]
+        right = self.bracket[self.match_index + 1] if self.match_index + 1 < len(self.bracket) else HANDY
+        return left, right
+
+    def record_round(self, left_pick, right_pick):
+        """Scores one round of the current match (gesture names, 'unknown' = hand not seen).
+
+        Returns (round winner: 0 left / 1 right / None for a draw or replay, match winner id or None).
+        A round where either hand wasn't seen is replayed and not counted.
+        """
+        match = self.current_match()
+        if match is None or left_pick not in GESTURES or right_pick not in GESTURES:
+            return None, None
+        outcome = int(OUTCOME[GESTURES.index(left_pick), GESTURES.index(right_pick)])
+        self.rounds += 1
+        winner = None if outcome == 0 else (0 if outcome > 0 else 1)
+        for side, pid in enumerate(match):
+            if pid == HANDY:
+                continue
+            field = 'rounds_drawn' if winner is None else ('rounds_won' if winner == side else 'rounds_lost')
+            self.stats[field][pid] += 1
+        if winner is not None:
+            self.score[winner] += 1
+
+        lead = self.score[0] - self.score[1]
+        if max(self.score) >= self.first_to or (self.rounds >= self.max_rounds and lead):
+            match_winner = match[0] if lead > 0 else match[1]
+            self._finish_match(match, match_winner)
+            return winner, match_winner
+        return winner, None
+    #end record round fn
+
+    def _finish_match(self, match, winner):
+        for pid in match:
+            if pid != HANDY:
+                self.stats['matches_played'][pid] += 1
+        if winner != HANDY:
+            self.stats['matches_won'][winner] += 1
+            self.next_bracket.append(winner)
+        self.match_index += 1 if match[1] == HANDY else 2
+        self._reset_match()
+
+        if self.match_index >= len(self.bracket):
+            # bracket round over: one (or no) player left is the champion
+            if len(self.next_bracket) <= 1:
+                self.champion = self.next_bracket[0] if self.next_bracket else HANDY
+            else:
+                self.bracket, self.next_bracket = self.next_bracket, []
+                self.match_index = 0
+                self.bracket_round += 1
+
+    def _reset_match(self):
+        self.score = [0, 0]
+        self.rounds = 0
+
+    # --- leaderboard ---
+
+    def leaderboard(self, n=10):
+        """Top n players of the day by matches won, then rounds won:
+        [(name, matches_won, matches_played, rounds_won), ...]."""
+        count = len(self.names)
+        if not count:
+            return []
+        matches_won = self.stats['matches_won'][:count].astype(np.int64)
+        rounds_won = self.stats['rounds_won'][:count].astype(np.int64)
+        key = matches_won * (1 << 32) + rounds_won
+        n = min(n, count)
+        top = np.argpartition(-key, n - 1)[:n]
+        top = top[np.argsort(-key[top], kind='stable')]
+        return [(self.names[pid], int(matches_won[pid]), int(self.stats['matches_played'][pid]), int(rounds_won[pid]))
+                for pid in top]
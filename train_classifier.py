@@ -0,0 +1,112 @@
+"""
+FILENAME: train_classifier.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Trains the gesture_classifier model from landmark recordings (landmark_recording.py).
+             Each recording holds one gesture, named by the start of its file name
+             (rock_*.hlm, paper_*.hlm, scissors_*.hlm, middle_*.hlm, other_*.hlm). Reports
+             hold-out accuracy next to the shape() rules and the per-frame classify time.
+
+Run:  python train_classifier.py rock_1.hlm paper_1.hlm scissors_1.hlm other_1.hlm
+          [--hidden=16] [--epochs=400] [--out=gesture_model.npz]
+      (record them with gestures.start_recording('rock_1.hlm') ... stop_recording())
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from gesture_classifier import CLASS_NAMES, DEFAULT_MODEL_PATH, features, train
+from hand_angles import joint_angles
+from landmark_recording import load_recording
+from vision_pipeline import shape
+
+HOLDOUT = 0.2   # share of each file's frames kept back for testing (the last ones, not shuffled)
+
+
+def label_of(path):
+    name = os.path.basename(path).lower()
+    for code, label in enumerate(CLASS_NAMES):
+        if name.startswith(label):
+            return code
+    raise ValueError(f"Can't tell the gesture of {path} (name must start with one of {CLASS_NAMES})")
+
+
+def load_dataset(paths):
+    """(X_train, y_train, X_test, y_test, angles_test, sample) over the hand frames of every file,
+    sample being one (21, 3) hand frame for timing. None if no file has any hand frames."""
+    parts = {'X_train': [], 'y_train': [], 'X_test': [], 'y_test': [], 'angles_test': []}
+    sample = None
+    for path in paths:
+        code = label_of(path)
+        rec = load_recording(path)
+        points = np.array(rec['landmarks'][rec['has_hand'] == 1])
+        if not len(points):
+            print(f"{path}: no hand frames, skipped")
+            continue
+        if sample is None:
+            sample = points[0]
+        angles = joint_angles(points)
+        X = features(points, angles)
+        split = int(len(X) * (1 - HOLDOUT))
+        parts['X_train'].append(X[:split])
+        parts['y_train'].append(np.full(split, code))
+        parts['X_test'].append(X[split:])
+        parts['y_test'].append(np.full(len(X) - split, code))
+        parts['angles_test'].append(angles[split:])
+        print(f"{path}: {len(X)} frames of {CLASS_NAMES[code]}")
+    if sample is None:
+        return None
+    return tuple(np.concatenate(parts[k]) for k in ('X_train', 'y_train', 'X_test', 'y_test', 'angles_test')) + (sample,)
+
+
+def time_classify(model, points, angles, repeats=2000):
+    """Median microseconds of one classify() call."""
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        t0 = time.perf_counter_ns()
+        model.classify(points, angles)
+        samples[i] = time.perf_counter_ns() - t0
+    return float(np.median(samples)) / 1000.0
+
+
+def main(argv):
+    options = dict(a[2:].split('=', 1) for a in argv if a.startswith('--') and '=' in a)
+    paths = [a for a in argv if not a.startswith('--')]
+    if not paths:
+        print(__doc__)
+        return 1
+    hidden = tuple(int(n) for n in options.get('hidden', '16').split(',') if n and n != '0')
+
+    dataset = load_dataset(paths)
+    if dataset is None:
+        print("None of the recordings has any hand frames, nothing to train on.")
+        return 1
+    X_train, y_train, X_test, y_test, angles_test, points = dataset
+    t0 = time.monotonic()
+    model = train(X_train, y_train, hidden=hidden, epochs=int(options.get('epochs', 400)))
+    print(f"trained on {len(X_train)} frames in {time.monotonic() - t0:.1f} s, hidden layers {hidden or 'none'}")
+
+    if len(X_test):
+        predicted = model.predict_proba(X_test).argmax(axis=1)
+        rules = np.array([shape(a) for a in angles_test])
+        print(f"hold-out accuracy: model {np.mean(predicted == y_test):.1%}, shape() rules {np.mean(rules == y_test):.1%}")
+        for code, label in enumerate(CLASS_NAMES):
+            mask = y_test == code
+            if mask.any():
+                counts = np.bincount(predicted[mask], minlength=len(CLASS_NAMES))
+                print(f"  {label:>9}: " + " ".join(f"{CLASS_NAMES[c]} {n}" for c, n in enumerate(counts) if n))
+
+    # one frame through the live path (features + forward pass)
+    print(f"classify(): {time_classify(model, points, joint_angles(points)):.1f} us per frame")
+
+    out = options.get('out', DEFAULT_MODEL_PATH)
+    model.save(out)
+    print(f"saved {out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
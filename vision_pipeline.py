@@ -0,0 +1,204 @@
+"""
+FILENAME: vision_pipeline.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Everything the vision loop does with a frame's landmarks after MediaPipe:
+             smoothing -> joint angles -> classify -> debouncing -> predicted mimic servos -> UI snapshot.
+             Kept free of camera/MediaPipe/serial so recorded sessions can be replayed through it.
+"""
+
+import numpy as np
+
+from gesture_filter import OneEuroFilter, GestureDebouncer, NO_HAND
+from gesture_state import StateChannel, HandsChannel, SIDES
+from hand_angles import (joint_angles, finger_averages, NUM_LANDMARKS, NUM_ANGLES, INDEX_MPC, INDEX_PIP,
+                         MIDDLE_MPC, MIDDLE_PIP, RING_MPC, RING_PIP, PINKY_MPC, PINKY_PIP)
+from rps_round import GestureHistory, GESTURES, UNKNOWN
+
+
+def shape(hand_angles):
+    """Classifies one frame of joint angles (hand_angles.joint_angles layout).
+
+    Returns 0 = rock, 1 = paper, 2 = scissors, 3 = middle finger, 4 = not a clear shape.
+    """
+    # Whole degrees, as the old getAngle's int() gave: the thresholds were tuned on those
+    a = np.trunc(hand_angles)
+    idx_open = a[INDEX_MPC] > 150 and a[INDEX_PIP] > 150
+    mid_open = a[MIDDLE_MPC] > 150 and a[MIDDLE_PIP] > 150
+    ring_closed = a[RING_MPC] < 150 and a[RING_PIP] < 150
+    pinky_closed = a[PINKY_MPC] < 150 and a[PINKY_PIP] < 150
+
+    if idx_open and mid_open:
+        if ring_closed and pinky_closed:
+            return 2  # Scissors (Index/Middle open, Ring/Pinky closed)
+        if not ring_closed and not pinky_closed:
+             return 1 # Paper (All fingers open)
+        return 4 # Not a clear shape
+
+    # Is the hand shaped as a rocks
+    elif a[INDEX_MPC] < 130 and a[MIDDLE_MPC] < 130:
+        if ring_closed and pinky_closed:
+            return 0 # Rock (All fingers closed)
+        return 4
+
+    # Is the hand showing middle finger (assuming this is code 3)
+    elif a[INDEX_MPC] < 150 and mid_open:
+        if ring_closed and pinky_closed:
+            return 3
+        return 4
+    else:
+        return 4
+
+
+class RuleClassifier:
+    """shape()'s threshold rules behind the classifier interface (see gesture_classifier.py)."""
+
+    def classify(self, points, hand_angles):
+        """One frame -> (code, confidence); the rules are always sure of themselves."""
+        return shape(hand_angles), 1.0
+
+    def classify_batch(self, points, hand_angles):
+        """(N, 21, 3), (N, 15) -> codes (N,) int8, confidences (N,) float32."""
+        codes = np.array([shape(a) for a in hand_angles], dtype=np.int8)
+        return codes, np.ones(len(codes), dtype=np.float32)
+
+
+def mimic_pose(hand_angles, calibration=None):
+    """Servo angles for mimic mode (Index, Middle, Ring, Pinky, Thumb) as ints.
+
+    With a servo_calibration.ServoCalibration each finger's average joint angle goes through
+    that servo's calibrated map; without one it is sent 1:1.
+    """
+    if calibration is not None:
+        return calibration.pose(hand_angles)
+    return finger_averages(hand_angles).astype(int)
+
+
+def per_side(sides, codes, confidences):
+    """Each side's (code, confidence) from per-hand arrays: the most confident hand on that side,
+    UNKNOWN / 0 for a side without a hand. Returns (NUM_SIDES,) int8 and float32 arrays."""
+    side_codes = np.full(len(SIDES), UNKNOWN, dtype=np.int8)
+    side_confidences = np.zeros(len(SIDES), dtype=np.float32)
+    for side in range(len(SIDES)):
+        mine = np.flatnonzero(sides == side)
+        if len(mine):
+            best = mine[confidences[mine].argmax()]
+            side_codes[side] = codes[best]
+            side_confidences[side] = confidences[best]
+    return side_codes, side_confidences
+
+
+def gesture_name(code):
+    """shape() code -> 'rock' / 'paper' / 'scissors' / 'unknown'."""
+    return GESTURES[code] if 0 <= code < len(GESTURES) else 'unknown'
+
+
+class GesturePipeline:
+    """Per-frame landmark processing shared by the live vision loop and offline replay.
+
+    mimic(hand_angles) is called for every hand frame while mode == 'mimic', with the angles
+    extrapolated by `predictor` (a gesture_filter.MotionPredictor; None = the frame's own angles).
+    recorder (optional) gets every frame's raw landmarks before any filtering.
+    classifier: anything with classify(points, hand_angles) -> (code, confidence), for
+    example a gesture_classifier.MLPClassifier (default: the shape() rules).
+    """
+
+    def __init__(self, mimic=None, recorder=None, classifier=None, predictor=None):
+        self.mimic = mimic
+        self.recorder = recorder
+        self.classifier = classifier if classifier is not None else RuleClassifier()
+        self.predictor = predictor
+        self._predicted = np.empty(NUM_ANGLES, dtype=np.float32)
+        self.landmark_filter = OneEuroFilter((NUM_LANDMARKS, 3))  # Per-frame landmark smoothing
+        self.debouncer = GestureDebouncer()                       # Hysteresis on the recognized gesture
+        self.history = GestureHistory()                           # Timestamped shape codes (for RPS rounds)
+        self.state = StateChannel()                               # Latest per-frame snapshot for the UI
+        self.gesture = 'unknown'
+    #end constructor
+
+    def process(self, seq, timestamp, points, mode):
+        """points: (21, 3) full-frame landmarks (filtered in place) or None when no hand is seen.
+
+        Returns the (debounced) recognized gesture name.
+        """
+        if self.recorder is not None:
+            self.recorder.append(seq, timestamp, mode, points)
+
+        hand_angles = None
+        code = UNKNOWN
+        confidence = 1.0
+        if points is not None:
+            # Smooth the landmarks in place (One-Euro, steadier angles for mimic)
+            self.landmark_filter.filter(points, timestamp, out=points)
+            try:
+                # 1. Update the recognized gesture name for UI
+                hand_angles = joint_angles(points)
+                code, confidence = self.classifier.classify(points, hand_angles)
+                self.history.add(timestamp, code, confidence)
+                # Debounced code: only changes once a new shape has held for a few frames
+                self.gesture = gesture_name(self.debouncer.push(code, timestamp))
+
+                # 2. RUN MIMIC MODE SERVO CONTROL
+                if mode == 'mimic' and self.mimic is not None:
+                    if self.predictor is not None:
+                        # aim where the hand will be once the servos get there
+                        self.mimic(self.predictor.predict(hand_angles, timestamp, out=self._predicted))
+                    else:
+                        self.mimic(hand_angles)
+            except Exception as e:
+                # print(f"Error in gesture/servo calculation: {e}")
+                self.gesture = 'unknown'
+        else:
+            self.landmark_filter.reset() # Hand lost, don't blend the next one into this one
+            if self.predictor is not None:
+                self.predictor.reset()
+            self.history.add(timestamp, UNKNOWN)
+            if self.debouncer.push(NO_HAND, timestamp) == NO_HAND:
+                self.gesture = 'unknown'
+
+        # 3. Publish this frame's results to the UI as one snapshot
+        self.state.publish(seq, timestamp, points, hand_angles, code, self.gesture, confidence)
+        return self.gesture
+    #end process fn
+
+
+class MultiHandPipeline:
+    """Every hand of a frame in one batched pass (tournament mode).
+
+    Joint angles and classification run once over the (N, 21, 3) stack. Each hand is put on a
+    side of the mirrored preview by its wrist, and each side keeps its own GestureHistory, so
+    two players in one frame get separate RPS votes. No smoothing: MediaPipe's hand order
+    isn't stable from frame to frame, and the vote does the steadying.
+    """
+
+    def __init__(self, classifier=None):
+        self.classifier = classifier if classifier is not None else RuleClassifier()
+        self.histories = tuple(GestureHistory() for _ in SIDES)   # per side, for the RPS votes
+        self.state = HandsChannel()                               # latest HandsSnapshot
+        self._no_hands = (np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32),
+                          np.empty((0, NUM_ANGLES), dtype=np.float32),
+                          np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int8),
+                          np.empty(0, dtype=np.int8), np.empty(0, dtype=np.float32))
+    #end constructor
+
+    def process(self, seq, timestamp, points, handedness):
+        """points: (N, 21, 3) full-frame landmarks or None; handedness: (N,) HANDEDNESS indexes
+        (-1 = unknown label; only passed through, sides always come from the wrist position).
+
+        Returns the published HandsSnapshot.
+        """
+        if points is None or not len(points):
+            for history in self.histories:
+                history.add(timestamp, UNKNOWN)
+            return self.state.publish(seq, timestamp, *self._no_hands)
+
+        hand_angles = joint_angles(points)
+        codes, confidences = self.classifier.classify_batch(points, hand_angles)
+        # the preview is mirrored, so a wrist on the image's left shows up on the right
+        sides = (points[:, 0, 0] < 0.5).astype(np.int8)
+        side_codes, side_confidences = per_side(sides, codes, confidences)
+        for side, history in enumerate(self.histories):
+            history.add(timestamp, int(side_codes[side]), float(side_confidences[side]))
+        return self.state.publish(seq, timestamp, points, hand_angles, np.asarray(handedness, dtype=np.int8),
+                                  sides, codes, confidences)
+    #end process fn
@@ -0,0 +1,541 @@
+"""
+FILENAME: vision_worker.py
+AUTHOR: Handy Team
+DATE: October 2025
+DESCRIPTION: Runs the vision loop (camera, MediaPipe, gesture pipeline, servos) in its own process
+             so it never competes with Kivy for the GIL. Camera frames and per-frame results come
+             back through shared-memory rings; commands go out over a pipe. VisionClient has the
+             same functions HandyMain uses from the gesture module, and restarts the worker if it dies.
+             The worker is a fresh interpreter running this file (never a fork of the UI process,
+             whose window, SQLite connection and threads must not be duplicated).
+
+Run:  started by VisionClient as  python vision_worker.py PIPE_FD FRAMES_SHM RESULTS_SHM
+"""
+
+import atexit
+import importlib.util
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection
+
+import numpy as np
+
+from camera_service import Frame
+from gesture_state import StateChannel, SIDES
+from hand_angles import NUM_LANDMARKS, NUM_ANGLES
+from rps_round import (GestureHistory, GESTURES, UNKNOWN, start_round, start_pair_round,
+                       WINDOW_AFTER, PROCESSING_MARGIN)
+from rps_strategy import EnsembleStrategy
+from reaction_round import start_reaction_round
+from vision_pipeline import per_side
+
+# Largest camera frame passed to the UI (bigger frames are shrunk to fit before sharing)
+FRAME_SHAPE = (480, 640, 3)
+FRAME_SLOTS = 3         # the UI reads the newest slot while the worker fills the next one
+RESULT_SLOTS = 64       # per-frame results kept for the client's RPS vote history
+
+RESTART_DELAY = 1.0     # seconds before a crashed worker is started again, doubled per crash ...
+MAX_RESTART_DELAY = 30.0    # ... up to this
+STABLE_TIME = 60.0      # a worker that ran this long before crashing starts the back-off over
+STATS_INTERVAL = 1.0    # how often the worker sends its FPS/latency numbers
+
+# What the worker imports; checked up front so HandyMain can fall back to random gestures
+REQUIRED_MODULES = ('cv2', 'mediapipe', 'serial')
+
+GESTURE_NAMES = GESTURES + ['unknown']
+
+FRAME_HEADER_DTYPE = np.dtype([
+    ('seq', '<u8'),             # 0 while the slot is being written
+    ('timestamp', '<f8'),       # time.monotonic() at capture (same clock in both processes)
+    ('height', '<u4'),
+    ('width', '<u4'),
+])
+
+RESULT_DTYPE = np.dtype([
+    ('seq', '<u8'),             # 0 while the slot is being written
+    ('timestamp', '<f8'),
+    ('has_hand', 'u1'),
+    ('code', 'i1'),             # raw shape code of the frame (UNKNOWN = no hand)
+    ('gesture', 'u1'),          # debounced gesture, index into GESTURE_NAMES
+    ('confidence', '<f4'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),
+    ('angles', '<f4', (NUM_ANGLES,)),
+    # tournament mode: each side's hand (vision_pipeline.per_side), UNKNOWN when no hand / other modes
+    ('side_codes', 'i1', (len(SIDES),)),
+    ('side_confidences', '<f4', (len(SIDES),)),
+])
+
+
+class SharedRings:
+    """Frame ring and result ring, each in one SharedMemory block led by a uint64 write counter.
+
+    Created by the parent (names=None); the worker attaches to the same blocks by name, so the
+    counters survive a worker restart. Only the worker writes. Each slot's seq is zeroed
+    first and set last, so a reader can tell a slot that was overwritten under it.
+    """
+
+    def __init__(self, names=None):
+        frame_size = int(np.prod(FRAME_SHAPE))
+        frame_bytes = 8 + FRAME_SLOTS * (FRAME_HEADER_DTYPE.itemsize + frame_size)
+        result_bytes = 8 + RESULT_SLOTS * RESULT_DTYPE.itemsize
+        self.owner = names is None
+        if self.owner:
+            self._frames_shm = shared_memory.SharedMemory(create=True, size=frame_bytes)
+            self._results_shm = shared_memory.SharedMemory(create=True, size=result_bytes)
+        else:
+            self._frames_shm = shared_memory.SharedMemory(names[0])
+            self._results_shm = shared_memory.SharedMemory(names[1])
+            for shm in (self._frames_shm, self._results_shm):
+                # the parent owns the blocks: stop our resource tracker unlinking them when we exit
+                resource_tracker.unregister(shm._name, 'shared_memory')
+
+        buf = self._frames_shm.buf
+        self.frame_count = np.ndarray((1,), dtype=np.uint64, buffer=buf)
+        headers = np.ndarray((FRAME_SLOTS,), dtype=FRAME_HEADER_DTYPE, buffer=buf, offset=8)
+        self.frame_seq = headers['seq']
+        self.frame_ts = headers['timestamp']
+        self.frame_h = headers['height']
+        self.frame_w = headers['width']
+        self.frame_pixels = np.ndarray((FRAME_SLOTS, frame_size), dtype=np.uint8, buffer=buf,
+                                       offset=8 + headers.nbytes)
+
+        buf = self._results_shm.buf
+        self.result_count = np.ndarray((1,), dtype=np.uint64, buffer=buf)
+        self.results = np.ndarray((RESULT_SLOTS,), dtype=RESULT_DTYPE, buffer=buf, offset=8)
+        if self.owner:
+            self.frame_count[0] = 0
+            self.result_count[0] = 0
+    #end constructor
+
+    @property
+    def names(self):
+        return self._frames_shm.name, self._results_shm.name
+
+    # --- worker side ---
+
+    def write_frame(self, frame):
+        image = frame.image
+        if image.size > self.frame_pixels.shape[1]:
+            import cv2
+            scale = min(FRAME_SHAPE[0] / image.shape[0], FRAME_SHAPE[1] / image.shape[1])
+            image = cv2.resize(image, (int(image.shape[1] * scale), int(image.shape[0] * scale)),
+                               interpolation=cv2.INTER_AREA)
+        seq = int(self.frame_count[0]) + 1
+        slot = seq % FRAME_SLOTS
+        self.frame_seq[slot] = 0
+        self.frame_pixels[slot, :image.size] = image.reshape(-1)
+        self.frame_ts[slot] = frame.timestamp
+        self.frame_h[slot], self.frame_w[slot] = image.shape[:2]
+        self.frame_seq[slot] = seq
+        self.frame_count[0] = seq
+
+    def write_result(self, snapshot, hands=None):
+        """snapshot: the frame's GestureSnapshot; hands: its HandsSnapshot in tournament mode."""
+        seq = int(self.result_count[0]) + 1
+        row = self.results[seq % RESULT_SLOTS]
+        row['seq'] = 0
+        row['timestamp'] = snapshot.timestamp
+        row['code'] = snapshot.code
+        row['gesture'] = GESTURE_NAMES.index(snapshot.gesture) if snapshot.gesture in GESTURES else len(GESTURES)
+        row['confidence'] = snapshot.confidence
+        if snapshot.landmarks is None:
+            row['has_hand'] = 0
+        else:
+            row['has_hand'] = 1
+            row['landmarks'] = snapshot.landmarks
+        if snapshot.angles is not None:
+            row['angles'] = snapshot.angles
+        if hands is not None and hands.seq == snapshot.seq:
+            row['side_codes'], row['side_confidences'] = per_side(hands.sides, hands.codes, hands.confidences)
+        else:
+            row['side_codes'] = UNKNOWN
+            row['side_confidences'] = 0
+        row['seq'] = seq
+        self.result_count[0] = seq
+        return seq
+
+    # --- parent side ---
+
+    def read_frame(self, after_seq):
+        """Newest complete frame newer than after_seq as a read-only view into the ring, or None.
+
+        The view stays valid for FRAME_SLOTS - 1 more frames (the same contract as FrameConsumer).
+        """
+        seq = int(self.frame_count[0])
+        if seq <= after_seq:
+            return None
+        slot = seq % FRAME_SLOTS
+        h, w = int(self.frame_h[slot]), int(self.frame_w[slot])
+        timestamp = float(self.frame_ts[slot])
+        if int(self.frame_seq[slot]) != seq:
+            return None     # overwritten between reading the counter and the header
+        image = self.frame_pixels[slot, :h * w * 3].reshape(h, w, 3)
+        image.flags.writeable = False
+        return Frame(seq, timestamp, image)
+
+    def read_results(self, after_seq):
+        """Copies of the complete results newer than after_seq (at most RESULT_SLOTS), oldest first,
+        and the seq to pass next time.
+
+        Reading stops before the first slot caught mid-write (its seq is checked before and
+        after the copy), so that result is picked up by the next call instead of skipped.
+        """
+        seq = int(self.result_count[0])
+        first = max(after_seq + 1, seq - RESULT_SLOTS + 1)
+        if first > seq:
+            return self.results[:0].copy(), after_seq
+        expected = np.arange(first, seq + 1, dtype=np.uint64)
+        slots = expected % RESULT_SLOTS
+        rows = self.results[slots]          # fancy indexing copies
+        consistent = (rows['seq'] == expected) & (self.results['seq'][slots] == expected)
+        torn = np.flatnonzero(~consistent)
+        if len(torn):
+            rows = rows[:torn[0]]
+            seq = first + int(torn[0]) - 1
+        return rows, seq
+
+    def close(self):
+        # Drop our views first, SharedMemory.close() fails while they still reference the buffer
+        self.frame_count = self.frame_seq = self.frame_ts = self.frame_h = self.frame_w = None
+        self.frame_pixels = self.result_count = self.results = None
+        for shm in (self._frames_shm, self._results_shm):
+            try:
+                shm.close()
+                if self.owner:
+                    shm.unlink()
+            except (BufferError, FileNotFoundError):
+                pass
+    #end close fn
+
+
+def _worker_main(conn, rings):
+    """The vision process: the gesture module's loop, mirrored into the rings."""
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (BrokenPipeError, OSError):
+                pass
+
+    try:
+        import gestures
+        from perf_stats import perf
+    except ImportError as e:
+        send(('fatal', str(e)))
+        return
+
+    # Camera frames for the UI preview (subscribing waits for the camera bridge, so do it here)
+    def forward_frames():
+        frames = gestures.subscribe_frames()
+        while not frames.closed and not stopped.is_set():
+            frame = frames.read(timeout=1.0)
+            if frame is not None:
+                rings.write_frame(frame)
+        frames.close()
+
+    stopped = threading.Event()
+
+    # Per-frame results (runs on the vision thread, right after pipeline.process)
+    last_stats = [0.0]
+
+    def on_state(snapshot):
+        seq = rings.write_result(snapshot, gestures.hands_state.latest())
+        send(('result', seq))
+        if snapshot.timestamp - last_stats[0] >= STATS_INTERVAL:
+            last_stats[0] = snapshot.timestamp
+            send(('stats', gestures.get_vision_stats(), perf.snapshot()))
+
+    # Commands from VisionClient
+    def commands():
+        while True:
+            try:
+                command, *args = conn.recv()
+            except (EOFError, OSError):
+                command, args = 'stop', ()   # parent is gone
+            if command == 'mode':
+                gestures.set_operating_mode(*args)
+            elif command == 'rps_window':
+                gestures.start_rps_window(*args)
+            elif command == 'move':
+                gestures.move_handy(*args)
+            elif command == 'perf':
+                perf.enabled = args[0]
+            elif command == 'stop':
+                gestures.break_loop()
+                return
+
+    gestures.gesture_state.subscribe(on_state)
+    threading.Thread(target=forward_frames, daemon=True, name='HandyFrameForward').start()
+    threading.Thread(target=commands, daemon=True, name='HandyVisionCommands').start()
+    send(('ready',))
+
+    gestures.main_servo_start()
+
+    stopped.set()
+    send(('stopped',))
+    conn.close()
+#end worker main fn
+
+
+def main(argv):
+    """Entry point of the vision process (see Run: above); only imports what the loop needs."""
+    conn = Connection(int(argv[0]))
+    rings = SharedRings(argv[1:3])
+    try:
+        _worker_main(conn, rings)
+    finally:
+        rings.close()
+    return 0
+
+
+class SharedFrameConsumer:
+    """FrameConsumer look-alike over the shared frame ring (the UI side of the camera)."""
+
+    def __init__(self, client):
+        self.service = client
+        self.closed = False
+        self.last_seq = 0
+        self.dropped = 0
+    #end constructor
+
+    def poll(self):
+        rings = self.service.rings
+        if self.closed or rings is None:
+            return None
+        frame = rings.read_frame(self.last_seq)
+        if frame is not None:
+            if self.last_seq:
+                self.dropped += frame.seq - self.last_seq - 1
+            self.last_seq = frame.seq
+        return frame
+
+    def read(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.closed:
+            frame = self.poll()
+            if frame is not None:
+                return frame
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(0.005)
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class VisionClient:
+    """Stands in for the gesture module in the UI process.
+
+    main_servo_start() starts the worker process and supervises it until break_loop():
+    results are mirrored into a local gesture_state / gesture_history, and a worker that
+    crashes (non-zero exit code) is started again with the current mode, backing off from
+    RESTART_DELAY to MAX_RESTART_DELAY. A worker whose loop ended normally (camera wouldn't
+    open, replayed file ran out) or can't import its modules is not restarted.
+    status is 'starting', 'running', 'restarting', 'stopped' or 'failed'; subscribe_status()
+    callbacks get (status, message) on the supervising thread.
+    """
+
+    def __init__(self):
+        missing = [m for m in REQUIRED_MODULES if importlib.util.find_spec(m) is None]
+        if missing:
+            raise ImportError(f"vision worker needs {', '.join(missing)}")
+        self.gesture_state = StateChannel()
+        self.gesture_history = GestureHistory()
+        self.side_histories = tuple(GestureHistory() for _ in SIDES)   # tournament votes
+        self.strategy = EnsembleStrategy()   # rounds are decided here, so Handy's picks are too
+        self.mode = 'idle'
+        self.stats = {}
+        self.worker_perf = {}
+        self.restarts = 0
+        self.status = 'starting'
+        self.status_message = ''
+        self.rings = SharedRings()
+        self.process = None
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._status_listeners = []
+        self._closing = False
+        self._stopped = threading.Event()
+        self._last_result = 0
+        atexit.register(self._shutdown)
+    #end constructor
+
+    # --- same functions HandyMain calls on the gesture module ---
+
+    def set_operating_mode(self, mode):
+        self.mode = mode
+        self._send('mode', mode)
+
+    def get_latest_gesture(self):
+        return self.gesture_state.latest().gesture
+
+    def get_latest_state(self):
+        return self.gesture_state.latest()
+
+    def start_rps_window(self, seconds):
+        self._send('rps_window', seconds)
+
+    def get_vision_stats(self):
+        return self.stats
+
+    def set_perf_enabled(self, enabled):
+        """Switches the worker's perf_stats on/off (its stages come back in worker_perf)."""
+        self._send('perf', enabled)
+
+    def move_handy(self, pick):
+        self._send('move', pick)
+
+    def RPS_mode_async(self, shoot_time=None, callback=None):
+        """Same as the gesture module's: Handy throws in the worker, the vote runs here on the
+        mirrored history (timestamps are time.monotonic() in both processes)."""
+        self.start_rps_window(WINDOW_AFTER + PROCESSING_MARGIN)
+        return start_round(self.gesture_history, self.move_handy, shoot_time, callback, self.strategy)
+
+    def RPS_reaction_async(self, shoot_time=None, callback=None):
+        """Same as the gesture module's, reacting on the mirrored results (one pipe message
+        to the worker between the deciding frame and the servo command)."""
+        self.start_rps_window(WINDOW_AFTER + PROCESSING_MARGIN)
+        return start_reaction_round(self.gesture_state, self.gesture_history, self.move_handy,
+                                    shoot_time, callback, self.strategy)
+
+    def RPS_pair_async(self, shoot_time=None, callback=None):
+        """Same as the gesture module's, voting on the mirrored per-side history."""
+        self.start_rps_window(WINDOW_AFTER + PROCESSING_MARGIN)
+        return start_pair_round(self.side_histories, shoot_time, callback)
+
+    def subscribe_frames(self, wait=True):
+        return SharedFrameConsumer(self)
+
+    def is_opened(self):
+        return not self._closing
+
+    def break_loop(self):
+        self._closing = True
+        self._stopped.set()
+        self._send('stop')
+
+    def subscribe_status(self, callback):
+        """callback(status, message) whenever the worker starts, crashes or stops for good."""
+        self._status_listeners.append(callback)
+
+    def main_servo_start(self):
+        """Runs (and restarts) the worker process until break_loop(). Blocks, like the original."""
+        delay = RESTART_DELAY
+        while not self._closing:
+            # a new interpreter, not a fork: forking here would copy the Kivy window, the analytics
+            # SQLite handle and locks held by the UI's other threads into the worker
+            conn, child_conn = multiprocessing.Pipe()
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), str(child_conn.fileno()), *self.rings.names],
+                pass_fds=(child_conn.fileno(),))
+            child_conn.close()
+            started = time.monotonic()
+            with self._send_lock:
+                self._conn, self.process = conn, process
+            self._send('mode', self.mode)
+
+            fatal = self._receive(conn)
+
+            with self._send_lock:
+                self._conn = None
+            try:
+                process.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+                process.wait()
+            conn.close()
+            if self._closing:
+                break
+            if fatal is not None:
+                self._set_status('failed', f"Vision can't run: {fatal}")
+                break
+            if process.returncode == 0:
+                # the loop returned by itself, restarting would only do the same again
+                self._set_status('stopped', "Vision stopped (camera closed or source ended)")
+                break
+
+            if time.monotonic() - started >= STABLE_TIME:
+                delay = RESTART_DELAY
+            self.restarts += 1
+            self._set_status('restarting', f"Vision crashed (code {process.returncode}), "
+                                           f"restarting in {delay:.0f} s")
+            self._stopped.wait(delay)
+            delay = min(delay * 2, MAX_RESTART_DELAY)
+        self._closing = True
+    #end main servo start fn
+
+    # --- internals ---
+
+    def _set_status(self, status, message=''):
+        self.status, self.status_message = status, message
+        if message:
+            print(message)
+        for callback in self._status_listeners:
+            callback(status, message)
+
+    def _send(self, *message):
+        with self._send_lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.send(message)
+            except (BrokenPipeError, OSError):
+                pass
+
+    def _receive(self, conn):
+        """Handles worker messages until it goes away. Returns the fatal error text, if any."""
+        while True:
+            try:
+                kind, *args = conn.recv()
+            except (EOFError, OSError):
+                return None
+            if kind == 'result':
+                self._mirror_results()
+            elif kind == 'ready':
+                self._set_status('running')
+            elif kind == 'stats':
+                self.stats, self.worker_perf = args
+            elif kind == 'fatal':
+                return args[0]
+
+    def _mirror_results(self):
+        rows, self._last_result = self.rings.read_results(self._last_result)
+        if not len(rows):
+            return
+        for row in rows:
+            timestamp = float(row['timestamp'])
+            self.gesture_history.add(timestamp, int(row['code']), float(row['confidence']))
+            if self.mode == 'tournament':
+                for side, history in enumerate(self.side_histories):
+                    history.add(timestamp, int(row['side_codes'][side]), float(row['side_confidences'][side]))
+        row = rows[-1]
+        hand = bool(row['has_hand'])
+        self.gesture_state.publish(int(row['seq']), float(row['timestamp']),
+                                   row['landmarks'] if hand else None,
+                                   row['angles'] if hand else None,
+                                   int(row['code']), GESTURE_NAMES[row['gesture']],
+                                   float(row['confidence']))
+
+    def _shutdown(self):
+        self.break_loop()
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                self.process.terminate()
+        if self.rings is not None:
+            rings, self.rings = self.rings, None
+            rings.close()
+    #end shutdown fn
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))